@@ -0,0 +1,85 @@
+import asyncio
+import json
+from typing import Dict, Any, Optional, Sequence
+
+try:
+    import aiohttp
+except ImportError:  # 异步客户端为可选功能
+    aiohttp = None
+
+
+class AsyncSimulationClient:
+    """
+    HTTP 仿真客户端的异步版本，接口与 http_client.SimulationClient 一致
+
+    多个环境可以共享同一个事件循环（以及同一个连接池），
+    用 gather_step 在一次 await 中并发完成所有环境的单步
+    """
+
+    def __init__(self,
+                 base_url: str,
+                 timeout: float = 30,
+                 connect_timeout: float = 3.0,
+                 pool_maxsize: int = 16,
+                 session: Optional["aiohttp.ClientSession"] = None):
+        if aiohttp is None:
+            raise ImportError("AsyncSimulationClient 需要安装 aiohttp")
+        self.base_url = base_url.rstrip("/")
+        self.timeout = aiohttp.ClientTimeout(total=None, connect=connect_timeout, sock_read=timeout)
+        self.pool_maxsize = pool_maxsize
+        # 外部传入的会话由外部负责关闭
+        self._own_session = session is None
+        self.session = session
+
+    async def _ensure_session(self):
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.pool_maxsize, keepalive_timeout=60)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout,
+                                                 json_serialize=json.dumps)
+
+    async def _request(self, method: str, path: str, what: str, payload: Any = None) -> Any:
+        """发送请求并解析 200 回包：网络错误抛出 ConnectionError，其他状态码抛出 RuntimeError"""
+        await self._ensure_session()
+        try:
+            async with self.session.request(method, f"{self.base_url}{path}", json=payload) as response:
+                if response.status != 200:
+                    raise RuntimeError(f"{what}失败: HTTP {response.status} {(await response.text())[:200]}")
+                return await response.json(content_type=None)
+        except aiohttp.ClientError as e:
+            raise ConnectionError(f"{what}失败: {e}") from e
+
+    async def connect(self, env_name: str) -> bool:
+        """连接仿真服务端并选择环境"""
+        try:
+            await self._request("POST", "/connect", "连接", {"environment": env_name})
+        except (ConnectionError, RuntimeError) as e:
+            print(e)
+            return False
+        return True
+
+    async def step(self, action: Dict[str, Any]) -> Dict[str, Any]:
+        """发送动作并取回执行后的环境数据"""
+        return await self._request("POST", "/step", "单步交互", action)
+
+    async def step_batch(self, actions: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """多环境单步，一次请求"""
+        return (await self._request("POST", "/batch/step", "批量单步", {"actions": actions}))["observations"]
+
+    async def get_environment_data(self) -> Dict[str, Any]:
+        """从仿真服务端获取环境数据"""
+        return await self._request("GET", "/environment", "获取环境数据")
+
+    async def reset_environment(self) -> bool:
+        """重置环境"""
+        await self._request("POST", "/reset", "重置环境")
+        return True
+
+    async def close(self):
+        if self._own_session and self.session is not None:
+            await self.session.close()
+        self.session = None
+
+
+async def gather_step(clients: Sequence[AsyncSimulationClient], actions: Sequence[Dict[str, Any]]):
+    """在同一个事件循环里并发执行多个环境的单步，返回与 clients 顺序一致的结果列表"""
+    return await asyncio.gather(*(client.step(action) for client, action in zip(clients, actions)))
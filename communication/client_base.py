@@ -0,0 +1,108 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Iterable, Optional, FrozenSet
+
+from utils.latency import NULL_PROFILER
+
+
+# ================= 能力标识 =================
+CAP_BATCH_STEP = "batch_step"          # 一次请求步进多个环境
+CAP_BATCH_RESET = "batch_reset"        # 一次请求重置多个环境
+CAP_CUSTOM_STATES = "custom_states"    # reset 时下发自定义初始状态
+CAP_SEEDS = "seeds"                    # reset 时下发服务端随机种子
+CAP_SNAPSHOT = "snapshot"              # 场景快照 / 恢复
+CAP_SUBSCRIBE = "subscribe"            # 观测推送订阅
+
+
+class SimulationClientBase(ABC):
+    """
+    仿真客户端统一接口，与具体传输方式（TCP / HTTP / 共享内存 / 回放）无关
+
+    所有传输都以 {env_id(str): 观测帧} 的形式返回数据，观测帧即服务端单个环境的 obs 字典；
+    环境只依赖本接口，换用更快的传输方式不需要修改环境代码
+    """
+
+    # 传输方式名称
+    transport = "base"
+
+    def __init__(self):
+        # 连接后与服务端协商得到的能力集合
+        self.capabilities: FrozenSet[str] = frozenset()
+        # 分阶段耗时统计，由环境注入，默认关闭
+        self.profiler = NULL_PROFILER
+        # step_async 发出、尚未由 step_wait 取回的动作
+        self._pending_actions: Optional[Dict[str, Any]] = None
+
+    @abstractmethod
+    def connect(self, scenario: str) -> bool:
+        """建立连接、加载场景并协商能力，返回是否成功"""
+        pass
+
+    @abstractmethod
+    def step_batch(self, actions: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        步进多个环境
+        :param actions: {env_id: 动作}，动作可以是数值列表或字段字典，由具体传输转换为线上格式
+        :return: {env_id: 观测帧}
+        """
+        pass
+
+    @abstractmethod
+    def reset_batch(self,
+                    env_ids: Iterable,
+                    custom_states: Optional[Dict[str, Dict[str, Any]]] = None,
+                    seeds: Optional[Dict[str, int]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        重置多个环境
+        :return: {env_id: 初始观测帧}
+        """
+        pass
+
+    @abstractmethod
+    def close(self):
+        """断开连接"""
+        pass
+
+    def step_async(self, actions: Dict[str, Any]):
+        """
+        发出步进请求后立即返回，由 step_wait 取回观测；两次调用之间客户端可以做其他工作，与服务端计算重叠。
+        同一客户端同时只能有一个未取回的请求，期间不能发出其他请求。
+        默认实现没有真正的异步：在 step_wait 中同步调用 step_batch
+        """
+        if self._pending_actions is not None:
+            raise RuntimeError("上一次 step_async 的结果尚未取回")
+        self._pending_actions = actions
+
+    def step_wait(self) -> Dict[str, Dict[str, Any]]:
+        """取回 step_async 的结果，{env_id: 观测帧}"""
+        actions, self._pending_actions = self._pending_actions, None
+        if actions is None:
+            raise RuntimeError("没有等待取回的 step_async 请求")
+        return self.step_batch(actions)
+
+    def step(self, action: Any, env_id: str = "0") -> Optional[Dict[str, Any]]:
+        """步进单个环境，返回其观测帧"""
+        return self.step_batch({str(env_id): action}).get(str(env_id))
+
+    def snapshot(self, name: str, env_id: int = 0, meta: Optional[Dict[str, Any]] = None):
+        """导出指定环境的完整仿真状态并以 name 保存，meta 为随快照保存的附加信息"""
+        self.require(CAP_SNAPSHOT)
+        raise NotImplementedError(f"{self.transport} 传输未实现快照")
+
+    def restore(self, name: str, env_id: int = 0) -> Dict[str, Any]:
+        """将快照恢复到指定环境，返回恢复后的观测帧"""
+        self.require(CAP_SNAPSHOT)
+        raise NotImplementedError(f"{self.transport} 传输未实现快照恢复")
+
+    def snapshot_meta(self, name: str) -> Dict[str, Any]:
+        """快照保存时附带的 meta"""
+        self.require(CAP_SNAPSHOT)
+        raise NotImplementedError(f"{self.transport} 传输未实现快照")
+
+    def supports(self, capability: str) -> bool:
+        """服务端是否支持指定能力"""
+        return capability in self.capabilities
+
+    def require(self, capability: str):
+        """不支持指定能力时抛出异常"""
+        if capability not in self.capabilities:
+            raise NotImplementedError(f"{self.transport} 传输不支持 {capability}")
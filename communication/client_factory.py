@@ -0,0 +1,71 @@
+from typing import Dict, Callable
+from urllib.parse import urlparse, parse_qsl
+
+from communication.client_base import SimulationClientBase
+from communication.codec import ENCODING_DELTA, codec_offer
+from communication.tcp_client import SimulationClient as TCPSimulationClient
+from communication.http_client import SimulationClient as HTTPSimulationClient
+from communication.replay_client import ReplayClient
+from communication.shm_transport import SharedMemoryClient, DEFAULT_SPIN_ITERATIONS
+
+
+def _create_tcp(uri, options) -> SimulationClientBase:
+    codec = None
+    if options.get("codec") == ENCODING_DELTA:
+        codec = codec_offer(keyframe_interval=int(options.get("keyframe", 100)),
+                            **({"compression": options["compression"].split(",")} if "compression" in options else {}))
+    return TCPSimulationClient(host=uri.hostname, port=uri.port or 8888,
+                               steps=int(options.get("steps", 1)), count=int(options.get("count", 1)), codec=codec)
+
+
+def _create_http(uri, options) -> SimulationClientBase:
+    return HTTPSimulationClient(f"{uri.scheme}://{uri.netloc}{uri.path}",
+                                timeout=float(options.get("timeout", 30)))
+
+
+def _create_shm(uri, options) -> SimulationClientBase:
+    return SharedMemoryClient(uri.netloc, spin_iterations=int(options.get("spin", DEFAULT_SPIN_ITERATIONS)),
+                              timeout=float(options.get("timeout", 10)))
+
+
+def _create_replay(uri, options) -> SimulationClientBase:
+    return ReplayClient(uri.netloc + uri.path, loop=options.get("loop", "0") in ("1", "true"))
+
+
+class ClientFactory:
+    """按地址创建仿真客户端，环境代码只依赖 SimulationClientBase"""
+
+    # URI scheme 到构造函数的映射
+    _transport_registry: Dict[str, Callable] = {
+        "tcp": _create_tcp,
+        "http": _create_http,
+        "https": _create_http,
+        "replay": _create_replay,
+        "shm": _create_shm,
+    }
+
+    @classmethod
+    def create_client(cls, uri: str) -> SimulationClientBase:
+        """
+        创建客户端，例如:
+            tcp://127.0.0.1:8888?steps=1&count=4
+            tcp://10.0.0.5:8888?codec=delta&compression=zstd,zlib&keyframe=100
+            http://127.0.0.1:8080
+            replay://logs/episode.jsonl?loop=1
+            shm://afsim_shm?spin=2000
+        """
+        parsed = urlparse(uri)
+        if parsed.scheme not in cls._transport_registry:
+            available = list(cls._transport_registry.keys())
+            raise ValueError(f"传输方式 '{parsed.scheme}' 不存在。可用传输: {available}")
+        options = dict(parse_qsl(parsed.query))
+        return cls._transport_registry[parsed.scheme](parsed, options)
+
+    @classmethod
+    def register_transport(cls, scheme: str, constructor: Callable):
+        """注册新传输方式，constructor(parsed_uri, options) -> SimulationClientBase"""
+        cls._transport_registry[scheme] = constructor
+
+    @classmethod
+    def get_available_transports(cls) -> list:
+        return list(cls._transport_registry.keys())
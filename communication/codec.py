@@ -0,0 +1,306 @@
+"""
+观测帧的线上编码：关键帧 + 按字段量化的整数增量，可选压缩（zstd / lz4 / zlib）
+
+默认每步把所有平台的全部字段作为 JSON 文本重发；平台数上百、仿真跑在其他节点上时，带宽和 JSON 编解码
+都会成为瓶颈。协商后 reset / step / restore 的回包改为二进制:
+
+    MAGIC(4) + 压缩( u32 头长度 + 头 JSON + 各环境的数组块 )
+
+    头:   {"status", "msg", "envs": [{"id", "key", "sim_time", "count", "dtype", "names"(仅关键帧), "extra"(可选)}]}
+    数组: 关键帧为 float64 原值 (count, F)；增量帧为 (当前值 - 上一帧重建值) / 量化步长 取整，
+          按本帧最大增量选 int8 / int16 / int32
+
+编码端以重建值（而不是真实值）为基准求增量，量化误差不会逐帧累积，始终不超过步长的一半；
+编码端与解码端的重建值逐位相同。平台名称变化、reset / restore、超过 keyframe_interval 帧、
+出现非有限值或增量超出 int32 时发送关键帧。只传输 PLATFORM_FIELDS 和 name，平台字典中的其他字段不传输；
+观测帧中 sim_time / platforms 以外的键放在头的 extra 中原样传输
+
+协商（init 请求）:
+    客户端: params["codec"] = {"encodings": ["delta"], "compression": ["zstd", "lz4", "zlib", "none"],
+                               "keyframe_interval": 100}
+    服务端: 回包 "codec" = {"encoding": "delta", "compression": 选中的第一个双方都支持的压缩,
+                            "keyframe_interval": int, "quantum": [各字段量化步长]}
+    回包中没有 "codec" 时继续使用 JSON
+
+对比测试: python -m communication.codec --platforms 200 --steps 500
+"""
+import json
+import struct
+import zlib
+from operator import itemgetter
+from typing import Dict, Any, Callable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from communication.shm_transport import PLATFORM_FIELDS
+
+try:
+    import zstandard
+except ImportError:  # zstd 为可选压缩
+    zstandard = None
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # lz4 为可选压缩
+    lz4_frame = None
+
+ENCODING_DELTA = "delta"
+CODEC_MAGIC = b"AFDC"
+
+# 各字段的量化步长：经纬度 1e-7 度（约 1 cm），高度 / 质量 1 mm / 1 g，角度 1e-5 度，速度 0.1 mm/s
+DEFAULT_QUANTUM = {"lat": 1e-7, "lon": 1e-7, "alt": 1e-3, "heading": 1e-5, "pitch": 1e-5, "roll": 1e-5,
+                   "speed": 1e-4, "vx": 1e-4, "vy": 1e-4, "vz": 1e-4, "mass": 1e-3}
+DEFAULT_KEYFRAME_INTERVAL = 100
+
+_get_fields = itemgetter(*PLATFORM_FIELDS)
+_DELTA_DTYPES = ((np.int8, "i1"), (np.int16, "i2"), (np.int32, "i4"))
+_DTYPES = {"f8": np.float64, "i1": np.int8, "i2": np.int16, "i4": np.int32}
+_PASSTHROUGH = ("sim_time", "platforms")
+
+
+def _zstd_pair() -> Tuple[Callable, Callable]:
+    compressor, decompressor = zstandard.ZstdCompressor(level=1), zstandard.ZstdDecompressor()
+    return compressor.compress, decompressor.decompress
+
+
+# 压缩方式名称到 (压缩, 解压) 构造函数的映射，只登记当前环境可用的
+_compression_registry: Dict[str, Callable[[], Tuple[Callable, Callable]]] = {
+    "none": lambda: (bytes, bytes),
+    "zlib": lambda: (lambda data: zlib.compress(data, 1), zlib.decompress),
+}
+if zstandard is not None:
+    _compression_registry["zstd"] = _zstd_pair
+if lz4_frame is not None:
+    _compression_registry["lz4"] = lambda: (lz4_frame.compress, lz4_frame.decompress)
+
+
+def available_compressions() -> list:
+    return list(_compression_registry.keys())
+
+
+def codec_offer(compression: Sequence[str] = ("zstd", "lz4", "zlib", "none"),
+                keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL) -> Dict[str, Any]:
+    """客户端在 init 请求中携带的编码提议，compression 按优先级排列"""
+    return {"encodings": [ENCODING_DELTA], "compression": list(compression), "keyframe_interval": int(keyframe_interval)}
+
+
+def negotiate(offer: Optional[Dict[str, Any]], quantum: Optional[Dict[str, float]] = None
+              ) -> Tuple[Optional[Dict[str, Any]], Optional["DeltaEncoder"]]:
+    """
+    服务端处理编码提议，返回 (回包中的 codec 字段, 编码器)；不支持时返回 (None, None)，继续使用 JSON
+    """
+    if not offer or ENCODING_DELTA not in offer.get("encodings", ()):
+        return None, None
+    compression = next((c for c in offer.get("compression", ["none"]) if c in _compression_registry), "none")
+    quantum = dict(DEFAULT_QUANTUM, **(quantum or {}))
+    reply = {"encoding": ENCODING_DELTA, "compression": compression,
+             "keyframe_interval": int(offer.get("keyframe_interval", DEFAULT_KEYFRAME_INTERVAL)),
+             "quantum": [quantum[f] for f in PLATFORM_FIELDS]}
+    return reply, DeltaEncoder.from_reply(reply)
+
+
+def is_encoded(body: bytes) -> bool:
+    """回包是否为编码后的二进制（否则是普通 JSON）"""
+    return body[:4] == CODEC_MAGIC
+
+
+def _platform_values(platforms) -> np.ndarray:
+    try:
+        return np.array([_get_fields(p) for p in platforms], dtype=np.float64).reshape(len(platforms),
+                                                                                       len(PLATFORM_FIELDS))
+    except KeyError:
+        return np.array([[p.get(f, np.nan) for f in PLATFORM_FIELDS] for p in platforms],
+                        dtype=np.float64).reshape(len(platforms), len(PLATFORM_FIELDS))
+
+
+class _EnvState:
+    """单个环境在编码端 / 解码端共同维护的状态"""
+
+    __slots__ = ("names", "values", "since_key")
+
+    def __init__(self, names: Tuple[str, ...], values: np.ndarray):
+        self.names = names
+        self.values = values
+        self.since_key = 0
+
+
+class DeltaEncoder:
+    """服务端编码器，每个连接一个（增量以该连接上一次发送的帧为基准）"""
+
+    def __init__(self, quantum: Sequence[float], keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL,
+                 compression: str = "none"):
+        self.quantum = np.asarray(quantum, dtype=np.float64)
+        self.keyframe_interval = keyframe_interval
+        self.compression = compression
+        self._compress = _compression_registry[compression]()[0]
+        self._states: Dict[str, _EnvState] = {}
+
+    @classmethod
+    def from_reply(cls, reply: Dict[str, Any]) -> "DeltaEncoder":
+        return cls(reply["quantum"], reply["keyframe_interval"], reply["compression"])
+
+    def _encode_env(self, env_id: str, obs: Dict[str, Any], keyframe: bool) -> Tuple[Dict[str, Any], bytes]:
+        platforms = obs.get("platforms", [])
+        names = tuple(p.get("name") for p in platforms)
+        values = _platform_values(platforms)
+        entry = {"id": env_id, "sim_time": obs.get("sim_time"), "count": len(names)}
+        extra = {k: v for k, v in obs.items() if k not in _PASSTHROUGH}
+        if extra:
+            entry["extra"] = extra
+
+        state = self._states.get(env_id)
+        key = (keyframe or state is None or state.names != names or state.since_key >= self.keyframe_interval
+               or not np.isfinite(values).all())
+        if not key:
+            steps = np.rint((values - state.values) / self.quantum)
+            largest = np.abs(steps).max() if steps.size else 0.0
+            for dtype, code in _DELTA_DTYPES:
+                if largest <= np.iinfo(dtype).max:
+                    state.values = state.values + steps * self.quantum
+                    state.since_key += 1
+                    entry.update(key=False, dtype=code)
+                    return entry, steps.astype(dtype).tobytes()
+        # 关键帧
+        self._states[env_id] = _EnvState(names, values)
+        entry.update(key=True, dtype="f8", names=list(names))
+        return entry, values.tobytes()
+
+    def encode_frames(self, frames: Dict[str, Dict[str, Any]], status: str = "ok", msg: str = "",
+                      keyframe: bool = False) -> bytes:
+        """
+        编码 {env_id: 观测帧}
+        :param keyframe: 强制关键帧（reset / restore 之后）
+        """
+        entries, blocks = [], []
+        for env_id, obs in frames.items():
+            entry, block = self._encode_env(str(env_id), obs, keyframe)
+            entries.append(entry)
+            blocks.append(block)
+        header = json.dumps({"status": status, "msg": msg, "envs": entries}).encode("utf-8")
+        return CODEC_MAGIC + self._compress(b"".join([struct.pack('<I', len(header)), header] + blocks))
+
+    def encode_response(self, resp: Dict[str, Any], keyframe: bool = False) -> bytes:
+        """编码 {"status", "data": {env_id: {"obs": ...}}} 形式的回包"""
+        frames = {env_id: data["obs"] for env_id, data in resp.get("data", {}).items()}
+        return self.encode_frames(frames, resp.get("status", "ok"), resp.get("msg", ""), keyframe)
+
+
+class DeltaDecoder:
+    """客户端解码器，与服务端 DeltaEncoder 一一对应"""
+
+    def __init__(self, quantum: Sequence[float], compression: str = "none"):
+        self.quantum = np.asarray(quantum, dtype=np.float64)
+        self.compression = compression
+        self._decompress = _compression_registry[compression]()[1]
+        self._states: Dict[str, _EnvState] = {}
+
+    @classmethod
+    def from_reply(cls, reply: Dict[str, Any]) -> "DeltaDecoder":
+        if reply.get("compression") not in _compression_registry:
+            raise ValueError(f"服务端选择的压缩方式 {reply.get('compression')} 在本地不可用")
+        return cls(reply["quantum"], reply["compression"])
+
+    def decode_arrays(self, body: bytes) -> Tuple[Dict[str, Any], Dict[str, Tuple[Tuple[str, ...], np.ndarray]]]:
+        """
+        解码为 (头, {env_id: (平台名称, (count, F) float64 数组)})，不构造平台字典
+        返回的数组为解码器内部状态的只读视图
+        """
+        payload = self._decompress(body[len(CODEC_MAGIC):])
+        header_len = struct.unpack_from('<I', payload)[0]
+        header = json.loads(payload[4:4 + header_len])
+        offset = 4 + header_len
+        fields = len(PLATFORM_FIELDS)
+        arrays = {}
+        for entry in header["envs"]:
+            dtype = _DTYPES[entry["dtype"]]
+            count = entry["count"] * fields
+            block = np.frombuffer(payload, dtype=dtype, count=count, offset=offset).reshape(-1, fields)
+            offset += count * block.itemsize
+            env_id = entry["id"]
+            if entry["key"]:
+                state = self._states[env_id] = _EnvState(tuple(entry["names"]), block.astype(np.float64))
+            else:
+                state = self._states.get(env_id)
+                if state is None:
+                    raise ValueError(f"环境 {env_id} 收到增量帧但没有关键帧")
+                state.values = state.values + block * self.quantum
+            view = state.values.view()
+            view.flags.writeable = False
+            arrays[env_id] = (state.names, view)
+        return header, arrays
+
+    def decode_response(self, body: bytes) -> Dict[str, Any]:
+        """解码为与 JSON 回包相同结构的 {"status", "msg", "data": {env_id: {"obs": ...}}}"""
+        header, arrays = self.decode_arrays(body)
+        data = {}
+        for entry in header["envs"]:
+            names, values = arrays[entry["id"]]
+            obs = dict(entry.get("extra", {}))
+            obs["sim_time"] = entry["sim_time"]
+            obs["platforms"] = [dict(zip(PLATFORM_FIELDS, row), name=name) for row, name in zip(values.tolist(), names)]
+            data[entry["id"]] = {"obs": obs}
+        return {"status": header["status"], "msg": header.get("msg", ""), "data": data}
+
+
+def _benchmark(platforms: int = 200, steps: int = 500):
+    """JSON 与关键帧 + 增量编码的回包大小、编解码耗时和量化误差"""
+    import time
+
+    rng = np.random.default_rng(0)
+    names = [str(1001 + i) for i in range(platforms)]
+    state = np.column_stack([
+        24.0 + rng.uniform(-1, 1, platforms), 120.5 + rng.uniform(-1, 1, platforms),
+        rng.uniform(1000, 10000, platforms), rng.uniform(0, 360, platforms), rng.uniform(-10, 10, platforms),
+        rng.uniform(-30, 30, platforms), rng.uniform(200, 300, platforms), rng.normal(0, 200, (platforms, 3)),
+        rng.uniform(8000, 10000, platforms)])
+    rates = np.array([2e-5, 2e-5, 1.0, 0.5, 0.2, 1.0, 0.5, 0.5, 0.5, 0.5, 0.01])
+
+    responses = []
+    for t in range(steps):
+        state = state + rng.normal(0, 1, state.shape) * rates
+        state[:, 3] %= 360.0
+        obs = {"sim_time": 0.016 * (t + 1),
+               "platforms": [dict(zip(PLATFORM_FIELDS, row), name=n) for row, n in zip(state.tolist(), names)]}
+        responses.append({"status": "ok", "msg": "", "data": {"0": {"obs": obs}}})
+
+    start = time.perf_counter()
+    json_bodies = [json.dumps(r).encode("utf-8") for r in responses]
+    json_encode = time.perf_counter() - start
+    start = time.perf_counter()
+    for body in json_bodies:
+        json.loads(body)
+    json_decode = time.perf_counter() - start
+    json_bytes = sum(map(len, json_bodies))
+    print(f"{platforms} 个平台 × {steps} 步")
+    print(f"  {'json':<14} {json_bytes / steps / 1024:8.1f} KiB/步  编码 {json_encode / steps * 1e3:6.2f} ms  "
+          f"解码 {json_decode / steps * 1e3:6.2f} ms")
+
+    for compression in available_compressions():
+        reply, encoder = negotiate(codec_offer(compression=[compression]))
+        decoder = DeltaDecoder.from_reply(reply)
+        start = time.perf_counter()
+        bodies = [encoder.encode_response(r, keyframe=(i == 0)) for i, r in enumerate(responses)]
+        encode = time.perf_counter() - start
+        start = time.perf_counter()
+        decoded = [decoder.decode_response(b) for b in bodies]
+        decode = time.perf_counter() - start
+        start = time.perf_counter()
+        for b in bodies:
+            decoder.decode_arrays(b)
+        decode_arrays = time.perf_counter() - start
+        error = max((np.abs(_platform_values(d["data"]["0"]["obs"]["platforms"])
+                            - _platform_values(r["data"]["0"]["obs"]["platforms"])) / encoder.quantum).max()
+                    for d, r in zip(decoded, responses))
+        total = sum(map(len, bodies))
+        print(f"  {'delta+' + compression:<14} {total / steps / 1024:8.1f} KiB/步  编码 {encode / steps * 1e3:6.2f} ms  "
+              f"解码 {decode / steps * 1e3:6.2f} ms（仅数组 {decode_arrays / steps * 1e3:5.2f} ms）  "
+              f"压缩比 {json_bytes / total:5.1f}x  最大误差 {error:.2f} 步长")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="观测帧编码对比测试")
+    parser.add_argument("--platforms", type=int, default=200)
+    parser.add_argument("--steps", type=int, default=500)
+    args = parser.parse_args()
+    _benchmark(args.platforms, args.steps)
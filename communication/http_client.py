@@ -1,16 +1,49 @@
 import requests
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any
+from requests.adapters import HTTPAdapter
 
+from communication.client_base import SimulationClientBase, CAP_BATCH_STEP, CAP_BATCH_RESET, CAP_CUSTOM_STATES, CAP_SEEDS
 
-class SimulationClient:
-    def __init__(self, base_url: str, timeout: int = 30):
-        self.base_url = base_url
-        self.timeout = timeout
+
+class SimulationClient(SimulationClientBase):
+    """
+    HTTP 仿真客户端
+
+    使用长连接会话，单步通过合并的 /step 接口完成（动作上行、观测下行），每步一次往返；
+    服务端不支持 /step 时自动退回 /action + /environment 两次请求。
+    多环境可通过 /batch/step、/batch/reset 在一次请求内完成
+    """
+
+    transport = "http"
+
+    def __init__(self,
+                 base_url: str,
+                 timeout: float = 30,
+                 connect_timeout: float = 3.0,
+                 pool_connections: int = 4,
+                 pool_maxsize: int = 16):
+        """
+        Args:
+            base_url: 服务端地址，如 http://127.0.0.1:8080
+            timeout: 读超时（秒）
+            connect_timeout: 建连超时（秒），建连失败应尽快暴露，不必等满读超时
+            pool_connections: 连接池缓存的主机数
+            pool_maxsize: 每个主机保持的长连接数，多线程共享同一客户端时按线程数设置
+        """
+        super().__init__()
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, timeout)
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Connection": "keep-alive", "Content-Type": "application/json"})
+        # 服务端是否支持合并的 /step 接口，首次 404 后置为 False
+        self.supports_step = True
 
     def connect(self, env_name: str) -> bool:
-        """连接仿真服务端并选择环境"""
+        """连接仿真服务端并选择环境，随后查询服务端能力"""
         payload = {"environment": env_name}
         try:
             response = self.session.post(
@@ -18,45 +51,138 @@ class SimulationClient:
                 json=payload,
                 timeout=self.timeout
             )
-            return response.status_code == 200
-        except Exception as e:
+        except requests.RequestException as e:
             print(f"连接失败: {e}")
             return False
+        if response.status_code != 200:
+            print(f"连接失败: HTTP {response.status_code}")
+            return False
+        self.capabilities = self._query_capabilities()
+        return True
+
+    def _query_capabilities(self):
+        """GET /capabilities，服务端未实现时视为只支持单环境接口"""
+        response = self._get("/capabilities", "查询服务端能力")
+        if response.status_code == 200:
+            return frozenset(response.json().get("capabilities", []))
+        return frozenset()
+
+    def _get(self, path: str, what: str) -> requests.Response:
+        """GET 请求，网络错误转换为 ConnectionError"""
+        with self.profiler.stage("receive"):
+            try:
+                return self.session.get(f"{self.base_url}{path}", timeout=self.timeout)
+            except requests.RequestException as e:
+                raise ConnectionError(f"{what}失败: {e}") from e
+
+    def _post_json(self, path: str, payload: Any, what: str) -> requests.Response:
+        """序列化并发送 POST 请求，分别计入 send / receive 阶段，网络错误转换为 ConnectionError"""
+        with self.profiler.stage("send"):
+            body = json.dumps(payload) if payload is not None else None
+        with self.profiler.stage("receive"):
+            try:
+                return self.session.post(f"{self.base_url}{path}", data=body, timeout=self.timeout)
+            except requests.RequestException as e:
+                raise ConnectionError(f"{what}失败: {e}") from e
 
-    def get_environment_data(self) -> Optional[Dict[str, Any]]:
+    def _decode(self, response: requests.Response, what: str) -> Any:
+        """解析 200 回包，其他状态码抛出 RuntimeError"""
+        if response.status_code != 200:
+            raise RuntimeError(f"{what}失败: HTTP {response.status_code} {response.text[:200]}")
+        with self.profiler.stage("decode"):
+            return response.json()
+
+    def step(self, action: Dict[str, Any], env_id: str = "0") -> Dict[str, Any]:
+        """发送动作并取回执行后的环境数据，一次往返（单环境接口只对应 env 0）"""
+        if str(env_id) != "0":
+            if not self.supports(CAP_BATCH_STEP):
+                raise NotImplementedError(f"服务端不支持批量单步，单环境接口无法步进环境 {env_id}")
+            return self.step_batch({str(env_id): action})[str(env_id)]
+        if not self.supports_step:
+            self.send_action(action)
+            return self.get_environment_data()
+        response = self._post_json("/step", action, "单步交互")
+        if response.status_code == 404:
+            print("服务端不支持 /step，改用 /action + /environment")
+            self.supports_step = False
+            return self.step(action, env_id)
+        return self._decode(response, "单步交互")
+
+    def step_batch(self, actions: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        多环境单步，支持批量接口时一次请求
+        :param actions: {env_id: 动作字典}
+        :return: {env_id: 环境数据}
+        """
+        if not self.supports(CAP_BATCH_STEP):
+            if list(actions) != ["0"]:
+                raise NotImplementedError("服务端不支持批量单步")
+            return {"0": self.step(actions["0"])}
+        response = self._post_json("/batch/step", {"actions": actions}, "批量单步")
+        return self._decode(response, "批量单步")["observations"]
+
+    def reset_batch(self, env_ids, custom_states=None, seeds=None) -> Dict[str, Dict[str, Any]]:
+        """多环境重置，返回 {env_id: 初始环境数据}；服务端无批量接口时只能重置单个环境"""
+        env_ids = [str(i) for i in env_ids]
+        if custom_states:
+            self.require(CAP_CUSTOM_STATES)
+        if seeds:
+            self.require(CAP_SEEDS)
+        if not self.supports(CAP_BATCH_RESET):
+            if env_ids != ["0"]:
+                raise NotImplementedError("服务端不支持批量重置")
+            if custom_states or seeds:
+                raise NotImplementedError("服务端不支持批量重置，单环境 /reset 无法下发初始状态和随机种子")
+            self.reset_environment()
+            return {"0": self.get_environment_data()}
+        payload = {"env_ids": env_ids}
+        if custom_states:
+            payload["custom_states"] = custom_states
+        if seeds:
+            payload["seeds"] = seeds
+        response = self._post_json("/batch/reset", payload, "批量重置")
+        return self._decode(response, "批量重置")["observations"]
+
+    def get_environment_data(self) -> Dict[str, Any]:
         """从仿真服务端获取环境数据"""
-        try:
-            response = self.session.get(
-                f"{self.base_url}/environment",
-                timeout=self.timeout
-            )
-            if response.status_code == 200:
-                return response.json()
-        except Exception as e:
-            print(f"获取环境数据失败: {e}")
-        return None
+        return self._decode(self._get("/environment", "获取环境数据"), "获取环境数据")
 
     def send_action(self, action: Dict[str, Any]) -> bool:
         """发送动作到仿真服务端"""
-        try:
-            response = self.session.post(
-                f"{self.base_url}/action",
-                json=action,
-                timeout=self.timeout
-            )
-            return response.status_code == 200
-        except Exception as e:
-            print(f"发送动作失败: {e}")
-            return False
+        self._decode(self._post_json("/action", action, "发送动作"), "发送动作")
+        return True
 
     def reset_environment(self) -> bool:
         """重置环境"""
-        try:
-            response = self.session.post(
-                f"{self.base_url}/reset",
-                timeout=self.timeout
-            )
-            return response.status_code == 200
-        except Exception as e:
-            print(f"重置环境失败: {e}")
-            return False
\ No newline at end of file
+        self._decode(self._post_json("/reset", None, "重置环境"), "重置环境")
+        return True
+
+    def close(self):
+        """关闭会话，释放连接池"""
+        self.session.close()
+
+
+if __name__ == "__main__":
+    # 替身服务上对比合并的 /step 与 /action + /environment 两次请求的单步耗时
+    import argparse
+    import time
+    from communication.stub_http_server import start_stub_server
+
+    parser = argparse.ArgumentParser(description="HTTP 单步往返耗时对比")
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="替身服务每次步进的计算耗时")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(latency_ms=args.latency_ms)
+    action = {"throttle": 0.8, "pitch": 0.1, "roll": 0.0, "yaw": 0.0}
+    for label, supports_step in (("合并 /step", True), ("/action + /environment", False)):
+        client = SimulationClient(base_url)
+        client.connect("basic_combat")
+        client.supports_step = supports_step
+        client.step(action)  # 预热，建立长连接
+        start = time.perf_counter()
+        for _ in range(args.steps):
+            client.step(action)
+        print(f"{label:<24} 单步 {(time.perf_counter() - start) / args.steps * 1e3:6.3f} ms")
+        client.close()
+    server.shutdown()
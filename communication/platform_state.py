@@ -0,0 +1,171 @@
+"""
+平台状态层：把观测帧中的平台字典列表解码为 NumPy 结构化数组，并在各步之间缓存 名称→行号 映射
+
+    decoder = PlatformDecoder()
+    frame = decoder.decode(obs)          # obs = {"sim_time", "platforms": [...]}
+    plane = frame["1001"]                # O(1)，返回 __slots__ 视图
+    plane.alt, plane.heading
+    frame.column("alt")                  # 所有平台的高度列（视图）
+
+每个平台 11 个 float64 共 88 字节，远小于同样内容的 Python 字典，适合按步记录
+"""
+import math
+from operator import itemgetter
+from typing import Dict, Any, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+from communication.shm_transport import PLATFORM_FIELDS
+
+PLATFORM_DTYPE = np.dtype([(field, np.float64) for field in PLATFORM_FIELDS])
+
+_get_fields = itemgetter(*PLATFORM_FIELDS)
+
+
+class PlatformState:
+    """
+    单个平台的只读视图（不拷贝数据），字段与 PLATFORM_FIELDS 相同，外加 name
+    """
+
+    __slots__ = ("_states", "_row", "name")
+
+    def __init__(self, states: np.ndarray, row: int, name: str):
+        self._states = states
+        self._row = row
+        self.name = name
+
+    def to_dict(self) -> Dict[str, Any]:
+        record = self._states[self._row]
+        result = {field: float(record[field]) for field in PLATFORM_FIELDS}
+        result["name"] = self.name
+        return result
+
+    def __repr__(self):
+        return f"PlatformState({self.name}, lat={self.lat:.6f}, lon={self.lon:.6f}, alt={self.alt:.1f})"
+
+
+def _field_property(field: str):
+    return property(lambda self: float(self._states[field][self._row]), doc=field)
+
+
+for _field in PLATFORM_FIELDS:
+    setattr(PlatformState, _field, _field_property(_field))
+
+
+class PlatformFrame:
+    """一帧中所有平台的状态"""
+
+    __slots__ = ("sim_time", "states", "names", "index")
+
+    def __init__(self, sim_time: float, states: np.ndarray, names: Tuple[str, ...], index: Dict[str, int]):
+        self.sim_time = sim_time
+        self.states = states
+        self.names = names
+        self.index = index
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index
+
+    def __getitem__(self, name: str) -> PlatformState:
+        return PlatformState(self.states, self.index[name], name)
+
+    def __iter__(self) -> Iterator[PlatformState]:
+        for row, name in enumerate(self.names):
+            yield PlatformState(self.states, row, name)
+
+    def get(self, name: str) -> Optional[PlatformState]:
+        row = self.index.get(name)
+        return None if row is None else PlatformState(self.states, row, name)
+
+    def row(self, name: str) -> np.void:
+        """结构化数组中的一行"""
+        return self.states[self.index[name]]
+
+    def column(self, field: str) -> np.ndarray:
+        """所有平台某个字段的列视图"""
+        return self.states[field]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """还原为观测帧字典"""
+        return {"sim_time": self.sim_time, "platforms": [p.to_dict() for p in self]}
+
+
+class PlatformDecoder:
+    """
+    观测帧解码器
+
+    名称→行号映射只在平台名称序列变化时重建，连续各步复用同一个字典对象
+    """
+
+    def __init__(self):
+        self._names: Tuple[str, ...] = ()
+        self._index: Dict[str, int] = {}
+
+    def _index_for(self, names: Tuple[str, ...]) -> Dict[str, int]:
+        if names != self._names:
+            self._names = names
+            self._index = {name: row for row, name in enumerate(names)}
+        return self._index
+
+    def decode(self, frame: Dict[str, Any]) -> PlatformFrame:
+        """解码一个观测帧字典"""
+        platforms = frame.get("platforms", [])
+        try:
+            rows = [_get_fields(p) for p in platforms]
+        except KeyError:
+            # 字段不全的平台按 NaN 补齐
+            rows = [tuple(p.get(field, math.nan) for field in PLATFORM_FIELDS) for p in platforms]
+        states = np.array(rows, dtype=PLATFORM_DTYPE)
+        names = tuple(p.get("name") for p in platforms)
+        return PlatformFrame(frame.get("sim_time", 0.0), states, names, self._index_for(names))
+
+    def decode_arrays(self, obs: np.ndarray, count: int, names: Sequence[str], sim_time: float) -> PlatformFrame:
+        """
+        解码共享内存传输的观测数组（见 shm_transport）
+
+        Args:
+            obs: 单个环境的观测 (M, F+1)，最后一列为名称表下标
+            count: 平台数
+            names: 名称表
+            sim_time: 仿真时间
+        """
+        rows = obs[:count]
+        states = np.ascontiguousarray(rows[:, :len(PLATFORM_FIELDS)]).view(PLATFORM_DTYPE).reshape(count)
+        frame_names = tuple(names[int(i)] for i in rows[:, -1])
+        return PlatformFrame(float(sim_time), states, frame_names, self._index_for(frame_names))
+
+
+if __name__ == "__main__":
+    # 与字典列表线性查找对比：单次查找耗时、解码开销与单步记录内存
+    import sys
+    import timeit
+
+    count, number = 32, 20000
+    frame = {"sim_time": 1.0, "platforms": [
+        {"name": str(1001 + i), "lat": 24.0 + i, "lon": 120.5, "alt": 6000.0, "heading": 0.0, "pitch": 0.0,
+         "roll": 0.0, "speed": 250.0, "vx": 250.0, "vy": 0.0, "vz": 0.0, "mass": 9000.0} for i in range(count)]}
+    target = str(1001 + count - 1)
+
+    def find_plane_state(obs, plane_id):
+        for p in obs.get("platforms", []):
+            if p.get("name") == plane_id:
+                return p
+        return None
+
+    decoder = PlatformDecoder()
+    decoded = decoder.decode(frame)
+    scan_us = timeit.timeit(lambda: find_plane_state(frame, target)["alt"], number=number) / number * 1e6
+    index_us = timeit.timeit(lambda: decoded[target].alt, number=number) / number * 1e6
+    decode_us = timeit.timeit(lambda: decoder.decode(frame), number=number // 10) / (number // 10) * 1e6
+
+    dict_bytes = sum(sys.getsizeof(p) + sum(sys.getsizeof(v) for v in p.values()) for p in frame["platforms"])
+    print(f"{count} 架平台，查找最后一架:")
+    print(f"  字典线性查找  {scan_us:6.2f} us")
+    print(f"  索引查找      {index_us:6.2f} us")
+    print(f"  每帧解码      {decode_us:6.2f} us（名称映射跨步复用）")
+    print(f"单步记录内存: 字典 {dict_bytes} 字节，结构化数组 {decoded.states.nbytes} 字节")
+    assert decoded[target].to_dict() == find_plane_state(frame, target)
+    assert decoder.decode(frame).index is decoded.index
@@ -0,0 +1,37 @@
+"""
+与 AFSim C++ Server 之间的通信协议定义
+
+帧格式: 4字节小端无符号长度 + UTF-8 JSON 包体
+请求:   {"req_id": str, "cmd": str, "params": dict}
+回包:   {"status": "ok"/"error", "msg": str, "data": {env_id(str): {...}}}
+"""
+
+# ================= 命令 =================
+CMD_INIT = "init"          # {"count": int, "scenario": str, "codec": {...}（可选，观测编码提议，见 communication/codec.py）}
+CMD_RESET = "reset"        # {"env_ids": [int], "custom_states": {env_id: {...}}, "seeds": {env_id: int}}
+CMD_STEP = "step"          # {"steps": int, "actions": {env_id: {"objID": str, "vals": [float]}}}
+CMD_PAUSE = "pause"        # {"state": bool}
+CMD_CLOSE = "close"        # {"env_ids": [int]}
+
+# 场景状态快照：将指定环境的完整仿真状态导出为不透明数据块
+# 请求: {"env_ids": [int]}
+# 回包: data = {env_id: {"snapshot": str(base64), "sim_time": float}}
+CMD_SNAPSHOT = "snapshot"
+
+# 场景状态恢复：将快照写回任意环境（可以不是生成快照的环境），回包与 reset 相同
+# 请求: {"snapshots": {env_id: str(base64)}}
+# 回包: data = {env_id: {"obs": {...}}}
+CMD_RESTORE = "restore"
+
+# 订阅观测推送：在单独的连接上发送，回包之后服务端在该连接上持续推送帧（同样的长度前缀 JSON），
+# 直到客户端断开；推送不经过训练连接的请求循环
+# 请求: {"env_ids": [int]（缺省为全部）, "interval": float（推送间隔，仿真秒，0 为每步）, "queue": int（服务端发送队列长度）}
+# 回包: {"status": "ok", "data": {}}
+# 推送: {"status": "ok", "seq": int, "dropped": int（服务端累计丢弃帧数）,
+#        "data": {env_id: {"event": "reset"/"step", "obs": {...}}}}
+CMD_SUBSCRIBE = "subscribe"
+EVENT_RESET = "reset"
+EVENT_STEP = "step"
+
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
@@ -0,0 +1,102 @@
+import json
+from typing import Dict, Any, Iterable
+
+from communication.client_base import SimulationClientBase
+
+
+class RecordingClient(SimulationClientBase):
+    """
+    录制包装：把任意传输的 reset / step 观测帧按顺序写入 JSON Lines 文件，
+    之后可用 ReplayClient 离线回放
+    """
+
+    transport = "recording"
+
+    def __init__(self, inner: SimulationClientBase, path: str):
+        super().__init__()
+        self.inner = inner
+        self.path = path
+        self._file = None
+
+    @property
+    def profiler(self):
+        return self.inner.profiler
+
+    @profiler.setter
+    def profiler(self, value):
+        # 基类构造时 inner 尚未设置
+        if hasattr(self, "inner"):
+            self.inner.profiler = value
+
+    def connect(self, scenario: str) -> bool:
+        ok = self.inner.connect(scenario)
+        self.capabilities = self.inner.capabilities
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._file.write(json.dumps({"cmd": "init", "scenario": scenario,
+                                     "capabilities": sorted(self.capabilities)}) + "\n")
+        return ok
+
+    def step_batch(self, actions: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        frames = self.inner.step_batch(actions)
+        self._file.write(json.dumps({"cmd": "step", "frames": frames}) + "\n")
+        return frames
+
+    def reset_batch(self, env_ids: Iterable, custom_states=None, seeds=None) -> Dict[str, Dict[str, Any]]:
+        frames = self.inner.reset_batch(env_ids, custom_states, seeds)
+        self._file.write(json.dumps({"cmd": "reset", "frames": frames}) + "\n")
+        return frames
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.inner.close()
+
+
+class ReplayClient(SimulationClientBase):
+    """
+    回放传输：按录制顺序返回观测帧，不连接任何服务端
+
+    用于离线调试环境逻辑、对比特征提取/奖励改动前后的结果，以及测量不含网络开销的环境耗时。
+    loop=True 时录制数据用完后从头开始
+    """
+
+    transport = "replay"
+
+    def __init__(self, path: str, loop: bool = False):
+        super().__init__()
+        self.path = path
+        self.loop = loop
+        self._records = []
+        self._cursor = 0
+
+    def connect(self, scenario: str) -> bool:
+        with open(self.path, "r", encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        if records and records[0].get("cmd") == "init":
+            self.capabilities = frozenset(records[0].get("capabilities", []))
+            records = records[1:]
+        self._records = records
+        self._cursor = 0
+        return bool(self._records)
+
+    def _next(self, command: str) -> Dict[str, Dict[str, Any]]:
+        """取下一条指定类型的记录"""
+        for _ in range(2 if self.loop else 1):
+            while self._cursor < len(self._records):
+                record = self._records[self._cursor]
+                self._cursor += 1
+                if record["cmd"] == command:
+                    return record["frames"]
+            self._cursor = 0
+        raise EOFError(f"回放数据中没有更多的 {command} 记录")
+
+    def step_batch(self, actions: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        with self.profiler.stage("receive"):
+            return self._next("step")
+
+    def reset_batch(self, env_ids: Iterable, custom_states=None, seeds=None) -> Dict[str, Dict[str, Any]]:
+        return self._next("reset")
+
+    def close(self):
+        self._records = []
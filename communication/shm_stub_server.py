@@ -0,0 +1,192 @@
+"""
+共享内存传输的本地仿真替身（服务端一侧），以及与 TCP 路径的传输延迟对比
+
+运行替身:   python -m communication.shm_stub_server --name afsim_shm --num-envs 4
+对比测试:   python -m communication.shm_stub_server --benchmark --steps 5000
+"""
+import argparse
+import json
+import multiprocessing
+import socket
+import time
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+
+from communication.shm_transport import (ShmLayout, DEFAULT_SPIN_ITERATIONS, Doorbell, SharedMemoryClient, PLATFORM_FIELDS, wait_for_seq,
+                                         H_REQ_SEQ, H_RESP_SEQ, H_SERVER_STATE, H_NAMES_LEN, H_NAMES_VERSION,
+                                         SERVER_READY, SERVER_CLOSED, STATUS_OK, STATUS_ERROR,
+                                         SHM_CMD_STEP, SHM_CMD_RESET, SHM_CMD_CLOSE)
+from communication.stub_tcp_server import StubScenario, StubTCPServer
+from communication.tcp_client import SimulationClient as TCPSimulationClient
+
+
+class SharedMemoryStubServer:
+    """创建共享内存并按顺序处理请求槽位的替身仿真进程"""
+
+    def __init__(self, name: str, num_envs: int = 1, action_dim: int = 4, max_platforms: int = 8,
+                 ring_size: int = 4, latency_ms: float = 0.0, spin_iterations: int = DEFAULT_SPIN_ITERATIONS,
+                 request_doorbell: Optional[Doorbell] = None, response_doorbell: Optional[Doorbell] = None):
+        self.layout = ShmLayout(num_envs, action_dim, max_platforms, ring_size)
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=self.layout.total_size)
+        self.header, self.names, self.slots = self.layout.views(self.shm.buf)
+        self.layout.write_header(self.header)
+        self.scenario = StubScenario(count=num_envs)
+        self.latency_s = latency_ms / 1000.0
+        self.spin_iterations = spin_iterations
+        self.request_doorbell = request_doorbell or Doorbell()
+        self.response_doorbell = response_doorbell or Doorbell()
+        self._write_names([self.scenario.platform_name])
+
+    def _write_names(self, names):
+        raw = json.dumps(names).encode("utf-8")
+        self.names[:len(raw)] = np.frombuffer(raw, dtype=np.uint8)
+        self.header[H_NAMES_LEN] = len(raw)
+        self.header[H_NAMES_VERSION] += 1
+
+    def _write_obs(self, slot, env_id: int):
+        platform = self.scenario.platform(env_id)
+        row = slot["obs"][env_id, 0]
+        for i, field in enumerate(PLATFORM_FIELDS):
+            row[i] = platform[field]
+        row[-1] = 0  # 名称表下标
+        slot["counts"][env_id] = 1
+        slot["sim_time"][env_id] = self.scenario.sim_time[env_id]
+
+    def handle(self, slot) -> bool:
+        """处理一个槽位，返回是否继续服务"""
+        cmd = int(slot["slot_header"][0])
+        env_ids = np.flatnonzero(slot["action_mask"]).tolist()
+        if cmd == SHM_CMD_STEP:
+            if self.latency_s:
+                time.sleep(self.latency_s)
+            for env_id in env_ids:
+                self.scenario.step(env_id, slot["actions"][env_id].tolist())
+                self._write_obs(slot, env_id)
+        elif cmd == SHM_CMD_RESET:
+            length = int(slot["slot_header"][2])
+            params = json.loads(bytes(slot["params"][:length])) if length else {}
+            custom = params.get("custom_states", {})
+            for env_id in env_ids:
+                self.scenario.reset(env_id, custom.get(str(env_id)))
+                self._write_obs(slot, env_id)
+        elif cmd == SHM_CMD_CLOSE:
+            return False
+        else:
+            slot["slot_header"][1] = STATUS_ERROR
+            return True
+        slot["slot_header"][1] = STATUS_OK
+        return True
+
+    def serve_forever(self):
+        self.header[H_SERVER_STATE] = SERVER_READY
+        processed = int(self.header[H_RESP_SEQ])
+        running = True
+        try:
+            while running:
+                try:
+                    wait_for_seq(self.header, H_REQ_SEQ, processed + 1, self.request_doorbell,
+                                 self.spin_iterations, timeout=1.0)
+                except TimeoutError:
+                    continue
+                slot = self.slots[processed % self.layout.ring_size]
+                running = self.handle(slot)
+                processed += 1
+                self.header[H_RESP_SEQ] = processed
+                self.response_doorbell.ring()
+        finally:
+            self.header[H_SERVER_STATE] = SERVER_CLOSED
+            self.close()
+
+    def close(self):
+        self.header = self.names = self.slots = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _serve(name, num_envs, latency_ms, request_doorbell, response_doorbell):
+    SharedMemoryStubServer(name, num_envs=num_envs, latency_ms=latency_ms,
+                           request_doorbell=request_doorbell, response_doorbell=response_doorbell).serve_forever()
+
+
+def spawn_stub_server(name: str, num_envs: int = 1, latency_ms: float = 0.0):
+    """
+    以子进程启动替身，并创建双方共享的 eventfd 门铃（fork 继承）
+    返回 (进程, 未连接的 SharedMemoryClient)
+    """
+    request_doorbell = Doorbell.create()
+    response_doorbell = Doorbell.create()
+    ctx = multiprocessing.get_context("fork")
+    process = ctx.Process(target=_serve, args=(name, num_envs, latency_ms, request_doorbell, response_doorbell),
+                          daemon=True)
+    process.start()
+    client = SharedMemoryClient(name, request_doorbell=request_doorbell, response_doorbell=response_doorbell)
+    return process, client
+
+
+def _percentiles(samples_ns):
+    samples = np.sort(np.asarray(samples_ns)) / 1000.0
+    return {p: float(samples[int(len(samples) * p / 100) - 1]) for p in (50, 90, 99)}
+
+
+def benchmark(steps: int = 5000):
+    """同一替身场景下，对比共享内存与 TCP 回环的单步往返延迟（微秒）"""
+    action = [0.5, 0.0, 0.0, 1.0]
+
+    # 共享内存
+    process, client = spawn_stub_server(f"afsim_bench_{int(time.time())}")
+    client.connect("testWzz")
+    client.reset_batch([0])
+    frames_ns, arrays_ns = [], []
+    actions = np.array([action])
+    for _ in range(steps):
+        t = time.perf_counter_ns()
+        client.step_batch({"0": action})
+        frames_ns.append(time.perf_counter_ns() - t)
+    for _ in range(steps):
+        t = time.perf_counter_ns()
+        client.step_arrays(actions)
+        arrays_ns.append(time.perf_counter_ns() - t)
+    client.close()
+    process.join(timeout=5)
+
+    # TCP 回环
+    probe = socket.socket()
+    probe.bind(("127.0.0.1", 0))
+    port = probe.getsockname()[1]
+    probe.close()
+    ctx = multiprocessing.get_context("fork")
+    tcp_process = ctx.Process(target=lambda: StubTCPServer("127.0.0.1", port).serve_forever(), daemon=True)
+    tcp_process.start()
+    time.sleep(0.3)
+    tcp_client = TCPSimulationClient("127.0.0.1", port)
+    tcp_client.connect("testWzz")
+    tcp_ns = []
+    for _ in range(steps):
+        t = time.perf_counter_ns()
+        tcp_client.step_batch({"0": action})
+        tcp_ns.append(time.perf_counter_ns() - t)
+    tcp_client.close()
+    tcp_process.terminate()
+
+    print(f"单步往返延迟 (微秒, {steps} 步)")
+    for label, samples in (("shm step_arrays", arrays_ns), ("shm step_batch", frames_ns), ("tcp step_batch", tcp_ns)):
+        p = _percentiles(samples)
+        print(f"  {label:<16} p50={p[50]:8.1f}  p90={p[90]:8.1f}  p99={p[99]:8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="共享内存仿真替身")
+    parser.add_argument("--name", default="afsim_shm")
+    parser.add_argument("--num-envs", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--benchmark", action="store_true", help="与 TCP 路径对比单步延迟")
+    parser.add_argument("--steps", type=int, default=5000)
+    args = parser.parse_args()
+    if args.benchmark:
+        benchmark(args.steps)
+    else:
+        server = SharedMemoryStubServer(args.name, num_envs=args.num_envs, latency_ms=args.latency_ms)
+        print(f"√ 共享内存替身已启动: {args.name}")
+        server.serve_forever()
@@ -0,0 +1,334 @@
+"""
+共享内存传输：训练进程与同机的仿真进程通过 multiprocessing.shared_memory 交换定长数值数据，
+不经过 TCP 回环，也不做 JSON 编解码
+
+内存布局（全部 8 字节对齐）:
+    header   int64[16]                    全局头，见 H_* 下标
+    names    uint8[NAMES_CAPACITY]        平台名称表（JSON 列表），名称变化时服务端重写并递增版本号
+    slot * ring_size                      请求/回包环形缓冲区，每个槽位:
+        slot_header  int64[4]             cmd / status / param_len / seq
+        actions      float64[E, A]        各环境动作
+        action_mask  int64[E]             本次请求涉及的环境
+        params       uint8[P]             变长参数（JSON，仅 reset 的 custom_states / seeds 使用）
+        obs          float64[E, M, F+1]   观测，最后一列为名称表下标
+        counts       int64[E]             各环境平台数
+        sim_time     float64[E]
+E=环境数 A=动作维度 M=每环境最大平台数 F=PLATFORM_FIELDS 字段数
+
+同步：请求方写完槽位后递增 req_seq，服务方写完回包后递增 resp_seq；
+等待方先自旋，超过自旋次数后阻塞在 eventfd 上（由父进程创建并继承），没有 eventfd 时退化为短睡眠轮询
+"""
+import json
+import os
+import select
+import time
+from multiprocessing import shared_memory, resource_tracker
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+import numpy as np
+
+from communication.client_base import SimulationClientBase, CAP_BATCH_STEP, CAP_BATCH_RESET, CAP_CUSTOM_STATES, CAP_SEEDS
+
+# 观测中每个平台的数值字段，顺序即共享内存中的列顺序
+PLATFORM_FIELDS = ("lat", "lon", "alt", "heading", "pitch", "roll", "speed", "vx", "vy", "vz", "mass")
+
+SHM_MAGIC = 0x4146534D  # "AFSM"
+SHM_VERSION = 1
+NAMES_CAPACITY = 16384
+
+# header 下标
+H_MAGIC, H_VERSION, H_NUM_ENVS, H_ACTION_DIM, H_MAX_PLATFORMS, H_NUM_FIELDS, H_RING_SIZE, \
+    H_PARAM_CAPACITY, H_REQ_SEQ, H_RESP_SEQ, H_SERVER_STATE, H_NAMES_LEN, H_NAMES_VERSION = range(13)
+HEADER_LEN = 16
+
+# 槽位命令
+SHM_CMD_STEP = 1
+SHM_CMD_RESET = 2
+SHM_CMD_CLOSE = 3
+
+# 服务端状态
+SERVER_READY = 1
+SERVER_CLOSED = 2
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+# 自旋只在对端运行于另一个核心时有意义，单核机器上自旋会占住对端需要的 CPU
+DEFAULT_SPIN_ITERATIONS = 2000 if (os.cpu_count() or 1) > 1 else 0
+
+
+class ShmLayout:
+    """根据尺寸参数计算偏移，并在给定缓冲区上建立 numpy 视图"""
+
+    def __init__(self, num_envs: int, action_dim: int, max_platforms: int,
+                 ring_size: int = 4, param_capacity: int = 65536):
+        self.num_envs = num_envs
+        self.action_dim = action_dim
+        self.max_platforms = max_platforms
+        self.num_fields = len(PLATFORM_FIELDS)
+        self.ring_size = ring_size
+        self.param_capacity = (param_capacity + 7) // 8 * 8
+
+        e, a, m, f = num_envs, action_dim, max_platforms, self.num_fields + 1
+        self._slot_parts = (
+            ("slot_header", np.int64, (4,)),
+            ("actions", np.float64, (e, a)),
+            ("action_mask", np.int64, (e,)),
+            ("params", np.uint8, (self.param_capacity,)),
+            ("obs", np.float64, (e, m, f)),
+            ("counts", np.int64, (e,)),
+            ("sim_time", np.float64, (e,)),
+        )
+        self.slot_size = sum(int(np.prod(shape)) * np.dtype(dtype).itemsize for _, dtype, shape in self._slot_parts)
+        self.slots_offset = HEADER_LEN * 8 + NAMES_CAPACITY
+        self.total_size = self.slots_offset + self.slot_size * ring_size
+
+    @classmethod
+    def from_header(cls, buf) -> "ShmLayout":
+        header = np.ndarray((HEADER_LEN,), dtype=np.int64, buffer=buf)
+        if header[H_MAGIC] != SHM_MAGIC or header[H_VERSION] != SHM_VERSION:
+            raise RuntimeError("共享内存布局不匹配")
+        return cls(int(header[H_NUM_ENVS]), int(header[H_ACTION_DIM]), int(header[H_MAX_PLATFORMS]),
+                   int(header[H_RING_SIZE]), int(header[H_PARAM_CAPACITY]))
+
+    def write_header(self, header: np.ndarray):
+        header[:] = 0
+        header[H_MAGIC] = SHM_MAGIC
+        header[H_VERSION] = SHM_VERSION
+        header[H_NUM_ENVS] = self.num_envs
+        header[H_ACTION_DIM] = self.action_dim
+        header[H_MAX_PLATFORMS] = self.max_platforms
+        header[H_NUM_FIELDS] = self.num_fields
+        header[H_RING_SIZE] = self.ring_size
+        header[H_PARAM_CAPACITY] = self.param_capacity
+
+    def views(self, buf) -> Tuple[np.ndarray, np.ndarray, list]:
+        """返回 (header, names, [每个槽位的 {名称: 视图}])"""
+        header = np.ndarray((HEADER_LEN,), dtype=np.int64, buffer=buf)
+        names = np.ndarray((NAMES_CAPACITY,), dtype=np.uint8, buffer=buf, offset=HEADER_LEN * 8)
+        slots = []
+        for i in range(self.ring_size):
+            offset = self.slots_offset + i * self.slot_size
+            slot = {}
+            for name, dtype, shape in self._slot_parts:
+                slot[name] = np.ndarray(shape, dtype=dtype, buffer=buf, offset=offset)
+                offset += int(np.prod(shape)) * np.dtype(dtype).itemsize
+            slots.append(slot)
+        return header, names, slots
+
+
+class Doorbell:
+    """单向通知：有 eventfd 时阻塞等待，否则短睡眠轮询"""
+
+    def __init__(self, fd: Optional[int] = None):
+        self.fd = fd
+
+    @staticmethod
+    def create() -> "Doorbell":
+        if hasattr(os, "eventfd"):
+            return Doorbell(os.eventfd(0, os.EFD_NONBLOCK))
+        return Doorbell()
+
+    def ring(self):
+        if self.fd is not None:
+            os.eventfd_write(self.fd, 1)
+
+    def wait(self, timeout: float):
+        if self.fd is None:
+            time.sleep(min(timeout, 50e-6))
+            return
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if readable:
+            try:
+                os.eventfd_read(self.fd)
+            except BlockingIOError:
+                pass
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+def wait_for_seq(header: np.ndarray, index: int, target: int, doorbell: Doorbell,
+                 spin_iterations: int, timeout: float, closed_check=None):
+    """等待 header[index] >= target：先自旋，再阻塞在门铃上"""
+    for _ in range(spin_iterations):
+        if header[index] >= target:
+            return
+    deadline = time.perf_counter() + timeout
+    while header[index] < target:
+        if closed_check is not None and closed_check():
+            raise ConnectionError("对端已关闭")
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            raise TimeoutError("共享内存等待超时")
+        doorbell.wait(min(remaining, 0.05))
+
+
+def decode_names(names: np.ndarray, length: int) -> list:
+    return json.loads(bytes(names[:length]).decode("utf-8")) if length else []
+
+
+class SharedMemoryClient(SimulationClientBase):
+    """
+    共享内存传输的仿真客户端
+
+    step_batch / reset_batch 返回与其他传输相同的观测帧字典；
+    对性能敏感的调用方可以用 step_arrays 直接拿到共享内存中的观测数组视图，完全不构造 Python 对象
+    """
+
+    transport = "shm"
+
+    def __init__(self, name: str, spin_iterations: int = DEFAULT_SPIN_ITERATIONS, timeout: float = 10.0,
+                 request_doorbell: Optional[Doorbell] = None, response_doorbell: Optional[Doorbell] = None):
+        """
+        Args:
+            name: 共享内存名称，由仿真进程创建
+            spin_iterations: 进入阻塞等待前的自旋次数
+            timeout: 单次请求超时（秒）
+            request_doorbell / response_doorbell: 与仿真进程共享的 eventfd 门铃，None 时轮询
+        """
+        super().__init__()
+        self.name = name
+        self.spin_iterations = spin_iterations
+        self.timeout = timeout
+        self.request_doorbell = request_doorbell or Doorbell()
+        self.response_doorbell = response_doorbell or Doorbell()
+        self.shm = None
+        self._seq = 0
+        self._names = []
+        self._names_version = -1
+
+    def connect(self, scenario: str) -> bool:
+        deadline = time.time() + self.timeout
+        while True:
+            try:
+                self.shm = shared_memory.SharedMemory(name=self.name)
+                break
+            except FileNotFoundError:
+                if time.time() > deadline:
+                    print(f"× 共享内存 {self.name} 不存在，请确认仿真进程已启动")
+                    return False
+                time.sleep(0.05)
+        # 共享内存由仿真进程负责释放，客户端退出时不应由 resource_tracker 删除
+        try:
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        except Exception:
+            pass
+        header = np.ndarray((HEADER_LEN,), dtype=np.int64, buffer=self.shm.buf)
+        while header[H_SERVER_STATE] != SERVER_READY:
+            if time.time() > deadline:
+                print("× 等待共享内存仿真进程就绪超时")
+                return False
+            time.sleep(0.01)
+        self.layout = ShmLayout.from_header(self.shm.buf)
+        self.header, self.names, self.slots = self.layout.views(self.shm.buf)
+        self._seq = int(self.header[H_REQ_SEQ])
+        self.capabilities = frozenset({CAP_BATCH_STEP, CAP_BATCH_RESET, CAP_CUSTOM_STATES, CAP_SEEDS})
+        return True
+
+    # ---------- 请求 / 等待 ----------
+    def _submit(self, cmd: int, actions=None, env_ids: Iterable = (), params: Optional[dict] = None) -> int:
+        """写入一个槽位并通知仿真进程，返回请求序号；环形缓冲区写满时先等最早的请求完成"""
+        seq = self._seq + 1
+        if seq - self.header[H_RESP_SEQ] > self.layout.ring_size:
+            self._wait(seq - self.layout.ring_size)
+        slot = self.slots[(seq - 1) % self.layout.ring_size]
+        with self.profiler.stage("send"):
+            slot["action_mask"][:] = 0
+            for env_id in env_ids:
+                slot["action_mask"][int(env_id)] = 1
+            if isinstance(actions, np.ndarray):
+                slot["actions"][:, :actions.shape[1]] = actions
+            elif actions is not None:
+                for env_id, action in actions.items():
+                    slot["actions"][int(env_id), :len(action)] = action
+            if params:
+                raw = json.dumps(params).encode("utf-8")
+                slot["params"][:len(raw)] = np.frombuffer(raw, dtype=np.uint8)
+                slot["slot_header"][2] = len(raw)
+            else:
+                slot["slot_header"][2] = 0
+            slot["slot_header"][0] = cmd
+            slot["slot_header"][3] = seq
+            self._seq = seq
+            self.header[H_REQ_SEQ] = seq
+            self.request_doorbell.ring()
+        return seq
+
+    def _wait(self, seq: int) -> dict:
+        with self.profiler.stage("receive"):
+            wait_for_seq(self.header, H_RESP_SEQ, seq, self.response_doorbell, self.spin_iterations, self.timeout,
+                         closed_check=lambda: self.header[H_SERVER_STATE] == SERVER_CLOSED)
+        slot = self.slots[(seq - 1) % self.layout.ring_size]
+        if slot["slot_header"][1] != STATUS_OK:
+            raise RuntimeError("共享内存仿真进程返回错误")
+        return slot
+
+    @property
+    def platform_names(self) -> list:
+        """当前平台名称表，观测数组最后一列是其下标（可配合 platform_state.PlatformDecoder.decode_arrays）"""
+        if self.header[H_NAMES_VERSION] != self._names_version:
+            self._names_version = int(self.header[H_NAMES_VERSION])
+            self._names = decode_names(self.names, int(self.header[H_NAMES_LEN]))
+        return self._names
+
+    def _frames(self, slot: dict) -> Dict[str, Dict[str, Any]]:
+        """把槽位中的观测数组转换为观测帧字典"""
+        with self.profiler.stage("decode"):
+            names = self.platform_names
+            frames = {}
+            for env_id in np.flatnonzero(slot["action_mask"]):
+                rows = slot["obs"][env_id, :slot["counts"][env_id]].tolist()
+                platforms = []
+                for row in rows:
+                    platform = dict(zip(PLATFORM_FIELDS, row))
+                    platform["name"] = names[int(row[-1])]
+                    platforms.append(platform)
+                frames[str(env_id)] = {"sim_time": float(slot["sim_time"][env_id]), "platforms": platforms}
+            return frames
+
+    # ---------- SimulationClientBase ----------
+    def step_batch(self, actions: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        return self._frames(self._wait(self._submit(SHM_CMD_STEP, actions, actions.keys())))
+
+    def reset_batch(self, env_ids: Iterable, custom_states=None, seeds=None) -> Dict[str, Dict[str, Any]]:
+        env_ids = [int(i) for i in env_ids]
+        params = {}
+        if custom_states:
+            params["custom_states"] = {str(k): v for k, v in custom_states.items()}
+        if seeds:
+            params["seeds"] = {str(k): int(v) for k, v in seeds.items()}
+        return self._frames(self._wait(self._submit(SHM_CMD_RESET, None, env_ids, params)))
+
+    def action_buffer(self) -> np.ndarray:
+        """
+        下一次请求将使用的槽位中的动作数组 (E, A)，调用方（如动作适配器）可直接写入，
+        随后调用 step_arrays() 不传 actions 即可发送，省去一次拷贝
+        """
+        seq = self._seq + 1
+        if seq - self.header[H_RESP_SEQ] > self.layout.ring_size:
+            self._wait(seq - self.layout.ring_size)
+        return self.slots[(seq - 1) % self.layout.ring_size]["actions"]
+
+    def step_arrays(self, actions: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        全部环境一起步进，actions 形状 (E, A)；None 表示动作已写入 action_buffer()
+        返回共享内存中的 (obs[E, M, F+1], counts[E], sim_time[E]) 视图，在下一次使用同一槽位前有效
+        """
+        if actions is not None:
+            actions = np.asarray(actions, dtype=np.float64)
+        seq = self._submit(SHM_CMD_STEP, actions, range(self.layout.num_envs))
+        slot = self._wait(seq)
+        return slot["obs"], slot["counts"], slot["sim_time"]
+
+    def close(self):
+        if self.shm is not None:
+            try:
+                self._submit(SHM_CMD_CLOSE)
+            except Exception:
+                pass
+            self.header = self.names = self.slots = None
+            self.shm.close()
+            self.shm = None
@@ -0,0 +1,57 @@
+import time
+from collections import OrderedDict
+from typing import Optional, List
+
+
+class ScenarioSnapshot:
+    """一次场景快照：服务端返回的不透明数据块及其元信息"""
+
+    __slots__ = ("name", "blob", "source_env_id", "sim_time", "created_at", "meta")
+
+    def __init__(self, name: str, blob: str, source_env_id: int, sim_time: float = 0.0, meta: dict = None):
+        self.name = name
+        self.blob = blob
+        self.source_env_id = source_env_id
+        self.sim_time = sim_time
+        self.created_at = time.time()
+        self.meta = meta or {}
+
+
+class SnapshotCache:
+    """
+    客户端命名快照缓存（LRU）
+
+    快照数据块由服务端生成，客户端不解析内容，只负责按名字保存与取回；
+    超出容量时淘汰最久未使用的快照
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, ScenarioSnapshot]" = OrderedDict()
+
+    def put(self, snapshot: ScenarioSnapshot):
+        self._entries[snapshot.name] = snapshot
+        self._entries.move_to_end(snapshot.name)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, name: str) -> Optional[ScenarioSnapshot]:
+        snapshot = self._entries.get(name)
+        if snapshot is not None:
+            self._entries.move_to_end(name)
+        return snapshot
+
+    def remove(self, name: str):
+        self._entries.pop(name, None)
+
+    def names(self) -> List[str]:
+        return list(self._entries.keys())
+
+    def clear(self):
+        self._entries.clear()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
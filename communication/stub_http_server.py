@@ -0,0 +1,167 @@
+"""
+本地 HTTP 仿真替身服务，实现 http_client.SimulationClient 用到的全部接口，
+用于在没有 AFSim 的机器上调试环境和测量客户端开销
+
+运行: python -m communication.stub_http_server --port 8080 --latency-ms 2
+"""
+import argparse
+import json
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any
+
+
+class _StubEnvironment:
+    """单个替身环境：匀速直线运动的本机与一架敌机"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.sim_time = 0.0
+        self.own = {"X": 0.0, "Y": 0.0, "Z": 6000.0}
+        self.enemy = {"X": 0.0, "Y": 20000.0, "Z": 6000.0}
+        self.velocity = 250.0
+        self.heading = 0.0
+        self.pitch = 0.0
+        self.roll = 0.0
+        self.fuel = 3000.0
+
+    def apply(self, action: Dict[str, Any], dt: float = 0.1):
+        self.sim_time += dt
+        self.velocity = max(100.0, min(500.0, self.velocity + 20.0 * (float(action.get("throttle", 0.5)) - 0.5)))
+        self.pitch = 30.0 * float(action.get("pitch", 0.0))
+        self.roll = 60.0 * float(action.get("roll", 0.0))
+        self.heading = (self.heading + 3.0 * float(action.get("roll", 0.0))) % 360.0
+        h, p = math.radians(self.heading), math.radians(self.pitch)
+        self.own["X"] += self.velocity * dt * math.sin(h) * math.cos(p)
+        self.own["Y"] += self.velocity * dt * math.cos(h) * math.cos(p)
+        self.own["Z"] += self.velocity * dt * math.sin(p)
+        self.enemy["Y"] -= 200.0 * dt
+        self.fuel = max(0.0, self.fuel - 0.5)
+
+    def data(self) -> Dict[str, Any]:
+        return {
+            "sim_time": self.sim_time,
+            "ownship": {
+                "position": dict(self.own), "velocity": self.velocity, "altitude": self.own["Z"],
+                "heading": self.heading, "pitch": self.pitch, "roll": self.roll,
+                "fuel_remaining": self.fuel, "max_fuel": 3000.0,
+            },
+            "enemies": [{
+                "position": dict(self.enemy), "velocity": 200.0, "altitude": self.enemy["Z"],
+                "heading": 180.0, "pitch": 0.0, "roll": 0.0,
+            }],
+            "weapons": {"missiles_remaining": 4, "gun_ammo": 500},
+            "damage": {"total_damage": 0.0},
+            "combat_results": {},
+        }
+
+
+class StubSimulationServer(ThreadingHTTPServer):
+    """持有全部替身环境状态的 HTTP 服务"""
+
+    daemon_threads = True
+
+    def __init__(self, address, latency_ms: float = 0.0):
+        super().__init__(address, _StubHandler)
+        self.latency_s = latency_ms / 1000.0
+        self.envs: Dict[str, _StubEnvironment] = {"0": _StubEnvironment()}
+        self.lock = threading.Lock()
+
+    def env(self, env_id: str = "0") -> _StubEnvironment:
+        if env_id not in self.envs:
+            self.envs[env_id] = _StubEnvironment()
+        return self.envs[env_id]
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 才能保持长连接
+    protocol_version = "HTTP/1.1"
+    # 头和包体分两次写出，关闭 Nagle 避免与客户端延迟确认叠加出 40ms 停顿
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length)) if length else {}
+
+    def _reply(self, payload: Any = None, status: int = 200):
+        body = json.dumps(payload if payload is not None else {}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _simulate(self):
+        if self.server.latency_s:
+            time.sleep(self.server.latency_s)
+
+    def do_GET(self):
+        if self.path == "/environment":
+            with self.server.lock:
+                self._reply(self.server.env().data())
+        elif self.path == "/capabilities":
+            self._reply({"capabilities": ["batch_step", "batch_reset"]})
+        else:
+            self._reply({"msg": "not found"}, 404)
+
+    def do_POST(self):
+        payload = self._read_json()
+        server = self.server
+        with server.lock:
+            if self.path == "/connect":
+                self._reply({"status": "ok"})
+            elif self.path == "/reset":
+                server.env().reset()
+                self._reply({"status": "ok"})
+            elif self.path == "/action":
+                self._simulate()
+                server.env().apply(payload)
+                self._reply({"status": "ok"})
+            elif self.path == "/step":
+                self._simulate()
+                env = server.env()
+                env.apply(payload)
+                self._reply(env.data())
+            elif self.path == "/batch/step":
+                self._simulate()
+                observations = {}
+                for env_id, action in payload.get("actions", {}).items():
+                    env = server.env(env_id)
+                    env.apply(action)
+                    observations[env_id] = env.data()
+                self._reply({"observations": observations})
+            elif self.path == "/batch/reset":
+                observations = {}
+                for env_id in payload.get("env_ids", []):
+                    env = server.env(env_id)
+                    env.reset()
+                    observations[env_id] = env.data()
+                self._reply({"observations": observations})
+            else:
+                self._reply({"msg": "not found"}, 404)
+
+
+def start_stub_server(host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0):
+    """在后台线程启动替身服务，port=0 时自动分配端口，返回 (server, base_url)"""
+    server = StubSimulationServer((host, port), latency_ms=latency_ms)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AFSim HTTP 替身服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="每次步进模拟的服务端计算耗时")
+    args = parser.parse_args()
+    server = StubSimulationServer((args.host, args.port), latency_ms=args.latency_ms)
+    print(f"√ HTTP 替身服务已启动 http://{args.host}:{args.port}")
+    server.serve_forever()
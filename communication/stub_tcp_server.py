@@ -0,0 +1,293 @@
+"""
+本地 TCP 仿真替身服务，实现 tcp_client.SimulationClient 使用的长度前缀 JSON 协议
+（init / reset / step / snapshot / restore / subscribe / close），用于在没有 AFSim 的机器上调试和测量
+
+运行: python -m communication.stub_tcp_server --port 8888 --latency-ms 5
+"""
+import argparse
+import base64
+import json
+import math
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+from communication import protocol
+from communication.codec import negotiate
+from communication.client_base import (CAP_BATCH_STEP, CAP_BATCH_RESET, CAP_CUSTOM_STATES, CAP_SEEDS,
+                                       CAP_SNAPSHOT, CAP_SUBSCRIBE)
+
+STUB_CAPABILITIES = sorted({CAP_BATCH_STEP, CAP_BATCH_RESET, CAP_CUSTOM_STATES, CAP_SEEDS, CAP_SNAPSHOT, CAP_SUBSCRIBE})
+
+
+class StubScenario:
+    """
+    替身场景：每个环境一架飞机，按 [升降舵, 副翼, 方向舵, 油门] 做简单运动学积分，
+    输出字段与 AFSim 平台数据一致
+    """
+
+    def __init__(self, count: int = 1, platform_name: str = "1001", dt: float = 0.016):
+        self.count = count
+        self.platform_name = platform_name
+        self.dt = dt
+        self.states: List[Dict[str, float]] = [self._default_state() for _ in range(count)]
+        self.sim_time = [0.0] * count
+
+    @staticmethod
+    def _default_state() -> Dict[str, float]:
+        return {"lat": 24.0, "lon": 120.5, "alt": 6000.0, "heading": 0.0, "pitch": 0.0,
+                "roll": 0.0, "speed": 250.0, "mass": 9000.0}
+
+    def reset(self, env_id: int, custom_state: Dict[str, Any] = None):
+        state = self._default_state()
+        if custom_state:
+            state.update({k: float(v) for k, v in custom_state.items() if k in state})
+        self.states[env_id] = state
+        self.sim_time[env_id] = 0.0
+
+    def step(self, env_id: int, vals, steps: int = 1):
+        s = self.states[env_id]
+        elevator, aileron, rudder, throttle = (list(vals) + [0.0, 0.0, 0.0, 0.5])[:4]
+        for _ in range(steps):
+            s["pitch"] = max(-60.0, min(60.0, s["pitch"] + 20.0 * elevator * self.dt - 5.0 * self.dt * (s["pitch"] / 60.0)))
+            s["roll"] = max(-80.0, min(80.0, s["roll"] + 60.0 * aileron * self.dt))
+            s["heading"] = (s["heading"] + (10.0 * rudder + 0.2 * s["roll"]) * self.dt) % 360.0
+            s["speed"] = max(80.0, min(450.0, s["speed"] + (throttle - 0.5) * 10.0 * self.dt))
+            s["mass"] -= 0.5 * throttle * self.dt
+            h, p = math.radians(s["heading"]), math.radians(s["pitch"])
+            north = s["speed"] * math.cos(p) * math.cos(h) * self.dt
+            east = s["speed"] * math.cos(p) * math.sin(h) * self.dt
+            s["alt"] += s["speed"] * math.sin(p) * self.dt
+            s["lat"] += math.degrees(north / 6371000.0)
+            s["lon"] += math.degrees(east / (6371000.0 * math.cos(math.radians(s["lat"]))))
+            self.sim_time[env_id] += self.dt
+
+    def platform(self, env_id: int) -> Dict[str, Any]:
+        s = self.states[env_id]
+        h, p = math.radians(s["heading"]), math.radians(s["pitch"])
+        return dict(s, name=self.platform_name,
+                    vx=s["speed"] * math.cos(p) * math.cos(h),
+                    vy=s["speed"] * math.cos(p) * math.sin(h),
+                    vz=-s["speed"] * math.sin(p))
+
+    def obs(self, env_id: int) -> Dict[str, Any]:
+        return {"sim_time": self.sim_time[env_id], "platforms": [self.platform(env_id)]}
+
+
+class Subscription:
+    """
+    一个订阅连接
+
+    请求循环中只按仿真时间间隔筛选并把帧放入有界发送队列（满时丢弃最旧的），
+    编码和发送由订阅连接自己的线程完成，慢订阅者不会拖慢请求循环
+    """
+
+    def __init__(self, conn, env_ids: Optional[List[int]] = None, interval: float = 0.0, queue_size: int = 256):
+        self.conn = conn
+        self.env_ids = set(int(i) for i in env_ids) if env_ids is not None else None
+        self.interval = float(interval)
+        self.queue = deque(maxlen=max(1, int(queue_size)))
+        self.cond = threading.Condition()
+        self.next_time: Dict[int, float] = {}
+        self.dropped = 0
+        self.closed = False
+
+    def wants(self, env_id: int, event: str, sim_time: float) -> bool:
+        """是否需要这一帧（不需要时请求循环连观测字典都不用构造）；reset 帧总是推送"""
+        if self.env_ids is not None and env_id not in self.env_ids:
+            return False
+        return event != protocol.EVENT_STEP or sim_time >= self.next_time.get(env_id, 0.0) - 1e-9
+
+    def offer(self, env_id: int, event: str, sim_time: float, obs: Dict[str, Any]):
+        """放入发送队列（调用前先用 wants 筛选），并从本帧开始重新计时"""
+        self.next_time[env_id] = sim_time + self.interval
+        with self.cond:
+            if len(self.queue) == self.queue.maxlen:
+                self.dropped += 1
+            self.queue.append((env_id, event, obs))
+            self.cond.notify()
+
+    def run(self):
+        """发送循环，订阅者断开后结束"""
+        seq = 0
+        try:
+            while True:
+                with self.cond:
+                    while not self.queue and not self.closed:
+                        self.cond.wait()
+                    if self.closed:
+                        return
+                    env_id, event, obs = self.queue.popleft()
+                    dropped = self.dropped
+                seq += 1
+                body = json.dumps({"status": protocol.STATUS_OK, "seq": seq, "dropped": dropped,
+                                   "data": {str(env_id): {"event": event, "obs": obs}}}).encode("utf-8")
+                self.conn.sendall(struct.pack('<I', len(body)) + body)
+        except OSError:
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+
+class StubTCPServer:
+    """
+    TCP 替身服务，每个连接一个线程，latency_ms 模拟服务端每次步进的计算耗时
+
+    每个连接 init 时创建自己的场景（多个环境各自连接时互不干扰，步进耗时也可以重叠），
+    subscribe 连接观察最近一次 init 的场景
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0):
+        self.latency_s = latency_ms / 1000.0
+        self.scenario = StubScenario()
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind((host, port))
+        self.listener.listen(8)
+        self.address = self.listener.getsockname()
+        self.subscriptions: List[Subscription] = []
+
+    def publish(self, scenario: StubScenario, env_id: int, event: str):
+        """把环境的最新观测推送给各订阅连接"""
+        if not self.subscriptions or scenario is not self.scenario:
+            return
+        self.subscriptions = [s for s in self.subscriptions if not s.closed]
+        sim_time = scenario.sim_time[env_id]
+        obs = None
+        for subscription in self.subscriptions:
+            if subscription.wants(env_id, event, sim_time):
+                obs = obs or scenario.obs(env_id)
+                subscription.offer(env_id, event, sim_time, obs)
+
+    @staticmethod
+    def _recv_exact(conn, n: int) -> bytes:
+        buf = b""
+        while len(buf) < n:
+            chunk = conn.recv(n - len(buf))
+            if not chunk:
+                raise ConnectionError("Connection closed")
+            buf += chunk
+        return buf
+
+    def handle(self, command: str, params: Dict[str, Any], scenario: Optional[StubScenario] = None) -> Dict[str, Any]:
+        """处理一个请求；scenario 为发出请求的连接的场景，None 时使用最近一次 init 的场景"""
+        scenario = scenario or self.scenario
+        if command == protocol.CMD_INIT:
+            return {"status": "ok", "msg": "init", "data": {}, "capabilities": STUB_CAPABILITIES}
+        if command == protocol.CMD_RESET:
+            custom = params.get("custom_states", {})
+            for env_id in params.get("env_ids", range(scenario.count)):
+                scenario.reset(int(env_id), custom.get(str(env_id)))
+                self.publish(scenario, int(env_id), protocol.EVENT_RESET)
+            return {"status": "ok", "data": {str(i): {"obs": scenario.obs(int(i))}
+                                             for i in params.get("env_ids", range(scenario.count))}}
+        if command == protocol.CMD_STEP:
+            if self.latency_s:
+                time.sleep(self.latency_s)
+            data = {}
+            for env_id, action in params.get("actions", {}).items():
+                scenario.step(int(env_id), action.get("vals", []), int(params.get("steps", 1)))
+                data[env_id] = {"obs": scenario.obs(int(env_id))}
+                self.publish(scenario, int(env_id), protocol.EVENT_STEP)
+            return {"status": "ok", "data": data}
+        if command == protocol.CMD_SNAPSHOT:
+            data = {}
+            for env_id in params.get("env_ids", []):
+                blob = json.dumps([scenario.states[int(env_id)], scenario.sim_time[int(env_id)]])
+                data[str(env_id)] = {"snapshot": base64.b64encode(blob.encode()).decode(),
+                                     "sim_time": scenario.sim_time[int(env_id)]}
+            return {"status": "ok", "data": data}
+        if command == protocol.CMD_RESTORE:
+            data = {}
+            for env_id, blob in params.get("snapshots", {}).items():
+                state, sim_time = json.loads(base64.b64decode(blob))
+                scenario.states[int(env_id)] = state
+                scenario.sim_time[int(env_id)] = sim_time
+                data[env_id] = {"obs": scenario.obs(int(env_id))}
+                self.publish(scenario, int(env_id), protocol.EVENT_RESET)
+            return {"status": "ok", "data": data}
+        if command in (protocol.CMD_CLOSE, protocol.CMD_PAUSE):
+            return {"status": "ok", "data": {}}
+        return {"status": "error", "msg": f"unknown command {command}"}
+
+    def serve_connection(self, conn):
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # 本连接协商的观测编码器（增量以本连接上一次发送的帧为基准），None 为 JSON
+        encoder = None
+        scenario = self.scenario
+        with conn:
+            while True:
+                try:
+                    header = self._recv_exact(conn, 4)
+                except ConnectionError:
+                    return
+                request = json.loads(self._recv_exact(conn, struct.unpack('<I', header)[0]))
+                if request.get("cmd") == protocol.CMD_SUBSCRIBE:
+                    self.serve_subscription(conn, request.get("params", {}))
+                    return
+                command = request.get("cmd")
+                if command == protocol.CMD_INIT:
+                    scenario = self.scenario = StubScenario(count=int(request.get("params", {}).get("count", 1)))
+                resp = self.handle(command, request.get("params", {}), scenario)
+                if command == protocol.CMD_INIT:
+                    reply, encoder = negotiate(request.get("params", {}).get("codec"))
+                    if reply is not None:
+                        resp["codec"] = reply
+                if encoder is not None and resp.get("status") == protocol.STATUS_OK and command in (
+                        protocol.CMD_RESET, protocol.CMD_STEP, protocol.CMD_RESTORE):
+                    body = encoder.encode_response(resp, keyframe=command != protocol.CMD_STEP)
+                else:
+                    body = json.dumps(resp).encode("utf-8")
+                conn.sendall(struct.pack('<I', len(body)) + body)
+                if request.get("cmd") == protocol.CMD_CLOSE:
+                    return
+
+    def serve_subscription(self, conn, params: Dict[str, Any]):
+        """订阅连接：回包后在本线程中持续推送，直到订阅者断开"""
+        subscription = Subscription(conn, params.get("env_ids"), params.get("interval", 0.0), params.get("queue", 256))
+        body = json.dumps({"status": protocol.STATUS_OK, "data": {}}).encode("utf-8")
+        conn.sendall(struct.pack('<I', len(body)) + body)
+        self.subscriptions = self.subscriptions + [subscription]
+        # 订阅者断开时 recv 返回空，结束发送循环
+        threading.Thread(target=self._watch_subscription, args=(conn, subscription), daemon=True).start()
+        subscription.run()
+
+    @staticmethod
+    def _watch_subscription(conn, subscription: Subscription):
+        try:
+            while conn.recv(4096):
+                pass
+        except OSError:
+            pass
+        subscription.close()
+
+    def serve_forever(self):
+        while True:
+            conn, _ = self.listener.accept()
+            threading.Thread(target=self.serve_connection, args=(conn,), daemon=True).start()
+
+
+def start_stub_server(host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0):
+    """在后台线程启动替身服务，port=0 时自动分配端口，返回 (server, port)"""
+    server = StubTCPServer(host, port, latency_ms)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, server.address[1]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AFSim TCP 替身服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="每次步进模拟的服务端计算耗时")
+    args = parser.parse_args()
+    server = StubTCPServer(args.host, args.port, args.latency_ms)
+    print(f"√ TCP 替身服务已启动 {args.host}:{args.port}")
+    server.serve_forever()
@@ -0,0 +1,235 @@
+"""
+观测推送订阅：在单独的 TCP 连接上订阅服务端推送的观测帧，供监控面板、评估和录制等非训练程序使用，
+不占用训练客户端的请求循环
+
+    with ObservationSubscriber("127.0.0.1", 8888, interval=0.1) as sub:
+        for frame in sub:                  # 阻塞生成器
+            print(frame["env_id"], frame["obs"]["sim_time"])
+
+    async for frame in sub:                # 异步迭代器
+        ...
+
+接收线程把推送帧放入有界缓冲区，消费者跟不上时丢弃最旧的帧（只保留最新的 buffer_size 帧）
+
+演示: python -m communication.subscriber
+"""
+import asyncio
+import json
+import socket
+import struct
+import threading
+from collections import deque
+from typing import Dict, Any, Iterable, Iterator, Optional
+
+from communication import protocol
+
+
+class ObservationSubscriber:
+    """
+    观测推送订阅者
+
+    产出的每一帧为 {"seq", "env_id", "event", "obs"}，event 为 "reset" 或 "step"
+    """
+
+    def __init__(self, host: str, port: int, env_ids: Optional[Iterable[int]] = None, interval: float = 0.0,
+                 buffer_size: int = 64, server_queue: int = 256, connect_timeout: float = 5.0):
+        """
+        Args:
+            host / port: 仿真服务端地址（与训练连接相同）
+            env_ids: 订阅的环境编号，None 为全部
+            interval: 推送间隔（仿真秒），0 为每步推送
+            buffer_size: 客户端缓冲帧数，满时丢弃最旧的帧
+            server_queue: 服务端发送队列长度，满时服务端同样丢弃最旧的帧
+        """
+        self.host = host
+        self.port = port
+        self.env_ids = [int(i) for i in env_ids] if env_ids is not None else None
+        self.interval = interval
+        self.server_queue = server_queue
+        self.connect_timeout = connect_timeout
+        self._buffer = deque(maxlen=buffer_size)
+        self._cond = threading.Condition()
+        self._socket: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.received = 0
+        self.dropped = 0            # 客户端缓冲区丢弃的帧数
+        self.server_dropped = 0     # 服务端发送队列丢弃的帧数
+        self.error: Optional[Exception] = None
+
+    # ---------- 连接 ----------
+    def start(self) -> "ObservationSubscriber":
+        """建立订阅连接并启动接收线程"""
+        sock = socket.create_connection((self.host, self.port), timeout=self.connect_timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        params = {"interval": self.interval, "queue": self.server_queue}
+        if self.env_ids is not None:
+            params["env_ids"] = self.env_ids
+        body = json.dumps({"req_id": "subscribe", "cmd": protocol.CMD_SUBSCRIBE, "params": params}).encode("utf-8")
+        sock.sendall(struct.pack('<I', len(body)) + body)
+        resp = self._recv_message(sock)
+        if resp.get("status") != protocol.STATUS_OK:
+            sock.close()
+            raise RuntimeError(f"订阅失败: {resp.get('msg')}")
+        sock.settimeout(None)
+        self._socket = sock
+        self._thread = threading.Thread(target=self._receive_loop, name="observation-subscriber", daemon=True)
+        self._thread.start()
+        return self
+
+    @staticmethod
+    def _recv_exact(sock: socket.socket, n: int) -> bytes:
+        buf = bytearray()
+        while len(buf) < n:
+            chunk = sock.recv(n - len(buf))
+            if not chunk:
+                raise ConnectionError("Connection closed")
+            buf += chunk
+        return bytes(buf)
+
+    def _recv_message(self, sock: socket.socket) -> Dict[str, Any]:
+        length = struct.unpack('<I', self._recv_exact(sock, 4))[0]
+        return json.loads(self._recv_exact(sock, length))
+
+    def _receive_loop(self):
+        try:
+            while True:
+                message = self._recv_message(self._socket)
+                frames = [{"seq": message.get("seq"), "env_id": env_id, "event": entry.get("event"),
+                           "obs": entry.get("obs")} for env_id, entry in message.get("data", {}).items()]
+                with self._cond:
+                    self.server_dropped = message.get("dropped", self.server_dropped)
+                    for frame in frames:
+                        if len(self._buffer) == self._buffer.maxlen:
+                            self.dropped += 1
+                        self._buffer.append(frame)
+                    self.received += len(frames)
+                    self._cond.notify_all()
+        except (ConnectionError, OSError, ValueError) as e:
+            if not self._closed:
+                self.error = e
+        finally:
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+
+    # ---------- 消费 ----------
+    def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """取出最早的缓冲帧；超时或连接已关闭且缓冲区为空时返回 None"""
+        with self._cond:
+            if not self._buffer and not self._closed:
+                self._cond.wait(timeout)
+            return self._buffer.popleft() if self._buffer else None
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """取出最新的一帧并清空缓冲区（只关心当前状态的面板使用），没有新帧时返回 None"""
+        with self._cond:
+            frame = self._buffer[-1] if self._buffer else None
+            self._buffer.clear()
+            return frame
+
+    def frames(self, idle_timeout: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """
+        阻塞生成器，连接关闭且缓冲区取空后结束
+        :param idle_timeout: 超过该时长没有新帧时也结束，None 一直等待
+        """
+        while True:
+            frame = self.get(idle_timeout)
+            if frame is None:
+                if self._closed or idle_timeout is not None:
+                    return
+                continue
+            yield frame
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.frames()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        """异步迭代：在默认线程池中等待，不阻塞事件循环"""
+        loop = asyncio.get_running_loop()
+        while True:
+            frame = self.get(timeout=0)
+            if frame is None and not self._closed:
+                frame = await loop.run_in_executor(None, self.get, 0.5)
+            if frame is not None:
+                return frame
+            if self._closed:
+                raise StopAsyncIteration
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {"received": self.received, "dropped": self.dropped, "server_dropped": self.server_dropped,
+                "buffered": len(self._buffer)}
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._socket is not None:
+            try:
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._socket.close()
+            self._socket = None
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def __enter__(self):
+        if self._socket is None:
+            self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+if __name__ == "__main__":
+    import time
+    from communication.stub_tcp_server import start_stub_server
+    from communication.tcp_client import SimulationClient
+
+    server, port = start_stub_server()
+    client = SimulationClient("127.0.0.1", port)
+    client.connect("testWzz")
+
+    def train_loop(steps: int = 3000):
+        client.reset_batch([0])
+        for _ in range(steps):
+            client.step([0.1, 0.0, 0.0, 0.8])
+
+    # 1. 生成器：每 0.5 仿真秒推送一帧
+    with ObservationSubscriber("127.0.0.1", port, interval=0.5) as sub:
+        start = time.perf_counter()
+        trainer = threading.Thread(target=train_loop)
+        trainer.start()
+        times = [frame["obs"]["sim_time"] for frame in sub.frames(idle_timeout=1.0)]
+        trainer.join()
+        print(f"训练 3000 步用时 {time.perf_counter() - start:.2f} s，收到 {len(times)} 帧 "
+              f"(仿真时间 {times[0]:.2f} … {times[-1]:.2f})，{sub.stats}")
+
+    # 2. 异步迭代器 + 慢消费者：每步推送，客户端缓冲 8 帧，丢弃最旧的
+    async def slow_consumer(sub: ObservationSubscriber, trainer: threading.Thread):
+        count = 0
+        async for _ in sub:
+            count += 1
+            await asyncio.sleep(0.005)
+            if not trainer.is_alive() and not sub.stats["buffered"]:
+                break
+        return count
+
+    with ObservationSubscriber("127.0.0.1", port, interval=0.0, buffer_size=8) as sub:
+        trainer = threading.Thread(target=train_loop, args=(1000,))
+        trainer.start()
+        consumed = asyncio.run(slow_consumer(sub, trainer))
+        trainer.join()
+        print(f"慢消费者处理 {consumed} 帧，{sub.stats}")
+    client.close()
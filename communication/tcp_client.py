@@ -3,17 +3,45 @@ import json
 import struct
 import time
 
+from communication import protocol
+from communication.client_base import (SimulationClientBase, CAP_BATCH_STEP, CAP_BATCH_RESET,
+                                       CAP_CUSTOM_STATES, CAP_SEEDS, CAP_SNAPSHOT, CAP_SUBSCRIBE)
+from communication.codec import DeltaDecoder, is_encoded
+from communication.platform_state import PlatformDecoder
+from communication.snapshot_cache import SnapshotCache, ScenarioSnapshot
+from communication.subscriber import ObservationSubscriber
 
-class SimulationClient:
-    def __init__(self, host: str, port: int, steps: int = 1):
+# 服务端未在 init 回包中声明能力时假定支持的能力
+DEFAULT_TCP_CAPABILITIES = frozenset({CAP_BATCH_STEP, CAP_BATCH_RESET, CAP_CUSTOM_STATES, CAP_SEEDS})
+
+
+class SimulationClient(SimulationClientBase):
+    """基于 TCP 长度前缀 JSON 协议的仿真客户端"""
+
+    transport = "tcp"
+
+    def __init__(self, host: str, port: int, steps: int = 1, count: int = 1, codec: dict = None):
+        """
+        :param codec: 观测编码提议（见 communication.codec.codec_offer），None 使用 JSON；服务端不支持时同样回退到 JSON
+        """
+        super().__init__()
         self.host = host
         self.port = port
+        self.count = count  # 服务端并行环境数量
         self.socket = None
         self.scenario = None
         self.target_ids = None
         self.init_actions = None  # 升降舵、副翼、方向舵、油门
         self.steps = steps
         # 油门范围是[0,1]，其他范围是[-1,1]
+        # 命名场景快照缓存
+        self.snapshots = SnapshotCache()
+        # 平台状态解码器，名称索引跨步复用
+        self.platform_decoder = PlatformDecoder()
+        self.codec_offer = codec
+        # 与服务端协商得到的编码，None 表示 JSON
+        self.codec = None
+        self.frame_decoder = None
 
     def connection(self, scenario):
         """单次通信仿真步长是16ms"""
@@ -21,10 +49,16 @@ class SimulationClient:
             self.scenario = scenario
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.socket.connect((self.host, self.port))
-            resp = self.send_request("init", {"count": 1, "scenario": scenario})
+            init_params = {"count": self.count, "scenario": scenario}
+            if self.codec_offer:
+                init_params["codec"] = self.codec_offer
+            resp = self.send_request("init", init_params)
             if resp.get("status") != "ok":
                 print(f"Init 失败: {resp.get('msg')}")
                 return
+            self.codec = resp.get("codec")
+            self.frame_decoder = DeltaDecoder.from_reply(self.codec) if self.codec else None
+            self.capabilities = frozenset(resp.get("capabilities", DEFAULT_TCP_CAPABILITIES))
             if scenario == "testWzz":
                 self.target_ids = ["1001"]
                 self.init_actions = [[0.5, 0.0, 0.0, 1.0]]  # 升降舵、副翼、方向舵、油门
@@ -43,6 +77,46 @@ class SimulationClient:
             import traceback
             traceback.print_exc()
 
+    def connect(self, scenario: str) -> bool:
+        return self.connection(scenario) is not None
+
+    def _wire_action(self, action):
+        """数值列表形式的动作转换为 {"objID", "vals"}，字典形式原样发送"""
+        if isinstance(action, dict):
+            return action
+        return {"objID": self.target_ids[0], "vals": list(action)}
+
+    @staticmethod
+    def _frames(resp, command: str):
+        if resp is None or resp.get("status") != protocol.STATUS_OK:
+            raise RuntimeError(f"{command} 失败: {resp.get('msg') if resp else '无回包'}")
+        return {env_id: data["obs"] for env_id, data in resp["data"].items()}
+
+    def _step_params(self, actions):
+        return {
+            "steps": self.steps,
+            "actions": {str(env_id): self._wire_action(action) for env_id, action in actions.items()}
+        }
+
+    def step_batch(self, actions):
+        return self._frames(self.send_request(protocol.CMD_STEP, self._step_params(actions)), protocol.CMD_STEP)
+
+    def step_async(self, actions):
+        """发出步进请求后立即返回，回包留在套接字中，由 step_wait 读取"""
+        if self._pending_actions is not None:
+            raise RuntimeError("上一次 step_async 的结果尚未取回")
+        self._send(protocol.CMD_STEP, self._step_params(actions))
+        self._pending_actions = actions
+
+    def step_wait(self):
+        if self._pending_actions is None:
+            raise RuntimeError("没有等待取回的 step_async 请求")
+        self._pending_actions = None
+        return self._frames(self._receive(), protocol.CMD_STEP)
+
+    def reset_batch(self, env_ids, custom_states=None, seeds=None):
+        return self._frames(self.reset(env_ids, custom_states, seeds), protocol.CMD_RESET)
+
     def get_environment_data(self, actions):
         step_params = {
             "steps": self.steps,
@@ -51,13 +125,66 @@ class SimulationClient:
         resp = self.send_request("step", step_params)
         return resp
 
-    def reset(self):
+    def reset(self, env_ids=None, custom_states=None, seeds=None):
+        """
+        重置环境，一次请求可同时重置多个环境
+        :param env_ids: 需要重置的环境编号列表，默认全部
+        :param custom_states: {env_id: {"lon", "lat", "alt", "heading", "speed", ...}}，未给出的环境使用场景默认初始状态
+        :param seeds: {env_id: int}，服务端各环境的随机种子，用于复现仿真内部的随机过程
+        """
+        params = {"env_ids": [int(i) for i in env_ids] if env_ids is not None else list(range(self.count))}
+        if custom_states:
+            self.require(CAP_CUSTOM_STATES)
+            params["custom_states"] = {str(k): v for k, v in custom_states.items()}
+        if seeds:
+            self.require(CAP_SEEDS)
+            params["seeds"] = {str(k): int(v) for k, v in seeds.items()}
         try:
-            self.send_request("reset", {"env_ids": [0]})
+            return self.send_request("reset", params)
         except Exception as e:
             import traceback
             traceback.print_exc()
 
+    def snapshot(self, name: str, env_id: int = 0, meta: dict = None) -> ScenarioSnapshot:
+        """导出指定环境的完整仿真状态，并以name存入快照缓存"""
+        self.require(CAP_SNAPSHOT)
+        resp = self.send_request(protocol.CMD_SNAPSHOT, {"env_ids": [env_id]})
+        if resp.get("status") != protocol.STATUS_OK:
+            raise RuntimeError(f"快照失败: {resp.get('msg')}")
+        data = resp["data"][str(env_id)]
+        snapshot = ScenarioSnapshot(name, data["snapshot"], env_id, data.get("sim_time", 0.0), meta)
+        self.snapshots.put(snapshot)
+        return snapshot
+
+    def restore(self, name: str, env_id: int = 0):
+        """将缓存中的快照恢复到指定环境（可以不是生成快照的环境），返回恢复后的观测帧"""
+        self.require(CAP_SNAPSHOT)
+        snapshot = self.snapshots.get(name)
+        if snapshot is None:
+            raise KeyError(f"快照不存在: {name}")
+        resp = self.send_request(protocol.CMD_RESTORE, {"snapshots": {str(env_id): snapshot.blob}})
+        if resp.get("status") != protocol.STATUS_OK:
+            raise RuntimeError(f"快照恢复失败: {resp.get('msg')}")
+        return resp["data"][str(env_id)]["obs"]
+
+    def snapshot_meta(self, name: str) -> dict:
+        """快照保存时附带的 meta"""
+        self.require(CAP_SNAPSHOT)
+        snapshot = self.snapshots.get(name)
+        if snapshot is None:
+            raise KeyError(f"快照不存在: {name}")
+        return snapshot.meta
+
+    def subscribe(self, env_ids=None, interval: float = 0.0, buffer_size: int = 64) -> ObservationSubscriber:
+        """
+        在单独的连接上订阅服务端推送的观测帧（不经过本连接的请求循环），返回已启动的订阅者
+        :param env_ids: 订阅的环境编号，默认全部
+        :param interval: 推送间隔（仿真秒），0 为每步推送
+        :param buffer_size: 客户端缓冲帧数，满时丢弃最旧的帧
+        """
+        self.require(CAP_SUBSCRIBE)
+        return ObservationSubscriber(self.host, self.port, env_ids, interval, buffer_size).start()
+
     def close(self):
         try:
             self.send_request("close", {"env_ids": [0]})
@@ -69,28 +196,38 @@ class SimulationClient:
 
     def send_request(self, command, params):
         """封装好的发送函数"""
+        self._send(command, params)
+        return self._receive()
+
+    def _send(self, command, params):
         req_id = f"{command}_{int(time.time())}"
         payload = {
             "req_id": req_id, "cmd": command, "params": params
         }
-        json_str = json.dumps(payload)
-        body_bytes = json_str.encode('utf-8')
-        header = struct.pack('<I', len(body_bytes))
-        self.socket.sendall(header + body_bytes)
+        with self.profiler.stage("send"):
+            json_str = json.dumps(payload)
+            body_bytes = json_str.encode('utf-8')
+            header = struct.pack('<I', len(body_bytes))
+            self.socket.sendall(header + body_bytes)
 
-        header_recv = self.socket.recv(4)
-        if not header_recv:
-            raise ConnectionError("Connection closed")
-        body_len = struct.unpack('<I', header_recv)[0]
+    def _receive(self):
+        with self.profiler.stage("receive"):
+            header_recv = self.socket.recv(4)
+            if not header_recv:
+                raise ConnectionError("Connection closed")
+            body_len = struct.unpack('<I', header_recv)[0]
 
-        body_recv = b""
-        while len(body_recv) < body_len:
-            packet = self.socket.recv(body_len - len(body_recv))
-            if not packet:
-                break
-            body_recv += packet
+            body_recv = b""
+            while len(body_recv) < body_len:
+                packet = self.socket.recv(body_len - len(body_recv))
+                if not packet:
+                    break
+                body_recv += packet
 
-        return json.loads(body_recv)
+        with self.profiler.stage("decode"):
+            if self.frame_decoder is not None and is_encoded(body_recv):
+                return self.frame_decoder.decode_response(body_recv)
+            return json.loads(body_recv)
 
     def wait_for_platform_ready(self, target_id, timeout=10):
         """轮询等待飞机上线"""
@@ -102,13 +239,12 @@ class SimulationClient:
                 resp = self.send_request("reset", {"env_ids": [0]})
                 if resp.get("status") == "ok":
                     obs = resp["data"]["0"]["obs"]
-                    platforms = obs.get("platforms", [])
-                    # 遍历查找目标飞机 (不依赖 ID，只看 name)
-                    for p in platforms:
-                        if p.get("name") == target_id:
-                            print(f"✅ 成功捕获目标！飞机 [{target_id}] 已就绪。")
-                            return True, obs
-                    if not platforms:
+                    # 按名称查找目标飞机 (不依赖 ID，只看 name)
+                    platforms = self.platform_decoder.decode(obs)
+                    if target_id in platforms:
+                        print(f"✅ 成功捕获目标！飞机 [{target_id}] 已就绪。")
+                        return True, obs
+                    if not len(platforms):
                         print(f"   ... AFSIM 正在加载模型 ...")
             except Exception as e:
                 print(f"   轮询错误: {e}")
@@ -0,0 +1,217 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Optional, Sequence, Tuple, Iterable
+import gymnasium as gym
+import numpy as np
+
+# 字段类型
+FIELD_CONTINUOUS = "continuous"  # 连续量：裁剪到 [low, high]，可限制每步变化率
+FIELD_BINARY = "binary"          # 开关量：策略输出 > threshold 为 1
+FIELD_DISCRETE = "discrete"      # 离散量：[low, high] 等分为 n 档，输出档位下标
+
+
+class ActionField:
+    """
+    动作字段的声明：策略输出的一维如何变成服务端报文中的一个值
+    """
+
+    __slots__ = ("name", "kind", "low", "high", "levels", "threshold", "max_rate", "wire_type", "source")
+
+    def __init__(self, name: str, kind: str = FIELD_CONTINUOUS, low: float = -1.0, high: float = 1.0,
+                 levels: int = 0, threshold: float = 0.5, max_rate: Optional[float] = None,
+                 wire_type: type = float, source: Optional[Tuple[str, Optional[int]]] = None):
+        """
+        Args:
+            name: 报文中的字段名
+            kind: FIELD_CONTINUOUS / FIELD_BINARY / FIELD_DISCRETE
+            low, high: 策略输出的取值范围
+            levels: 离散档位数（仅 FIELD_DISCRETE）
+            threshold: 开关阈值（仅 FIELD_BINARY）
+            max_rate: 每步最大变化量，None 不限制（仅 FIELD_CONTINUOUS）
+            wire_type: 报文中的类型（float / int / bool）
+            source: Dict 动作空间中的来源 (子空间名, 下标)，下标为 None 表示标量子空间
+        """
+        self.name = name
+        self.kind = kind
+        self.low = float(low)
+        self.high = float(high)
+        self.levels = levels
+        self.threshold = threshold
+        self.max_rate = max_rate
+        self.wire_type = wire_type
+        self.source = source
+
+
+def continuous(name: str, low: float = -1.0, high: float = 1.0, max_rate: Optional[float] = None,
+               source=None) -> ActionField:
+    return ActionField(name, FIELD_CONTINUOUS, low, high, max_rate=max_rate, source=source)
+
+
+def binary(name: str, threshold: float = 0.5, wire_type: type = int, source=None) -> ActionField:
+    return ActionField(name, FIELD_BINARY, 0.0, 1.0, threshold=threshold, wire_type=wire_type, source=source)
+
+
+def discrete(name: str, levels: int, low: float = 0.0, high: float = 1.0, source=None) -> ActionField:
+    return ActionField(name, FIELD_DISCRETE, low, high, levels=levels, wire_type=int, source=source)
+
+
+class ActionAdapterBase(ABC):
+    """
+    动作适配器基类
+
+    子类只声明字段列表，构造时编译为按列的数组运算：一批环境的动作 (N, D) 一次完成
+    裁剪、变化率限制、开关阈值和离散化，可直接写入传输层的动作缓冲区（如共享内存槽位）
+    """
+
+    def __init__(self, num_envs: int = 1, dtype=np.float32):
+        self.fields: Tuple[ActionField, ...] = tuple(self._define_fields())
+        self.num_envs = num_envs
+        self.dtype = dtype
+        self._compile()
+
+    @abstractmethod
+    def _define_fields(self) -> Sequence[ActionField]:
+        """声明动作字段，顺序即策略输出和报文数值的顺序"""
+        pass
+
+    def _compile(self):
+        fields = self.fields
+        self.dim = len(fields)
+        self.low = np.array([f.low for f in fields])
+        self.high = np.array([f.high for f in fields])
+
+        rate = [i for i, f in enumerate(fields) if f.kind == FIELD_CONTINUOUS and f.max_rate is not None]
+        self._rate_idx = np.array(rate, dtype=np.intp)
+        self._max_rate = np.array([fields[i].max_rate for i in rate])
+
+        binary_idx = [i for i, f in enumerate(fields) if f.kind == FIELD_BINARY]
+        self._binary_idx = np.array(binary_idx, dtype=np.intp)
+        self._threshold = np.array([fields[i].threshold for i in binary_idx])
+
+        disc = [i for i, f in enumerate(fields) if f.kind == FIELD_DISCRETE]
+        self._disc_idx = np.array(disc, dtype=np.intp)
+        self._disc_low = self.low[disc]
+        self._disc_scale = np.array([(fields[i].levels - 1) / (fields[i].high - fields[i].low) for i in disc])
+
+        # 变化率限制需要的上一步输出，NaN 表示回合第一步（不限制）
+        self._prev = np.full((self.num_envs, len(rate)), np.nan)
+        self._single = np.empty((1, self.dim))
+        self._wire_items = tuple((f.name, f.wire_type) for f in fields)
+        # 单环境快速路径逐字段使用的参数：(报文字段名, 类型, low, high, 变化率槽位或 -1, max_rate, 阈值, 离散缩放, 报文类型)
+        self._scalar_plan = tuple(
+            (f.name, f.kind, f.low, f.high, rate.index(i) if i in rate else -1, f.max_rate, f.threshold,
+             (f.levels - 1) / (f.high - f.low) if f.kind == FIELD_DISCRETE else 0.0, f.wire_type)
+            for i, f in enumerate(fields))
+
+    def _scalar_convert(self, values: list, prev: Optional[list]) -> Tuple[list, Dict[str, Any]]:
+        """
+        单个环境逐字段转换，prev 为变化率限制的上一步输出列表（原地更新）。
+        单环境每步只有几个标量，直接做浮点比较比一连串小数组 numpy 调用快得多
+        """
+        result = []
+        wire = {}
+        for x, (name, kind, low, high, slot, max_rate, threshold, scale, wire_type) in zip(values, self._scalar_plan):
+            if kind == FIELD_BINARY:
+                x = 1.0 if x > threshold else 0.0
+            else:
+                x = low if x < low else (high if x > high else x)
+                if slot >= 0:
+                    q = prev[slot]
+                    if q == q:  # NaN 表示回合第一步
+                        x = q - max_rate if x < q - max_rate else (q + max_rate if x > q + max_rate else x)
+                    prev[slot] = x
+                if kind == FIELD_DISCRETE:
+                    x = float(round((x - low) * scale))
+            result.append(x)
+            wire[name] = x if wire_type is float else wire_type(x)
+        return result, wire
+
+    @property
+    def space(self) -> gym.spaces.Box:
+        """策略看到的扁平 Box 动作空间"""
+        return gym.spaces.Box(low=self.low.astype(self.dtype), high=self.high.astype(self.dtype), dtype=self.dtype)
+
+    def reset(self, env_ids: Optional[Iterable[int]] = None):
+        """回合开始时清除变化率限制的历史"""
+        if env_ids is None:
+            self._prev[:] = np.nan
+        else:
+            self._prev[list(env_ids)] = np.nan
+
+    def convert_batch(self, actions: np.ndarray, out: Optional[np.ndarray] = None,
+                      env_ids: Optional[Sequence[int]] = None) -> np.ndarray:
+        """
+        批量转换为报文数值
+
+        Args:
+            actions: 策略输出 (N, D)
+            out: 写入位置 (N, >=D) 的 float64 数组，None 时新建；可传入传输层动作缓冲区的切片
+            env_ids: 各行对应的环境编号，None 表示 0..N-1
+
+        Returns:
+            out[:, :D]
+        """
+        n = actions.shape[0]
+        if out is None:
+            out = np.empty((n, self.dim))
+        else:
+            out = out[:, :self.dim]
+        np.clip(actions, self.low, self.high, out=out)
+
+        if self._rate_idx.size:
+            rows = slice(0, n) if env_ids is None else np.asarray(env_ids, dtype=np.intp)
+            prev = self._prev[rows]
+            current = out[:, self._rate_idx]
+            limited = np.clip(current, prev - self._max_rate, prev + self._max_rate)
+            current = np.where(np.isnan(prev), current, limited)
+            out[:, self._rate_idx] = current
+            self._prev[rows] = current
+
+        if self._binary_idx.size:
+            out[:, self._binary_idx] = out[:, self._binary_idx] > self._threshold
+        if self._disc_idx.size:
+            out[:, self._disc_idx] = np.rint((out[:, self._disc_idx] - self._disc_low) * self._disc_scale)
+        return out
+
+    def convert(self, action: np.ndarray, env_id: int = 0) -> np.ndarray:
+        """单个环境的转换，结果写入内部缓冲区（下一次调用前有效）"""
+        self._single[0] = action
+        return self.convert_batch(self._single, self._single, (env_id,))[0]
+
+    def convert_scalar(self, action, env_id: int = 0) -> Tuple[list, Dict[str, Any]]:
+        """
+        单个环境的快速路径，返回 (报文数值列表, 报文字典)，与 convert + to_wire_dict 结果一致
+
+        Args:
+            action: 策略输出（数组或列表）
+            env_id: 环境编号（决定使用哪一行变化率历史）
+        """
+        values = action.tolist() if isinstance(action, np.ndarray) else list(action)
+        if self._rate_idx.size:
+            prev = self._prev[env_id].tolist()
+            result = self._scalar_convert(values, prev)
+            self._prev[env_id] = prev
+            return result
+        return self._scalar_convert(values, None)
+
+    def to_wire_dict(self, values: np.ndarray) -> Dict[str, Any]:
+        """转换后的数值行变为按字段名的报文字典"""
+        return {name: cast(v) for (name, cast), v in zip(self._wire_items, values.tolist())}
+
+    def to_wire_dicts(self, values: np.ndarray, env_ids: Optional[Sequence] = None) -> Dict[str, Dict[str, Any]]:
+        """批量版本，返回 {env_id: 报文字典}"""
+        env_ids = range(values.shape[0]) if env_ids is None else env_ids
+        return {str(env_id): self.to_wire_dict(row) for env_id, row in zip(env_ids, values)}
+
+    def flatten(self, action: Dict[str, Any]) -> np.ndarray:
+        """
+        把 Dict 动作空间的样本展平为策略输出向量（兼容按 Dict 传动作的调用方）
+        离散字段的档位下标映射回 [low, high] 中对应的取值
+        """
+        flat = np.empty(self.dim)
+        for i, f in enumerate(self.fields):
+            key, index = f.source
+            value = action[key] if index is None else action[key][index]
+            if f.kind == FIELD_DISCRETE:
+                value = f.low + int(value) * (f.high - f.low) / (f.levels - 1)
+            flat[i] = value
+        return flat
@@ -3,19 +3,29 @@ from abc import ABC, abstractmethod
 from typing import Dict, Any, Tuple, Optional
 import numpy as np
 
-from communication.http_client import SimulationClient
+from communication.client_base import SimulationClientBase, CAP_SEEDS
 from visualization.tacview_handler import TacViewHandler
+from utils.latency import LatencyProfiler, NULL_PROFILER
+from utils.metrics_logger import MetricsLogger
+from core.base.frame_stack import FrameStack
 
 
 class AirCombatEnvironmentBase(gym.Env, ABC):
     """空战环境基类"""
 
+    # 视为成功的终止原因（录像库按结局筛选回合时使用）
+    SUCCESS_REASONS = frozenset({"enemy_killed", "enemies_destroyed"})
+
     def __init__(self,
                  env_name: str,
-                 sim_client: SimulationClient,
+                 sim_client: SimulationClientBase,
                  render: bool = False,
                  save_acmi: bool = False,
-                 acmi_file_path: str = None):
+                 acmi_file_path: str = None,
+                 profiler: Optional[LatencyProfiler] = None,
+                 metrics_logger: Optional[MetricsLogger] = None,
+                 history_len: int = 1,
+                 render_options: Optional[Dict[str, Any]] = None):
 
         self.env_name = env_name
         self.sim_client = sim_client
@@ -23,13 +33,32 @@ class AirCombatEnvironmentBase(gym.Env, ABC):
         self.save_acmi = save_acmi
         self.acmi_file_path = acmi_file_path
 
+        # 分阶段耗时统计，None时使用关闭状态的共享实例
+        self.profiler = profiler if profiler is not None else NULL_PROFILER
+        self.sim_client.profiler = self.profiler
+
+        # 列式指标记录器，单步写入奖励分量（按列名匹配）
+        self.metrics_logger = metrics_logger
+
+        # 观测历史帧数，>1 时输出最近 history_len 帧特征的展平堆叠（子类观察空间需乘以该值）
+        self.history_len = history_len
+        self.frame_stack = None
+
+        # 当前回合累计回报
+        self.episode_return = 0.0
+
         # 初始化组件 - 由子类实现具体实例
         self.feature_extractor = None
         self.reward_calculator = None
         self.termination_checker = None
+        self.action_adapter = None
 
-        # TacView处理器
-        self.tacview_handler = TacViewHandler() if render or save_acmi else None
+        # TacView处理器，渲染在后台完成；render_options 传给 TacViewHandler（端口、抽帧、丢帧策略等）
+        self.tacview_handler = TacViewHandler(
+            stream=render,
+            acmi_file_path=acmi_file_path if save_acmi else None,
+            **(render_options or {})
+        ) if render or save_acmi else None
 
         # 连接仿真服务端
         if not self.sim_client.connect(env_name):
@@ -53,57 +82,99 @@ class AirCombatEnvironmentBase(gym.Env, ABC):
     def reset(self, seed: Optional[int] = None, options: Optional[Dict] = None) -> Tuple[np.ndarray, Dict]:
         """重置环境 - 通用实现"""
         super().reset(seed=seed)
-
-        if not self.sim_client.reset_environment():
-            raise RuntimeError("环境重置失败")
-
-        # 获取初始环境数据
-        env_data = self.sim_client.get_environment_data()
+        if self.action_adapter is not None:
+            self.action_adapter.reset()
+        self.termination_checker.reset()
+        self.reward_calculator.reset()
+
+        # 重置并获取初始环境数据
+        # options["custom_state"] 为下发给服务端的初始状态（评估套件等使用）
+        custom_state = options.get("custom_state") if options else None
+        # 服务端种子由环境的随机数流派生，评估套件给定 seed 时仿真内部的随机过程同样可复现
+        server_seed = int(self.np_random.integers(2 ** 31 - 1))
+        frames = self.sim_client.reset_batch(["0"], custom_states={"0": custom_state} if custom_state else None,
+                                             seeds={"0": server_seed} if self.sim_client.supports(CAP_SEEDS) else None)
+        env_data = frames.get("0") if frames else None
         if env_data is None:
-            raise RuntimeError("获取初始环境数据失败")
+            raise RuntimeError("环境重置失败")
 
         # 特征提取
-        observation = self.feature_extractor.extract(env_data)
+        observation = self._stack_observation(self.feature_extractor.extract(env_data), new_episode=True)
         info = {"raw_data": env_data}
 
         # TacView处理
+        self.episode_return = 0.0
+        if self.tacview_handler:
+            self.tacview_handler.begin_episode()
         self._handle_visualization(env_data)
 
         return observation, info
 
     def step(self, action: np.ndarray) -> Tuple[np.ndarray, float, bool, bool, Dict]:
         """执行一步动作 - 通用实现"""
-        # 发送动作到仿真服务端
-        action_dict = self._convert_action_to_dict(action)
-        if not self.sim_client.send_action(action_dict):
-            raise RuntimeError("发送动作失败")
+        profiler = self.profiler
+        profiler.begin_step()
+
+        with profiler.stage("action_convert"):
+            action_dict = self._convert_action_to_dict(action)
 
-        # 获取新的环境数据
-        env_data = self.sim_client.get_environment_data()
+        # 发送动作并获取新的环境数据（合并为一次往返）
+        env_data = self.sim_client.step(action_dict)
         if env_data is None:
-            raise RuntimeError("获取环境数据失败")
+            raise RuntimeError("单步交互失败")
 
         # 特征提取
-        observation = self.feature_extractor.extract(env_data)
+        with profiler.stage("feature"):
+            observation = self._stack_observation(self.feature_extractor.extract(env_data))
 
         # 计算奖励
-        reward = self.reward_calculator.calculate(env_data, action_dict)
+        with profiler.stage("reward"):
+            reward = self.reward_calculator.calculate(env_data, action_dict)
+
+        self.episode_return += reward
 
         # 检查终止条件
-        terminated = self.termination_checker.is_terminated(env_data)
-        truncated = self.termination_checker.is_truncated(env_data)
+        with profiler.stage("termination"):
+            terminated, truncated = self.termination_checker.check(env_data)
 
         info = {
             "raw_data": env_data,
             "action": action_dict,
             "reward_components": self.reward_calculator.get_reward_components()
         }
+        if terminated or truncated:
+            info["termination_reason"] = self.termination_checker.reason
 
-        # TacView处理
-        self._handle_visualization(env_data)
+        # TacView处理（只提交帧引用）
+        with profiler.stage("visualization"):
+            self._handle_visualization(env_data)
+            if self.tacview_handler and (terminated or truncated):
+                self.tacview_handler.end_episode({"return": self.episode_return,
+                                                  "length": self.termination_checker.step_count,
+                                                  "success": self.termination_checker.reason in self.SUCCESS_REASONS,
+                                                  "termination_reason": self.termination_checker.reason})
+
+        profiler.end_step()
+        if profiler.enabled:
+            info["latency_ms"] = profiler.last_step()
+
+        if self.metrics_logger is not None:
+            self.metrics_logger.log_step_mapping(info["reward_components"])
 
         return observation, reward, terminated, truncated, info
 
+    def _stack_observation(self, features: np.ndarray, new_episode: bool = False) -> np.ndarray:
+        """把单帧特征写入历史，返回堆叠后的观测（副本，环形缓冲区的视图会被下一次 push / reset 覆盖）"""
+        if self.history_len == 1:
+            return features
+        if self.frame_stack is None:
+            self.frame_stack = FrameStack(self.history_len, features.shape, dtype=features.dtype)
+        if new_episode:
+            self.frame_stack.reset(features)
+        else:
+            self.frame_stack.push(features)
+        return self.frame_stack.flat().copy()
+
     @abstractmethod
     def _convert_action_to_dict(self, action: np.ndarray) -> Dict[str, Any]:
         """将numpy动作数组转换为字典格式"""
@@ -112,12 +183,11 @@ class AirCombatEnvironmentBase(gym.Env, ABC):
     def _handle_visualization(self, env_data: Dict[str, Any]):
         """处理可视化"""
         if self.tacview_handler:
-            if self.render:
-                self.tacview_handler.send_to_tacview(env_data)
-            if self.save_acmi and self.acmi_file_path:
-                self.tacview_handler.save_acmi(env_data, self.acmi_file_path)
+            self.tacview_handler.submit(env_data)
 
     def close(self):
         """关闭环境"""
         if self.tacview_handler:
-            self.tacview_handler.close()
\ No newline at end of file
+            self.tacview_handler.close()
+        if self.metrics_logger is not None:
+            self.metrics_logger.close()
\ No newline at end of file
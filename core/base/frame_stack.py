@@ -0,0 +1,122 @@
+from typing import Iterable, Optional, Tuple, Union
+import numpy as np
+
+
+class FrameStack:
+    """
+    观测历史（帧堆叠）
+
+    每个环境一段长度为 2*history_len 的预分配缓冲区，新帧同时写入 pos 和 pos+history_len 两个位置，
+    因此任何时刻最近 history_len 帧都是一段连续切片，stacked() 直接返回视图而不拷贝、不做 np.roll。
+    多个环境（向量环境的各个槽位）共用同一个写指针：某个环境回合结束时用首帧填满它自己的整段缓冲区，
+    与其他环境的写入位置无关。
+
+    返回的视图在下一次 push 之前有效，需要长期保存时由调用方自行 copy()
+    """
+
+    def __init__(self, history_len: int, feature_shape: Union[int, Tuple[int, ...]],
+                 num_envs: int = 1, dtype=np.float32):
+        """
+        Args:
+            history_len: 堆叠的帧数，1 表示不堆叠
+            feature_shape: 单帧特征的形状
+            num_envs: 环境数量（向量环境槽位数）
+            dtype: 缓冲区数据类型
+        """
+        if history_len < 1:
+            raise ValueError("history_len 必须 >= 1")
+        self.history_len = history_len
+        self.feature_shape = (feature_shape,) if isinstance(feature_shape, int) else tuple(feature_shape)
+        self.num_envs = num_envs
+        self.buffer = np.zeros((num_envs, 2 * history_len) + self.feature_shape, dtype=dtype)
+        self._pos = 0
+
+    @property
+    def stacked_shape(self) -> Tuple[int, ...]:
+        """单个环境堆叠后的形状 (history_len, *feature_shape)"""
+        return (self.history_len,) + self.feature_shape
+
+    @property
+    def flat_dim(self) -> int:
+        return self.history_len * int(np.prod(self.feature_shape))
+
+    def reset(self, frame: np.ndarray, env_ids: Optional[Iterable[int]] = None):
+        """
+        回合开始：用首帧填满指定环境的整段历史（frame 为单帧或按 env_ids 排列的多帧）
+
+        Args:
+            frame: 首帧观测
+            env_ids: 需要重置的环境，None 表示全部
+        """
+        if env_ids is None:
+            env_ids = slice(None)
+        else:
+            env_ids = np.fromiter(env_ids, dtype=np.intp)
+        frame = np.asarray(frame, dtype=self.buffer.dtype)
+        if frame.shape == self.feature_shape:
+            self.buffer[env_ids] = frame
+        else:
+            self.buffer[env_ids] = frame[:, None]
+
+    def push(self, frame: np.ndarray):
+        """
+        写入所有环境的新一帧，frame 形状为 feature_shape（单环境）或 (num_envs, *feature_shape)
+        """
+        pos = self._pos
+        self.buffer[:, pos] = frame
+        self.buffer[:, pos + self.history_len] = frame
+        self._pos = (pos + 1) % self.history_len
+
+    def stacked(self, env_id: Optional[int] = None) -> np.ndarray:
+        """
+        最近 history_len 帧，时间从旧到新
+
+        Returns:
+            env_id 为 None 时形状 (num_envs, history_len, *feature_shape)，否则 (history_len, *feature_shape)
+        """
+        window = slice(self._pos, self._pos + self.history_len)
+        if env_id is None:
+            return self.buffer[:, window]
+        return self.buffer[env_id, window]
+
+    def flat(self, env_id: int = 0) -> np.ndarray:
+        """展平的单环境堆叠观测（连续切片上的 reshape，仍是视图；交给调用方保存时需要 copy）"""
+        return self.stacked(env_id).reshape(-1)
+
+    def latest(self, env_id: int = 0) -> np.ndarray:
+        """最新一帧"""
+        return self.buffer[env_id, self._pos + self.history_len - 1]
+
+
+if __name__ == "__main__":
+    # 与 np.roll 式堆叠对比正确性与耗时
+    import time
+
+    history, dim, steps = 8, 14, 20000
+    rng = np.random.default_rng(0)
+    frames = rng.normal(size=(steps, dim))
+
+    stack = FrameStack(history, dim, dtype=np.float64)
+    reference = np.zeros((history, dim))
+    stack.reset(frames[0])
+    reference[:] = frames[0]
+    for i in range(1, 200):
+        stack.push(frames[i])
+        reference = np.roll(reference, -1, axis=0)
+        reference[-1] = frames[i]
+        assert np.array_equal(stack.stacked(0), reference)
+    print("√ 与 np.roll 结果一致")
+
+    t = time.perf_counter()
+    for i in range(steps):
+        stack.push(frames[i])
+        stack.flat()
+    ring_us = (time.perf_counter() - t) / steps * 1e6
+
+    t = time.perf_counter()
+    for i in range(steps):
+        reference = np.roll(reference, -1, axis=0)
+        reference[-1] = frames[i]
+        reference.reshape(-1).copy()
+    roll_us = (time.perf_counter() - t) / steps * 1e6
+    print(f"环形缓冲 {ring_us:.2f} us/步，np.roll {roll_us:.2f} us/步")
@@ -0,0 +1,203 @@
+"""
+流水线向量化环境：先向所有环境发出动作，再依次取回并处理观测，使服务端计算与客户端处理重叠
+
+与 DummyVecEnv 逐个 "发送 → 等待 → 处理" 不同:
+    step_async(actions)   每个环境转换并发出动作后立即返回（各环境使用各自的连接，服务端并行计算）
+    step_wait()           按顺序取回观测，处理第 i 个环境（特征、奖励、终止）时其余环境仍在服务端计算；
+                          回合结束的环境自动 reset，终止前的观测放在 info["terminal_observation"]
+
+按 indices 分组调用可以进一步让策略推理与服务端计算重叠（双缓冲）:
+    vec.step_async(act_a, A); vec.step_async(act_b, B)
+    while ...:
+        obs_a, ... = vec.step_wait(A); vec.step_async(policy(obs_a), A)    # A 推理时 B 在服务端计算
+        obs_b, ... = vec.step_wait(B); vec.step_async(policy(obs_b), B)
+
+语义:
+    - 每个环境同一时刻最多一个未取回的请求，step_async / step_wait 对同一组环境必须成对调用
+    - 返回值与逐个调用 env.step 完全相同；渲染、轨迹记录和指标写入推迟到该环境下一次 step_async 时执行
+      （服务端计算期间），因此比返回值晚一步落盘
+    - 环境需实现 step_async(action) / step_wait()（见 PointTrackingEnv）
+
+对比测试: python -m core.base.pipelined_vec_env --latency-ms 5 --num-envs 4 --policy-ms 2
+"""
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import gymnasium as gym
+import numpy as np
+
+try:
+    from stable_baselines3.common.vec_env.base_vec_env import VecEnv
+except ImportError:  # 未安装 SB3 时作为独立的向量化环境使用
+    VecEnv = object
+
+
+class PipelinedVecEnv(VecEnv):
+    """流水线向量化环境，接口与 SB3 VecEnv 相同，另外支持按 indices 分组步进"""
+
+    def __init__(self, env_fns: Sequence[Callable[[], gym.Env]]):
+        self.envs: List[gym.Env] = [fn() for fn in env_fns]
+        env = self.envs[0]
+        if VecEnv is object:
+            self.num_envs = len(self.envs)
+            self.observation_space = env.observation_space
+            self.action_space = env.action_space
+            self._seeds: List[Optional[int]] = [None] * self.num_envs
+            self._options: List[Dict[str, Any]] = [{} for _ in range(self.num_envs)]
+        else:
+            super().__init__(len(self.envs), env.observation_space, env.action_space)
+        self._in_flight = np.zeros(self.num_envs, dtype=bool)
+        self.reset_infos: List[Dict[str, Any]] = [{} for _ in range(self.num_envs)]
+
+    def _indices(self, indices) -> List[int]:
+        if indices is None:
+            return list(range(self.num_envs))
+        if isinstance(indices, int):
+            return [indices]
+        return list(indices)
+
+    def seed(self, seed: Optional[int] = None):
+        if seed is None:
+            return [None] * self.num_envs
+        self._seeds = [seed + i for i in range(self.num_envs)]
+        return self._seeds
+
+    def reset(self) -> np.ndarray:
+        observations = []
+        for i, env in enumerate(self.envs):
+            obs, self.reset_infos[i] = env.reset(seed=self._seeds[i], **({"options": self._options[i]}
+                                                                          if self._options[i] else {}))
+            observations.append(obs)
+        self._seeds = [None] * self.num_envs
+        self._options = [{} for _ in range(self.num_envs)]
+        return np.stack(observations)
+
+    def step_async(self, actions: np.ndarray, indices=None):
+        """向指定环境（默认全部）发出动作，actions 与 indices 一一对应"""
+        indices = self._indices(indices)
+        if self._in_flight[indices].any():
+            raise RuntimeError("部分环境上一次 step_async 的结果尚未取回")
+        for action, i in zip(actions, indices):
+            self.envs[i].step_async(action)
+            self._in_flight[i] = True
+
+    def step_wait(self, indices=None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[Dict[str, Any]]]:
+        """取回指定环境（默认全部）的结果 (obs, rewards, dones, infos)，结束的环境自动 reset"""
+        indices = self._indices(indices)
+        observations, rewards, dones, infos = [], np.zeros(len(indices)), np.zeros(len(indices), dtype=bool), []
+        for k, i in enumerate(indices):
+            if not self._in_flight[i]:
+                raise RuntimeError(f"环境 {i} 没有等待取回的 step_async 请求")
+            env = self.envs[i]
+            obs, rewards[k], terminated, truncated, info = env.step_wait()
+            self._in_flight[i] = False
+            dones[k] = terminated or truncated
+            info["TimeLimit.truncated"] = truncated and not terminated
+            if dones[k]:
+                # 先复制再 reset：环境返回的观测可能与下一回合共享缓冲区
+                info["terminal_observation"] = np.array(obs, copy=True)
+                obs, self.reset_infos[i] = env.reset()
+            observations.append(obs)
+            infos.append(info)
+        return np.stack(observations), rewards, dones, infos
+
+    def step(self, actions: np.ndarray, indices=None):
+        self.step_async(actions, indices)
+        return self.step_wait(indices)
+
+    def close(self):
+        for env in self.envs:
+            env.close()
+
+    def _target_envs(self, indices) -> List[gym.Env]:
+        return [self.envs[i] for i in self._indices(indices)]
+
+    def get_attr(self, attr_name: str, indices=None) -> List[Any]:
+        return [getattr(env, attr_name) for env in self._target_envs(indices)]
+
+    def set_attr(self, attr_name: str, value: Any, indices=None):
+        for env in self._target_envs(indices):
+            setattr(env, attr_name, value)
+
+    def env_method(self, method_name: str, *method_args, indices=None, **method_kwargs) -> List[Any]:
+        return [getattr(env, method_name)(*method_args, **method_kwargs) for env in self._target_envs(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices=None) -> List[bool]:
+        return [isinstance(env, wrapper_class) for env in self._target_envs(indices)]
+
+
+def _benchmark(num_envs: int = 4, steps: int = 300, latency_ms: float = 5.0, policy_ms: float = 2.0):
+    """对比 逐个步进 / 流水线 / 分组双缓冲 三种方式的吞吐（环境步/秒），替身服务在独立进程中运行"""
+    import multiprocessing
+    import socket
+    import time
+    from communication.stub_tcp_server import StubTCPServer
+    from communication.tcp_client import SimulationClient
+    from core.environments.point_tracking.point_tracking_env import PointTrackingEnv
+
+    probe = socket.socket()
+    probe.bind(("127.0.0.1", 0))
+    port = probe.getsockname()[1]
+    probe.close()
+    ctx = multiprocessing.get_context("fork")
+    server = ctx.Process(target=lambda: StubTCPServer("127.0.0.1", port, latency_ms).serve_forever(), daemon=True)
+    server.start()
+    time.sleep(0.3)
+
+    vec = PipelinedVecEnv([lambda: PointTrackingEnv(SimulationClient("127.0.0.1", port), max_steps=200)
+                           for _ in range(num_envs)])
+    rng = np.random.default_rng(0)
+
+    def policy(obs: np.ndarray) -> np.ndarray:
+        # 模拟一次批量推理的耗时（GPU 推理期间不占用 GIL）
+        time.sleep(policy_ms / 1000.0)
+        return rng.uniform(-1, 1, (len(obs),) + vec.action_space.shape)
+
+    def serial():
+        obs = vec.reset()
+        for _ in range(steps):
+            actions = policy(obs)
+            results = []
+            for i, env in enumerate(vec.envs):
+                o, _, terminated, truncated, _ = env.step(actions[i])
+                results.append(env.reset()[0] if terminated or truncated else o)
+            obs = np.stack(results)
+
+    def pipelined():
+        obs = vec.reset()
+        for _ in range(steps):
+            obs = vec.step(policy(obs))[0]
+
+    def double_buffered():
+        obs = vec.reset()
+        groups = [list(range(0, num_envs, 2)), list(range(1, num_envs, 2))]
+        for group in groups:
+            vec.step_async(policy(obs[group]), group)
+        for _ in range(steps):
+            for group in groups:
+                group_obs = vec.step_wait(group)[0]
+                vec.step_async(policy(group_obs), group)
+        for group in groups:
+            vec.step_wait(group)
+
+    print(f"{num_envs} 个环境 × {steps} 步，服务端步进 {latency_ms} ms，策略推理 {policy_ms} ms")
+    baseline = None
+    for label, run in (("逐个步进", serial), ("流水线", pipelined), ("分组双缓冲", double_buffered)):
+        start = time.perf_counter()
+        run()
+        rate = num_envs * steps / (time.perf_counter() - start)
+        baseline = baseline or rate
+        print(f"  {label:<6} {rate:8.1f} 步/秒  ({rate / baseline:.2f}x)")
+    vec.close()
+    server.terminate()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="流水线向量化环境吞吐对比")
+    parser.add_argument("--num-envs", type=int, default=4)
+    parser.add_argument("--steps", type=int, default=300)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="替身服务每次步进的计算耗时")
+    parser.add_argument("--policy-ms", type=float, default=2.0, help="模拟的策略推理耗时")
+    args = parser.parse_args()
+    _benchmark(args.num_envs, args.steps, args.latency_ms, args.policy_ms)
@@ -0,0 +1,23 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Any
+
+
+class RewardCalculatorBase(ABC):
+    """奖励计算器基类"""
+
+    def __init__(self):
+        # 最近一步的各项奖励分量，用于写入info和指标日志
+        self.reward_components: Dict[str, float] = {}
+
+    @abstractmethod
+    def calculate(self, env_data: Dict[str, Any], action: Dict[str, Any]) -> float:
+        """计算单步奖励"""
+        pass
+
+    def reset(self):
+        """回合开始，有跨步状态（累计量、助攻记录等）的计算器在这里清空"""
+        pass
+
+    def get_reward_components(self) -> Dict[str, float]:
+        """返回最近一步的各项奖励分量"""
+        return self.reward_components
@@ -0,0 +1,348 @@
+"""
+N 对 M 空战的团队奖励：每步一次向量化计算全部己方智能体的个体奖励和团队奖励
+
+输入（多机格式）:
+    env_data["agents"]    己方 N 架，每架 {"name", "position": {X, Y, Z}, "velocity", "altitude",
+                          "heading", "pitch", "alive"}
+    env_data["enemies"]   敌方 M 架，字段相同
+    env_data["events"]    本步事件 [{"type": "launch" / "hit" / "kill" / "damage",
+                          "shooter": 名称, "target": 名称, "amount": 伤害}]
+没有 agents 时按单机格式转换：ownship 为第 0 个智能体、friendlies 依次排在其后；
+combat_results 的 hit / kill 记在 ownship 名下，missiles_remaining 的减少记为发射，
+damage.total_damage 的增加记为 ownship 受到的伤害，累计伤害达到 1 记为被击毁
+
+个体奖励分量（均为 (N,) 数组）:
+    survival   存活奖励
+    distance   与最近存活敌机的距离是否在理想交战区间
+    angle      最近敌机相对机头的方位角 / 俯仰角
+    energy     相对最近敌机的速度和高度优势
+    combat     命中、击毁、发射消耗、受到伤害、被击毁
+最近敌机用 SpatialGrid 批量查询（N×M 较小时直接算距离矩阵），事件按名称映射到下标后用 np.add.at 累加，
+单步代价随 N + M 和事件数线性增长
+
+信用分配（credit）:
+    individual  各自的奖励
+    shared      全队平均奖励（每个智能体相同）
+    mixed       (1 - team_spirit) × 个体奖励 + team_spirit × 全队平均
+    assist      击毁奖励按本回合对该目标的命中次数在击毁者和助攻者之间分配，其余同 individual
+团队奖励为分配前全部个体奖励之和
+
+性能测试: python -m core.base.team_reward
+"""
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.base.reward_calculator_base import RewardCalculatorBase
+from utils.spatial_index import SpatialGrid
+
+CREDIT_MODES = ("individual", "shared", "mixed", "assist")
+
+# N×M 不超过该值时直接计算距离矩阵，比建网格快
+_DENSE_LIMIT = 4096
+
+
+def _entity_arrays(entities: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """实体列表转换为列数组：位置 (K, 3)、速度、高度、航向、俯仰、存活标志和名称"""
+    rows = []
+    names = []
+    for i, entity in enumerate(entities):
+        position = entity.get("position", {})
+        altitude = entity.get("altitude", position.get("Z", 0.0))
+        rows.append((position.get("X", 0.0), position.get("Y", 0.0), position.get("Z", altitude),
+                     entity.get("velocity", 0.0), altitude, entity.get("heading", 0.0),
+                     entity.get("pitch", 0.0), float(bool(entity.get("alive", True)))))
+        names.append(entity.get("name", i))
+    table = np.array(rows, dtype=np.float64).reshape(-1, 8)
+    return {"position": table[:, :3], "velocity": table[:, 3], "altitude": table[:, 4],
+            "heading": table[:, 5], "pitch": table[:, 6], "alive": table[:, 7] > 0, "names": names}
+
+
+class TeamRewardCalculator(RewardCalculatorBase):
+    """N 对 M 团队奖励计算器，calculate 返回 agent_index 号智能体的奖励，全部结果见 rewards / team_reward"""
+
+    def __init__(self,
+                 credit: str = "individual",
+                 team_spirit: float = 0.5,
+                 agent_index: int = 0,
+                 ideal_range: Tuple[float, float] = (5000.0, 10000.0),
+                 search_radius: float = 100000.0,
+                 survival_reward: float = 0.01,
+                 hit_reward: float = 5.0,
+                 kill_reward: float = 20.0,
+                 launch_cost: float = 0.1,
+                 damage_penalty: float = 10.0,
+                 death_penalty: float = 20.0):
+        """
+        Args:
+            credit: 信用分配方式，见 CREDIT_MODES
+            team_spirit: mixed 模式下全队平均奖励的权重
+            agent_index: calculate 返回哪个智能体的奖励
+            ideal_range: 理想交战距离区间（米）
+            search_radius: 最近敌机的搜索半径（米），范围内没有敌机时按该距离计算距离奖励，角度和能量奖励为 0
+            survival_reward / hit_reward / kill_reward / launch_cost / damage_penalty / death_penalty: 各项奖励系数
+        """
+        super().__init__()
+        if credit not in CREDIT_MODES:
+            raise ValueError(f"未知的信用分配方式: {credit}，可选 {CREDIT_MODES}")
+        self.credit = credit
+        self.team_spirit = team_spirit
+        self.agent_index = agent_index
+        self.ideal_min, self.ideal_max = ideal_range
+        self.search_radius = search_radius
+        self.survival_reward = survival_reward
+        self.hit_reward = hit_reward
+        self.kill_reward = kill_reward
+        self.launch_cost = launch_cost
+        self.damage_penalty = damage_penalty
+        self.death_penalty = death_penalty
+        self._grid = SpatialGrid(cell_size=self.ideal_max)
+
+        # 最近一步的结果
+        self.rewards = np.zeros(0)
+        self.team_reward = 0.0
+        self.agent_components: Dict[str, np.ndarray] = {}
+        self.reset()
+
+    def reset(self):
+        """回合开始：清空助攻记录和单机格式的累计量"""
+        self._hits: Dict[Any, Dict[Any, int]] = {}
+        self._last_damage = 0.0
+        self._last_missiles: Optional[float] = None
+
+    # ---------- 输入 ----------
+    def _single_ship_events(self, env_data: Dict[str, Any], own_name: Any) -> List[Dict[str, Any]]:
+        """单机格式的 combat_results / weapons / damage 转换为事件列表"""
+        events = []
+        results = env_data.get("combat_results", {})
+        target = results.get("target")
+        if results.get("hit", False):
+            events.append({"type": "hit", "shooter": own_name, "target": target})
+        if results.get("kill", False):
+            events.append({"type": "kill", "shooter": own_name, "target": target})
+
+        missiles = env_data.get("weapons", {}).get("missiles_remaining")
+        if missiles is not None:
+            if self._last_missiles is not None and missiles < self._last_missiles:
+                events.extend({"type": "launch", "shooter": own_name}
+                              for _ in range(int(self._last_missiles - missiles)))
+            self._last_missiles = missiles
+
+        damage = env_data.get("damage", {}).get("total_damage", 0.0)
+        if damage > self._last_damage:
+            events.append({"type": "damage", "target": own_name, "amount": damage - self._last_damage})
+            if self._last_damage < 1.0 <= damage:
+                events.append({"type": "kill", "target": own_name})
+        self._last_damage = damage
+        return events
+
+    def _parse(self, env_data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any], List[Dict[str, Any]]]:
+        if "agents" in env_data:
+            agents = _entity_arrays(env_data["agents"])
+            events = env_data.get("events", [])
+        else:
+            ownship = dict(env_data.get("ownship", {}))
+            ownship.setdefault("name", "ownship")
+            agents = _entity_arrays([ownship] + list(env_data.get("friendlies", [])))
+            events = env_data.get("events") or self._single_ship_events(env_data, ownship["name"])
+        return agents, _entity_arrays(env_data.get("enemies", [])), events
+
+    # ---------- 几何 ----------
+    def _nearest(self, agents: Dict[str, Any], enemies: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """每个己方智能体最近的存活敌机下标（没有为 -1）和距离（没有为 inf）"""
+        alive = np.flatnonzero(enemies["alive"])
+        own = agents["position"]
+        if len(alive) == 0:
+            return np.full(len(own), -1), np.full(len(own), np.inf)
+        targets = enemies["position"][alive]
+        if len(own) * len(alive) <= _DENSE_LIMIT:
+            delta = targets[None, :, :] - own[:, None, :]
+            distance = np.sqrt(np.einsum("ijk,ijk->ij", delta, delta))
+            index = distance.argmin(axis=1)
+            nearest = distance[np.arange(len(own)), index]
+            far = nearest > self.search_radius
+            index[far], nearest[far] = -1, np.inf
+        else:
+            index, nearest = self._grid.build(targets).query_nearest_batch(own, self.search_radius)
+        return np.where(index >= 0, alive[np.maximum(index, 0)], -1), nearest
+
+    def _geometry_rewards(self, agents: Dict[str, Any], enemies: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        target, distance = self._nearest(agents, enemies)
+        found = target >= 0
+        distance = np.minimum(distance, self.search_radius)
+
+        # 理想区间内 0.1，过近每公里 -0.05，过远每公里 -0.02
+        distance_reward = np.where(distance < self.ideal_min, -0.05 * (self.ideal_min - distance) / 1000.0,
+                                   np.where(distance > self.ideal_max,
+                                            -0.02 * (distance - self.ideal_max) / 1000.0, 0.1))
+
+        t = np.maximum(target, 0)
+        delta = enemies["position"][t] - agents["position"] if len(enemies["names"]) else np.zeros_like(
+            agents["position"])
+        # 航向从正北顺时针，X 向东、Y 向北
+        bearing = np.degrees(np.arctan2(delta[:, 0], delta[:, 1])) - agents["heading"]
+        bearing = (bearing + 180.0) % 360.0 - 180.0
+        elevation = np.degrees(np.arctan2(delta[:, 2], np.hypot(delta[:, 0], delta[:, 1]))) - agents["pitch"]
+        angle_reward = (np.maximum(0.0, 1.0 - np.abs(bearing) / 30.0)
+                        + np.maximum(0.0, 1.0 - np.abs(elevation) / 15.0)) * 0.1
+
+        if len(enemies["names"]):
+            velocity_advantage = agents["velocity"] - enemies["velocity"][t]
+            altitude_advantage = agents["altitude"] - enemies["altitude"][t]
+        else:
+            velocity_advantage = altitude_advantage = np.zeros(len(t))
+        energy_reward = (velocity_advantage / 100.0 + altitude_advantage / 1000.0) * 0.1
+
+        return {"distance": distance_reward,
+                "angle": np.where(found, angle_reward, 0.0),
+                "energy": np.where(found, energy_reward, 0.0),
+                "nearest": target,
+                "nearest_distance": np.where(found, distance, np.inf)}
+
+    # ---------- 事件 ----------
+    def _event_rewards(self, agents: Dict[str, Any], events: List[Dict[str, Any]]) -> np.ndarray:
+        """事件奖励：按名称映射到智能体下标后一次累加，敌方发起或针对敌方的部分忽略"""
+        combat = np.zeros(len(agents["names"]))
+        if not events:
+            return combat
+        lookup = {name: i for i, name in enumerate(agents["names"])}
+        kinds = np.array([e.get("type") for e in events], dtype=object)
+        shooter = np.array([lookup.get(e.get("shooter"), -1) for e in events])
+        target = np.array([lookup.get(e.get("target"), -1) for e in events])
+        amount = np.array([float(e.get("amount", 0.0)) for e in events])
+
+        own_shot = shooter >= 0
+        for kind, value in (("hit", self.hit_reward), ("launch", -self.launch_cost)):
+            mask = own_shot & (kinds == kind)
+            np.add.at(combat, shooter[mask], value)
+        mask = (target >= 0) & (kinds == "damage")
+        np.add.at(combat, target[mask], -self.damage_penalty * amount[mask])
+        mask = (target >= 0) & (kinds == "kill")
+        np.add.at(combat, target[mask], -self.death_penalty)
+
+        kills = np.flatnonzero(own_shot & (kinds == "kill") & (target < 0))
+        if self.credit != "assist":
+            np.add.at(combat, shooter[kills], self.kill_reward)
+        else:
+            # 记录本回合对每个目标的命中，击毁时按命中次数分配（击毁者至少计 1 次）
+            for k in np.flatnonzero(own_shot & (kinds == "hit")):
+                hits = self._hits.setdefault(events[k].get("target"), {})
+                name = agents["names"][shooter[k]]
+                hits[name] = hits.get(name, 0) + 1
+            for k in kills:
+                hits = self._hits.pop(events[k].get("target"), {})
+                weights = np.zeros(len(combat))
+                for name, count in hits.items():
+                    if name in lookup:
+                        weights[lookup[name]] += count
+                weights[shooter[k]] = max(weights[shooter[k]], 1.0)
+                combat += self.kill_reward * weights / weights.sum()
+        return combat
+
+    # ---------- 计算 ----------
+    def compute(self, env_data: Dict[str, Any]) -> np.ndarray:
+        """计算全部己方智能体的奖励 (N,)，同时更新 team_reward 和 agent_components"""
+        agents, enemies, events = self._parse(env_data)
+        components = self._geometry_rewards(agents, enemies)
+        components["survival"] = np.where(agents["alive"], self.survival_reward, 0.0)
+        components["combat"] = self._event_rewards(agents, events)
+
+        individual = (components["survival"] + components["distance"] + components["angle"]
+                      + components["energy"] + components["combat"])
+        # 已被击毁的智能体只保留事件奖励（例如本步被击毁的惩罚）
+        individual = np.where(agents["alive"], individual, components["combat"])
+        self.team_reward = float(individual.sum())
+
+        team_mean = self.team_reward / max(len(individual), 1)
+        if self.credit == "shared":
+            rewards = np.full_like(individual, team_mean)
+        elif self.credit == "mixed":
+            rewards = (1.0 - self.team_spirit) * individual + self.team_spirit * team_mean
+        else:
+            rewards = individual
+
+        components["individual"] = individual
+        components["total"] = rewards
+        self.agent_components = components
+        self.rewards = rewards
+        return rewards
+
+    def _calculate_action_penalty(self, action: Dict[str, Any]) -> float:
+        """动作惩罚 - 惩罚剧烈俯仰和滚转"""
+        penalty = 0.0
+        if abs(action.get("pitch", 0)) > 0.8:
+            penalty -= 0.02
+        if abs(action.get("roll", 0)) > 0.8:
+            penalty -= 0.02
+        return penalty
+
+    def calculate(self, env_data: Dict[str, Any], action: Dict[str, Any]) -> float:
+        """计算 agent_index 号智能体的单步奖励（含其动作惩罚）"""
+        rewards = self.compute(env_data)
+        if self.agent_index >= len(rewards):
+            self.reward_components = {"team": self.team_reward, "total": 0.0}
+            return 0.0
+        i = self.agent_index
+        action_penalty = self._calculate_action_penalty(action)
+        components = self.agent_components
+        total = float(rewards[i]) + action_penalty
+        self.reward_components = {
+            "survival": float(components["survival"][i]),
+            "distance": float(components["distance"][i]),
+            "angle": float(components["angle"][i]),
+            "energy": float(components["energy"][i]),
+            "action_penalty": action_penalty,
+            "combat": float(components["combat"][i]),
+            "team": self.team_reward,
+            "total": total
+        }
+        return total
+
+
+def _synthetic_engagement(n: int, m: int, rng: np.random.Generator) -> Dict[str, Any]:
+    """密度固定的 N 对 M 场景：区域边长随 sqrt(N + M) 增长，每架约 5% 概率产生一个事件"""
+    side = 20000.0 * np.sqrt(n + m)
+
+    def fleet(count: int, prefix: str, y0: float) -> List[Dict[str, Any]]:
+        return [{"name": f"{prefix}{i}",
+                 "position": {"X": float(rng.uniform(0, side)), "Y": float(y0 + rng.uniform(0, side / 2)),
+                              "Z": float(rng.uniform(3000, 12000))},
+                 "velocity": float(rng.uniform(200, 350)), "heading": float(rng.uniform(0, 360)),
+                 "pitch": 0.0, "alive": bool(rng.random() > 0.05)} for i in range(count)]
+
+    agents, enemies = fleet(n, "blue", 0.0), fleet(m, "red", side / 2)
+    events = []
+    for _ in range(max(1, (n + m) // 20)):
+        kind = str(rng.choice(["launch", "hit", "kill", "damage"]))
+        events.append({"type": kind, "shooter": f"blue{rng.integers(n)}", "target": f"red{rng.integers(m)}"}
+                      if kind != "damage" else
+                      {"type": kind, "shooter": f"red{rng.integers(m)}", "target": f"blue{rng.integers(n)}",
+                       "amount": 0.3})
+    return {"agents": agents, "enemies": enemies, "events": events}
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    calculator = TeamRewardCalculator(credit="assist", ideal_range=(20000.0, 60000.0), search_radius=150000.0)
+
+    # 正确性：网格最近邻与距离矩阵一致
+    data = _synthetic_engagement(300, 300, rng)
+    agents, enemies, _ = calculator._parse(data)
+    index, distance = calculator._nearest(agents, enemies)
+    alive = np.flatnonzero(enemies["alive"])
+    full = np.linalg.norm(agents["position"][:, None] - enemies["position"][alive][None], axis=2)
+    expected = np.where(full.min(axis=1) <= calculator.search_radius, full.min(axis=1), np.inf)
+    assert np.allclose(distance, expected)
+
+    print("规模        每步耗时      每架耗时")
+    for n in (2, 8, 32, 128, 512, 2048):
+        data = _synthetic_engagement(n, n, rng)
+        repeats = max(3, 2000 // n)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            calculator.compute(data)
+        elapsed = (time.perf_counter() - start) / repeats
+        print(f"{n:4d} v {n:<4d} {elapsed * 1e3:9.3f} ms {elapsed * 1e6 / (2 * n):9.2f} us")
+    print(f"团队奖励 {calculator.team_reward:.2f}，各分量: {sorted(calculator.agent_components)}")
@@ -0,0 +1,172 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Callable, List, Optional, Sequence, Tuple
+import numpy as np
+
+# 谓词的输入是一步的几何/状态上下文 {名称: 标量 或 (N,) 数组}，返回 bool 或 (N,) bool 数组。
+# 谓词只用比较和 | & 运算，同一个函数对单环境标量和多环境数组都成立
+Predicate = Callable[[Dict[str, Any]], Any]
+
+
+class TerminationCondition:
+    """一个已注册的终止条件"""
+
+    __slots__ = ("name", "predicate", "truncation")
+
+    def __init__(self, name: str, predicate: Predicate, truncation: bool = False):
+        """
+        Args:
+            name: 条件名称，触发时写入 info["termination_reason"]
+            predicate: 判定函数
+            truncation: True 表示截断（时间耗尽等），False 表示终止
+        """
+        self.name = name
+        self.predicate = predicate
+        self.truncation = truncation
+
+
+# ---------- 常用条件 ----------
+def ground_collision(min_altitude: float = 1000.0) -> Predicate:
+    """高度低于下限视为坠地"""
+    return lambda ctx: ctx["altitude"] < min_altitude
+
+
+def target_reached(radius: float = 500.0) -> Predicate:
+    """与目标距离小于半径"""
+    return lambda ctx: ctx["distance"] < radius
+
+
+def out_of_bounds(max_range: float, max_altitude: float = 20000.0) -> Predicate:
+    """离开作战区域：水平距原点超过 max_range 或高度超过 max_altitude"""
+    return lambda ctx: (ctx["range_from_origin"] > max_range) | (ctx["altitude"] > max_altitude)
+
+
+def fuel_exhausted(min_fuel: float = 0.0) -> Predicate:
+    """燃油耗尽"""
+    return lambda ctx: ctx["fuel"] <= min_fuel
+
+
+def killed() -> Predicate:
+    """己方被击毁"""
+    return lambda ctx: ctx["killed"]
+
+
+def timeout(max_steps: int) -> Predicate:
+    """达到最大步数"""
+    return lambda ctx: ctx["step"] >= max_steps
+
+
+class TerminationCheckerBase(ABC):
+    """
+    终止检查器基类
+
+    子类在 _register_conditions 中按优先级顺序注册条件，需要从原始环境数据判定时重写 build_context。
+    上下文也可以由环境直接传入（与奖励计算共用同一份几何量），避免重复计算，此时无需重写。
+    单环境判定按注册顺序遇到第一个成立的条件即返回；多环境判定逐条件向量化，全部环境都已结束时提前退出
+    """
+
+    def __init__(self):
+        self.conditions: List[TerminationCondition] = []
+        self.reason_names: Tuple[str, ...] = ()
+        self._truncation = np.zeros(0, dtype=bool)
+        self._register_conditions()
+        # 最近一次判定结果
+        self.reason: Optional[str] = None
+        self._terminated = False
+        self._truncated = False
+        self._last_data = None
+        # 回合内已判定的步数，build_context 可用作 ctx["step"]
+        self.step_count = 0
+        # 各条件触发次数，用于统计分析
+        self.counts: Dict[str, int] = {name: 0 for name in self.reason_names}
+
+    @abstractmethod
+    def _register_conditions(self):
+        """注册终止条件"""
+        pass
+
+    def build_context(self, env_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        从单个环境的数据构造判定上下文
+
+        默认认为传入的已经是上下文（环境自己算好的几何量），原样返回；
+        从原始观测帧判定的子类（如对抗环境）需要重写
+        """
+        return env_data
+
+    def build_context_batch(self, env_datas: Sequence[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """多个环境的上下文，逐键堆叠为 (N,) 数组"""
+        contexts = [self.build_context(d) for d in env_datas]
+        return {key: np.array([c[key] for c in contexts]) for key in contexts[0]}
+
+    def register(self, name: str, predicate: Predicate, truncation: bool = False):
+        """注册一个条件，注册顺序即优先级"""
+        self.conditions.append(TerminationCondition(name, predicate, truncation))
+        self.reason_names = tuple(c.name for c in self.conditions)
+        self._truncation = np.array([c.truncation for c in self.conditions], dtype=bool)
+        if hasattr(self, "counts"):
+            self.counts.setdefault(name, 0)
+
+    def reset(self):
+        """回合开始"""
+        self.reason = None
+        self._terminated = False
+        self._truncated = False
+        self._last_data = None
+        self.step_count = 0
+
+    def evaluate(self, ctx: Dict[str, Any]) -> Tuple[bool, bool, Optional[str]]:
+        """
+        单环境判定
+
+        Returns:
+            (terminated, truncated, 触发的条件名称或None)
+        """
+        for condition in self.conditions:
+            if condition.predicate(ctx):
+                self.counts[condition.name] += 1
+                self.reason = condition.name
+                self._terminated = not condition.truncation
+                self._truncated = condition.truncation
+                return self._terminated, self._truncated, condition.name
+        self.reason = None
+        self._terminated = self._truncated = False
+        return False, False, None
+
+    def evaluate_batch(self, ctx: Dict[str, np.ndarray], num_envs: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        多环境向量化判定
+
+        Returns:
+            (terminated[N], truncated[N], reason[N])，reason 为 reason_names 的下标，-1 表示未结束
+        """
+        reason = np.full(num_envs, -1, dtype=np.int64)
+        done = np.zeros(num_envs, dtype=bool)
+        for i, condition in enumerate(self.conditions):
+            fired = np.asarray(condition.predicate(ctx), dtype=bool) & ~done
+            if fired.any():
+                reason[fired] = i
+                done |= fired
+                self.counts[condition.name] += int(fired.sum())
+                if done.all():
+                    break
+        is_truncation = done & self._truncation[np.maximum(reason, 0)]
+        return done & ~is_truncation, is_truncation, reason
+
+    def check(self, env_data: Dict[str, Any]) -> Tuple[bool, bool]:
+        """从环境数据判定，返回 (terminated, truncated)"""
+        self.step_count += 1
+        terminated, truncated, _ = self.evaluate(self.build_context(env_data))
+        self._last_data = env_data
+        return terminated, truncated
+
+    def is_terminated(self, env_data: Dict[str, Any]) -> bool:
+        """是否终止；与 is_truncated 对同一份数据只判定一次"""
+        if env_data is not self._last_data:
+            self.check(env_data)
+        return self._terminated
+
+    def is_truncated(self, env_data: Dict[str, Any]) -> bool:
+        """是否截断"""
+        if env_data is not self._last_data:
+            self.check(env_data)
+        return self._truncated
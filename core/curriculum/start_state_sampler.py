@@ -0,0 +1,205 @@
+import math
+from collections import deque
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+import numpy as np
+
+from utils.tools import RAMathUtil
+
+
+# 各维度在难度0（最易）和难度1（最难）时的采样区间
+# distance: 目标点水平距离(米)  altitude: 初始高度(米)
+# heading_offset: 初始航向与目标方位的偏差(度)  speed: 初始速度(米/秒)
+DEFAULT_CURRICULUM_RANGES: Dict[str, Tuple[Tuple[float, float], Tuple[float, float]]] = {
+    "distance": ((3000.0, 5000.0), (12000.0, 15000.0)),
+    "altitude": ((6000.0, 7000.0), (2500.0, 10000.0)),
+    "heading_offset": ((0.0, 15.0), (0.0, 180.0)),
+    "speed": ((220.0, 250.0), (150.0, 320.0)),
+}
+
+
+class AdaptiveCurriculum:
+    """
+    根据最近若干回合的成功率自动调整难度
+
+    成功率高于 promote_threshold 时难度上调 step，低于 demote_threshold 时下调，
+    每次调整后清空统计窗口，避免同一批样本重复触发
+    """
+
+    def __init__(self,
+                 initial_difficulty: float = 0.0,
+                 window: int = 50,
+                 min_episodes: int = 20,
+                 promote_threshold: float = 0.8,
+                 demote_threshold: float = 0.3,
+                 step: float = 0.1):
+        self.difficulty = float(initial_difficulty)
+        self.min_episodes = min_episodes
+        self.promote_threshold = promote_threshold
+        self.demote_threshold = demote_threshold
+        self.step = step
+        self.outcomes = deque(maxlen=window)
+
+    def record(self, success: bool) -> float:
+        """记录一个回合结果，返回更新后的难度"""
+        self.outcomes.append(1.0 if success else 0.0)
+        if len(self.outcomes) >= self.min_episodes:
+            rate = self.success_rate()
+            if rate >= self.promote_threshold and self.difficulty < 1.0:
+                self.difficulty = min(1.0, self.difficulty + self.step)
+                self.outcomes.clear()
+            elif rate <= self.demote_threshold and self.difficulty > 0.0:
+                self.difficulty = max(0.0, self.difficulty - self.step)
+                self.outcomes.clear()
+        return self.difficulty
+
+    def success_rate(self) -> float:
+        return sum(self.outcomes) / len(self.outcomes) if self.outcomes else 0.0
+
+    def state_dict(self) -> Dict[str, Any]:
+        return {"difficulty": self.difficulty, "outcomes": list(self.outcomes)}
+
+    def load_state_dict(self, state: Dict[str, Any]):
+        self.difficulty = float(state["difficulty"])
+        self.outcomes.clear()
+        self.outcomes.extend(state["outcomes"])
+
+
+class StartStateSampler:
+    """
+    初始状态采样器
+
+    按当前课程难度为每个环境采样初始高度、航向、速度和目标点，
+    单连接单环境时各环境在自己的 reset 中调用 sample(env_id)；一个客户端承载多个环境时
+    （TCP count>1、共享内存）用 reset_batch 为全部环境采样，并在同一个 reset 请求里完成重置。
+    每个环境持有独立的随机数流，相同种子下采样序列可复现，且不受其他环境调用次数影响
+    """
+
+    def __init__(self,
+                 num_envs: int = 1,
+                 origin: Optional[Dict[str, float]] = None,
+                 ranges: Optional[Dict[str, Tuple[Tuple[float, float], Tuple[float, float]]]] = None,
+                 curriculum: Optional[AdaptiveCurriculum] = None,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            num_envs: 环境数量
+            origin: 初始位置经纬度 {'lat', 'lon'}，默认使用场景中心
+            ranges: 覆盖 DEFAULT_CURRICULUM_RANGES 中的部分维度
+            curriculum: 课程难度调度器，None 表示固定难度0
+            seed: 随机种子
+        """
+        self.num_envs = num_envs
+        self.origin = origin or {"lat": 24.0, "lon": 120.5}
+        self.ranges = dict(DEFAULT_CURRICULUM_RANGES)
+        if ranges:
+            self.ranges.update(ranges)
+        self.curriculum = curriculum or AdaptiveCurriculum()
+        self.targets: Dict[int, Dict[str, float]] = {}
+        self.seed(seed)
+
+    def seed(self, seed: Optional[int] = None):
+        """由一个种子派生出各环境独立的随机数流"""
+        children = np.random.SeedSequence(seed).spawn(self.num_envs)
+        self.rngs = [np.random.default_rng(child) for child in children]
+
+    def seed_env(self, env_id: int, seed: int):
+        """单独为某个环境重新设定种子（对应 gymnasium 的 reset(seed=...)）"""
+        self.rngs[env_id] = np.random.default_rng(seed)
+
+    @property
+    def difficulty(self) -> float:
+        return self.curriculum.difficulty
+
+    def _uniform(self, rng: np.random.Generator, key: str) -> float:
+        """在当前难度对应的区间内均匀采样"""
+        (easy_low, easy_high), (hard_low, hard_high) = self.ranges[key]
+        d = self.difficulty
+        low = easy_low + (hard_low - easy_low) * d
+        high = easy_high + (hard_high - easy_high) * d
+        return float(rng.uniform(low, high))
+
+    def sample(self, env_id: int) -> Dict[str, Any]:
+        """
+        为单个环境采样初始状态与目标点
+
+        Returns:
+            {"custom_state": {...}, "target": {'lat', 'lon', 'alt'}}
+        """
+        rng = self.rngs[env_id]
+        distance = self._uniform(rng, "distance")
+        altitude = self._uniform(rng, "altitude")
+        speed = self._uniform(rng, "speed")
+        heading_offset = self._uniform(rng, "heading_offset") * (1.0 if rng.random() < 0.5 else -1.0)
+
+        # 目标方位随机，初始航向 = 目标方位 + 偏差
+        bearing = float(rng.uniform(0.0, 360.0))
+        heading = (bearing + heading_offset) % 360.0
+
+        start = {"lat": self.origin["lat"], "lon": self.origin["lon"], "alt": altitude}
+        bearing_rad = math.radians(bearing)
+        target = RAMathUtil.convert_xy_to_lat_long(
+            start,
+            distance * math.sin(bearing_rad),
+            distance * math.cos(bearing_rad)
+        )
+
+        custom_state = {
+            "lon": start["lon"], "lat": start["lat"], "alt": altitude,
+            "heading": heading, "speed": speed
+        }
+        self.targets[env_id] = target
+        return {"custom_state": custom_state, "target": target}
+
+    def custom_states(self, env_ids: Iterable[int]) -> Dict[str, Dict[str, float]]:
+        """为一组环境采样，返回可直接放入 reset 请求的 custom_states"""
+        return {str(env_id): self.sample(env_id)["custom_state"] for env_id in env_ids}
+
+    def reset_batch(self, simulation_client, env_ids: Optional[Iterable[int]] = None,
+                    seeds: Optional[Dict[int, int]] = None):
+        """
+        多环境客户端上一次 reset 请求重置所有环境，seeds 为各环境转发给服务端的随机种子
+
+        Returns:
+            (frames, targets): {env_id: 初始观测帧}，以及 {env_id: 目标点}
+        """
+        env_ids = list(range(self.num_envs)) if env_ids is None else list(env_ids)
+        frames = simulation_client.reset_batch(env_ids, custom_states=self.custom_states(env_ids), seeds=seeds)
+        return frames, {env_id: self.targets[env_id] for env_id in env_ids}
+
+    def record_outcome(self, success: bool) -> float:
+        """回合结束时上报成功与否，返回更新后的难度"""
+        return self.curriculum.record(success)
+
+    def state_dict(self) -> Dict[str, Any]:
+        """课程进度与各环境随机数流的状态，用于断点续训"""
+        return {
+            "curriculum": self.curriculum.state_dict(),
+            "rngs": [rng.bit_generator.state for rng in self.rngs],
+            "targets": {env_id: dict(target) for env_id, target in self.targets.items()},
+        }
+
+    def load_state_dict(self, state: Dict[str, Any]):
+        self.curriculum.load_state_dict(state["curriculum"])
+        for rng, rng_state in zip(self.rngs, state["rngs"]):
+            rng.bit_generator.state = rng_state
+        self.targets = {int(env_id): dict(target) for env_id, target in state["targets"].items()}
+
+
+if __name__ == "__main__":
+    # 一个 TCP 连接承载 4 个环境：一次 reset 请求下发全部环境的初始状态
+    from communication.stub_tcp_server import start_stub_server
+    from communication.tcp_client import SimulationClient
+
+    num_envs = 4
+    server, port = start_stub_server()
+    client = SimulationClient("127.0.0.1", port, count=num_envs)
+    client.connect("testWzz")
+    sampler = StartStateSampler(num_envs=num_envs, seed=0)
+    frames, targets = sampler.reset_batch(client, seeds={i: i for i in range(num_envs)})
+    for env_id in range(num_envs):
+        platform = frames[str(env_id)]["platforms"][0]
+        target = targets[env_id]
+        print(f"环境 {env_id}: 高度 {platform['alt']:7.1f} 航向 {platform['heading']:6.1f} 速度 {platform['speed']:6.1f}"
+              f"  目标 ({target['lat']:.4f}, {target['lon']:.4f})")
+    client.close()
@@ -0,0 +1,17 @@
+from typing import Sequence
+
+from core.base.action_spaces_base import ActionAdapterBase, ActionField, continuous, binary
+
+
+class BasicCombatActionAdapter(ActionAdapterBase):
+    """基础空战动作适配器: 油门, 俯仰, 滚转, 偏航, 武器, 对抗"""
+
+    def _define_fields(self) -> Sequence[ActionField]:
+        return (
+            continuous("throttle", 0.0, 1.0),
+            continuous("pitch"),
+            continuous("roll"),
+            continuous("yaw"),
+            binary("weapon_control"),   # 二值化
+            binary("countermeasures"),  # 二值化
+        )
@@ -6,6 +6,7 @@ from core.base.environment_base import AirCombatEnvironmentBase
 from .feature_extractor import BasicCombatFeatureExtractor
 from .reward_calculator import BasicCombatRewardCalculator
 from .termination_checker import BasicCombatTerminationChecker
+from .action_spaces import BasicCombatActionAdapter
 
 
 class BasicCombatEnvironment(AirCombatEnvironmentBase):
@@ -15,13 +16,21 @@ class BasicCombatEnvironment(AirCombatEnvironmentBase):
                  sim_client,
                  render: bool = False,
                  save_acmi: bool = False,
-                 acmi_file_path: str = None):
+                 acmi_file_path: str = None,
+                 profiler=None,
+                 metrics_logger=None,
+                 history_len: int = 1,
+                 render_options=None):
         super().__init__(
             env_name="basic_combat",
             sim_client=sim_client,
             render=render,
             save_acmi=save_acmi,
-            acmi_file_path=acmi_file_path
+            acmi_file_path=acmi_file_path,
+            profiler=profiler,
+            metrics_logger=metrics_logger,
+            history_len=history_len,
+            render_options=render_options
         )
 
         self._init_components()
@@ -33,14 +42,11 @@ class BasicCombatEnvironment(AirCombatEnvironmentBase):
         self.feature_extractor = BasicCombatFeatureExtractor()
         self.reward_calculator = BasicCombatRewardCalculator()
         self.termination_checker = BasicCombatTerminationChecker()
+        self.action_adapter = BasicCombatActionAdapter()
 
     def _define_action_space(self) -> gym.Space:
-        """定义基础空战动作空间"""
-        return gym.spaces.Box(
-            low=np.array([0, -1, -1, -1, 0, 0]),  # 油门, 俯仰, 滚转, 偏航, 武器, 对抗
-            high=np.array([1, 1, 1, 1, 1, 1]),
-            dtype=np.float32
-        )
+        """定义基础空战动作空间: 油门, 俯仰, 滚转, 偏航, 武器, 对抗"""
+        return self.action_adapter.space
 
     def _define_observation_space(self) -> gym.Space:
         """定义基础空战观察空间"""
@@ -48,17 +54,10 @@ class BasicCombatEnvironment(AirCombatEnvironmentBase):
         return gym.spaces.Box(
             low=-np.inf,
             high=np.inf,
-            shape=(obs_dim,),
+            shape=(obs_dim * self.history_len,),
             dtype=np.float32
         )
 
     def _convert_action_to_dict(self, action: np.ndarray) -> Dict[str, Any]:
         """转换动作为仿真格式"""
-        return {
-            "throttle": float(action[0]),
-            "pitch": float(action[1]),
-            "roll": float(action[2]),
-            "yaw": float(action[3]),
-            "weapon_control": int(action[4] > 0.5),  # 二值化
-            "countermeasures": int(action[5] > 0.5)  # 二值化
-        }
+        return self.action_adapter.convert_scalar(action)[1]
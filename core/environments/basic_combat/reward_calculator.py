@@ -8,8 +8,6 @@ class BasicCombatRewardCalculator(RewardCalculatorBase):
 
     def calculate(self, env_data: Dict[str, Any], action: Dict[str, Any]) -> float:
         """计算基础空战奖励"""
-        self.reward_components = {}
-
         # 生存奖励
         survival_reward = self._calculate_survival_reward(env_data)
 
@@ -126,8 +124,9 @@ class BasicCombatRewardCalculator(RewardCalculatorBase):
     def _calculate_combat_reward(self, env_data: Dict) -> float:
         """战斗结果奖励"""
         combat_results = env_data.get("combat_results", {})
-        if combat_results.get("hit", False):
-            return 5.0  # 命中奖励
-        elif combat_results.get("kill", False):
+        # 击毁的同一步通常也报告命中，先判断击毁
+        if combat_results.get("kill", False):
             return 20.0  # 击毁奖励
+        elif combat_results.get("hit", False):
+            return 5.0  # 命中奖励
         return 0.0
\ No newline at end of file
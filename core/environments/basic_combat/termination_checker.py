@@ -0,0 +1,36 @@
+import math
+from typing import Dict, Any
+
+from core.base.termination_checker_base import (TerminationCheckerBase, ground_collision, out_of_bounds,
+                                                fuel_exhausted, killed, timeout)
+
+
+class BasicCombatTerminationChecker(TerminationCheckerBase):
+    """基础空战终止检查器"""
+
+    def __init__(self, max_steps: int = 3000, min_altitude: float = 300.0, max_range: float = 100000.0):
+        self.max_steps = max_steps
+        self.min_altitude = min_altitude
+        self.max_range = max_range
+        super().__init__()
+
+    def _register_conditions(self):
+        # 注册顺序即优先级：己方结局优先于敌方，终止优先于截断
+        self.register("killed", killed())
+        self.register("ground_collision", ground_collision(self.min_altitude))
+        self.register("enemy_killed", lambda ctx: ctx["enemy_killed"])
+        self.register("fuel_exhausted", fuel_exhausted())
+        self.register("out_of_bounds", out_of_bounds(self.max_range))
+        self.register("timeout", timeout(self.max_steps), truncation=True)
+
+    def build_context(self, env_data: Dict[str, Any]) -> Dict[str, Any]:
+        ownship = env_data.get("ownship", {})
+        position = ownship.get("position", {})
+        return {
+            "altitude": ownship.get("altitude", 0.0),
+            "fuel": ownship.get("fuel_remaining", 1.0),
+            "range_from_origin": math.hypot(position.get("X", 0.0), position.get("Y", 0.0)),
+            "killed": env_data.get("damage", {}).get("total_damage", 0.0) >= 1.0,
+            "enemy_killed": bool(env_data.get("combat_results", {}).get("kill", False)),
+            "step": self.step_count,
+        }
@@ -0,0 +1,26 @@
+from typing import Sequence
+
+from core.base.action_spaces_base import ActionAdapterBase, ActionField, continuous, binary, discrete
+
+
+class BVRCombatActionAdapter(ActionAdapterBase):
+    """
+    超视距空战动作适配器
+
+    把 Dict 动作空间 {flight_controls: Box(4), sensor_controls: Discrete(4), weapon_controls: MultiBinary(3)}
+    展平为 8 维 Box 供 SB3 使用：飞控 4 维连续量、雷达模式 1 维 [0, 1] 等分 4 档、武器 3 维开关量
+    """
+
+    RADAR_MODES = 4
+
+    def _define_fields(self) -> Sequence[ActionField]:
+        return (
+            continuous("throttle", 0.0, 1.0, source=("flight_controls", 0)),
+            continuous("pitch", source=("flight_controls", 1)),
+            continuous("roll", source=("flight_controls", 2)),
+            continuous("yaw", source=("flight_controls", 3)),
+            discrete("radar_mode", self.RADAR_MODES, source=("sensor_controls", None)),
+            binary("lock_target", wire_type=bool, source=("weapon_controls", 0)),
+            binary("fire_missile", wire_type=bool, source=("weapon_controls", 1)),
+            binary("deploy_countermeasures", wire_type=bool, source=("weapon_controls", 2)),
+        )
@@ -6,6 +6,7 @@ from core.base.environment_base import AirCombatEnvironmentBase
 from .feature_extractor import BVRCombatFeatureExtractor
 from .reward_calculator import BVRCombatRewardCalculator
 from .termination_checker import BVRCombatTerminationChecker
+from .action_spaces import BVRCombatActionAdapter
 
 
 class BVRCombatEnvironment(AirCombatEnvironmentBase):
@@ -15,13 +16,24 @@ class BVRCombatEnvironment(AirCombatEnvironmentBase):
                  sim_client,
                  render: bool = False,
                  save_acmi: bool = False,
-                 acmi_file_path: str = None):
+                 acmi_file_path: str = None,
+                 profiler=None,
+                 metrics_logger=None,
+                 history_len: int = 1,
+                 render_options=None,
+                 flatten_actions: bool = True):
+        """flatten_actions: 使用展平的 Box 动作空间（SB3 不支持 Dict 动作空间）"""
+        self.flatten_actions = flatten_actions
         super().__init__(
             env_name="bvr_combat",
             sim_client=sim_client,
             render=render,
             save_acmi=save_acmi,
-            acmi_file_path=acmi_file_path
+            acmi_file_path=acmi_file_path,
+            profiler=profiler,
+            metrics_logger=metrics_logger,
+            history_len=history_len,
+            render_options=render_options
         )
 
         self._init_components()
@@ -33,9 +45,12 @@ class BVRCombatEnvironment(AirCombatEnvironmentBase):
         self.feature_extractor = BVRCombatFeatureExtractor()
         self.reward_calculator = BVRCombatRewardCalculator()
         self.termination_checker = BVRCombatTerminationChecker()
+        self.action_adapter = BVRCombatActionAdapter()
 
     def _define_action_space(self) -> gym.Space:
         """定义BVR空战动作空间 - 更复杂的雷达和武器控制"""
+        if self.flatten_actions:
+            return self.action_adapter.space
         return gym.spaces.Dict({
             "flight_controls": gym.spaces.Box(
                 low=np.array([0, -1, -1, -1]),
@@ -52,20 +67,12 @@ class BVRCombatEnvironment(AirCombatEnvironmentBase):
         return gym.spaces.Box(
             low=-np.inf,
             high=np.inf,
-            shape=(obs_dim,),
+            shape=(obs_dim * self.history_len,),
             dtype=np.float32
         )
 
-    def _convert_action_to_dict(self, action: Dict[str, Any]) -> Dict[str, Any]:
-        """转换BVR动作为仿真格式"""
-        flight = action["flight_controls"]
-        return {
-            "throttle": float(flight[0]),
-            "pitch": float(flight[1]),
-            "roll": float(flight[2]),
-            "yaw": float(flight[3]),
-            "radar_mode": int(action["sensor_controls"]),
-            "lock_target": bool(action["weapon_controls"][0]),
-            "fire_missile": bool(action["weapon_controls"][1]),
-            "deploy_countermeasures": bool(action["weapon_controls"][2])
-        }
\ No newline at end of file
+    def _convert_action_to_dict(self, action) -> Dict[str, Any]:
+        """转换BVR动作为仿真格式，Dict 形式的动作先展平"""
+        if isinstance(action, dict):
+            action = self.action_adapter.flatten(action)
+        return self.action_adapter.convert_scalar(action)[1]
\ No newline at end of file
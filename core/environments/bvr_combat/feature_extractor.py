@@ -0,0 +1,63 @@
+import numpy as np
+from typing import Dict, Any
+
+from core.base.feature_extractor_base import FeatureExtractorBase
+from .contact_encoder import ContactEncoder, CONTACT_FEATURE_DIM
+
+
+class BVRCombatFeatureExtractor(FeatureExtractorBase):
+    """
+    超视距空战特征提取器
+
+    特征布局: [己方状态 OWNSHIP_DIM | 接触 max_contacts × CONTACT_FEATURE_DIM | 接触掩码 max_contacts]
+    接触由 ContactEncoder 从全部雷达航迹、在飞导弹和友机中按威胁评分选出
+    """
+
+    OWNSHIP_DIM = 9
+
+    def __init__(self, max_contacts: int = 8, max_missiles: int = 6, encoder: ContactEncoder = None):
+        super().__init__()
+        self.encoder = encoder or ContactEncoder(max_contacts=max_contacts)
+        self.max_contacts = self.encoder.max_contacts
+        self.max_missiles = max_missiles
+        self.feature_dim = self.OWNSHIP_DIM + self.encoder.feature_dim
+        # 各部分在特征向量中的区间
+        contacts_end = self.OWNSHIP_DIM + self.max_contacts * CONTACT_FEATURE_DIM
+        self.ownship_slice = slice(0, self.OWNSHIP_DIM)
+        self.contacts_slice = slice(self.OWNSHIP_DIM, contacts_end)
+        self.mask_slice = slice(contacts_end, self.feature_dim)
+
+    def extract(self, env_data: Dict[str, Any]) -> np.ndarray:
+        """提取超视距空战特征"""
+        features = np.empty(self.feature_dim, dtype=np.float32)
+
+        # 己方状态
+        ownship = env_data.get("ownship", {})
+        weapons = env_data.get("weapons", {})
+        features[self.ownship_slice] = (
+            self._normalize_value(ownship.get("velocity", 0), 0, 500),
+            self._normalize_value(ownship.get("altitude", 0), 0, 15000),
+            self._normalize_value(ownship.get("heading", 0), 0, 360),
+            self._normalize_value(ownship.get("pitch", 0), -90, 90),
+            self._normalize_value(ownship.get("roll", 0), -180, 180),
+            ownship.get("fuel_remaining", 0) / ownship.get("max_fuel", 1),
+            weapons.get("missiles_remaining", 0) / self.max_missiles,
+            env_data.get("radar", {}).get("mode", 0) / 3,
+            1.0 - env_data.get("damage", {}).get("total_damage", 0),
+        )
+
+        # 接触
+        contacts, mask = self.encoder.encode(env_data)
+        features[self.contacts_slice] = contacts.ravel()
+        features[self.mask_slice] = mask
+        return features
+
+    def split(self, features: np.ndarray):
+        """把特征向量（或 (..., feature_dim) 批量）拆回 (己方, 接触[..., k, F], 掩码)"""
+        contacts = features[..., self.contacts_slice]
+        return (features[..., self.ownship_slice],
+                contacts.reshape(*contacts.shape[:-1], self.max_contacts, CONTACT_FEATURE_DIM),
+                features[..., self.mask_slice])
+
+    def get_feature_dimension(self) -> int:
+        return self.feature_dim
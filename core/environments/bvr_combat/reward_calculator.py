@@ -0,0 +1,22 @@
+from typing import Tuple
+
+from core.base.team_reward import TeamRewardCalculator
+
+
+class BVRCombatRewardCalculator(TeamRewardCalculator):
+    """
+    超视距空战奖励计算器：理想交战距离 20-60 公里，导弹代价高于近距格斗
+
+    单机数据按 ownship + friendlies 组成己方编队计算，env_data 带 agents / events 时支持 N 对 M
+    """
+
+    def __init__(self,
+                 credit: str = "individual",
+                 team_spirit: float = 0.5,
+                 agent_index: int = 0,
+                 ideal_range: Tuple[float, float] = (20000.0, 60000.0),
+                 search_radius: float = 150000.0,
+                 launch_cost: float = 0.5,
+                 **kwargs):
+        super().__init__(credit=credit, team_spirit=team_spirit, agent_index=agent_index, ideal_range=ideal_range,
+                         search_radius=search_radius, launch_cost=launch_cost, **kwargs)
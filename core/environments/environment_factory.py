@@ -1,5 +1,5 @@
 from typing import Dict, Type
-from communication.http_client import SimulationClient
+from communication.client_base import SimulationClientBase
 
 from .basic_combat.environment import BasicCombatEnvironment
 from .bvr_combat.environment import BVRCombatEnvironment
@@ -19,10 +19,14 @@ class EnvironmentFactory:
     @classmethod
     def create_environment(cls,
                            env_name: str,
-                           sim_client: SimulationClient,
+                           sim_client: SimulationClientBase,
                            render: bool = False,
                            save_acmi: bool = False,
-                           acmi_file_path: str = None):
+                           acmi_file_path: str = None,
+                           profiler=None,
+                           metrics_logger=None,
+                           history_len: int = 1,
+                           render_options=None):
         """创建指定环境"""
         if env_name not in cls._environment_registry:
             available_envs = list(cls._environment_registry.keys())
@@ -33,7 +37,11 @@ class EnvironmentFactory:
             sim_client=sim_client,
             render=render,
             save_acmi=save_acmi,
-            acmi_file_path=acmi_file_path
+            acmi_file_path=acmi_file_path,
+            profiler=profiler,
+            metrics_logger=metrics_logger,
+            history_len=history_len,
+            render_options=render_options
         )
 
     @classmethod
@@ -0,0 +1,24 @@
+from typing import Sequence
+import numpy as np
+
+from core.base.action_spaces_base import ActionAdapterBase, ActionField, continuous
+
+
+class PointTrackingActionAdapter(ActionAdapterBase):
+    """
+    点跟踪动作适配器: 升降舵、副翼、方向舵、油门，按 vals 列表顺序发送
+
+    max_rate 给定时限制舵面每步的最大变化量（油门不限）
+    """
+
+    def __init__(self, num_envs: int = 1, max_rate=None):
+        self.max_rate = max_rate
+        super().__init__(num_envs, dtype=np.float64)
+
+    def _define_fields(self) -> Sequence[ActionField]:
+        return (
+            continuous("elevator", max_rate=self.max_rate),
+            continuous("aileron", max_rate=self.max_rate),
+            continuous("rudder", max_rate=self.max_rate),
+            continuous("throttle", 0.0, 1.0),
+        )
@@ -3,9 +3,19 @@ from gymnasium import spaces
 import numpy as np
 from typing import Optional, Tuple, Dict, Any
 from utils.tools import RAMathUtil
-import math, os, json
+from utils.local_frame import LocalTangentFrame
+import math, os
 from communication.tcp_client import SimulationClient
-from datetime import datetime, timedelta
+from communication.client_base import CAP_SEEDS
+from utils.latency import LatencyProfiler, NULL_PROFILER
+from core.curriculum.start_state_sampler import StartStateSampler
+from utils.seeding import ObservationHasher
+from utils.metrics_logger import MetricsLogger
+from core.base.frame_stack import FrameStack
+from core.environments.point_tracking.action_spaces import PointTrackingActionAdapter
+from core.environments.point_tracking.termination_checker import PointTrackingTerminationChecker
+from visualization.tacview_handler import TacViewHandler
+from visualization.trajectory_log import TrajectoryRecorder
 
 
 class PointTrackingEnv(gym.Env):
@@ -13,7 +23,23 @@ class PointTrackingEnv(gym.Env):
     点跟踪环境，用于与仿真平台交互 (Gymnasium版本)
     """
 
-    def __init__(self, simulation_client, max_steps: int = 200, render_mode: Optional[str] = None):
+    # 指标日志的列定义，构造 MetricsLogger 时使用
+    STEP_METRIC_COLUMNS = ("episode", "step", "reward", "distance_penalty", "success_reward", "time_penalty",
+                           "distance", "altitude", "sim_time", "step_latency_ms")
+    EPISODE_METRIC_COLUMNS = ("episode", "length", "return", "success", "final_distance", "min_altitude")
+    # 视为成功的终止原因（评估工具按此统计成功率）
+    SUCCESS_REASONS = frozenset({"target_reached"})
+
+    # 单帧状态维度：相对目标位置3 + 姿态3 + 速度4 + 上一步动作4
+    STATE_DIM = 14
+
+    def __init__(self, simulation_client, max_steps: int = 200, render_mode: Optional[str] = None,
+                 profiler: Optional[LatencyProfiler] = None,
+                 start_state_sampler: Optional[StartStateSampler] = None, env_id: int = 0,
+                 verify_determinism: bool = False, metrics_logger: Optional[MetricsLogger] = None,
+                 history_len: int = 1, action_rate_limit: Optional[float] = None,
+                 render_options: Optional[Dict[str, Any]] = None,
+                 trajectory_recorder: Optional[TrajectoryRecorder] = None):
         """
         初始化环境
 
@@ -21,33 +47,65 @@ class PointTrackingEnv(gym.Env):
             simulation_client: 仿真平台客户端
             max_steps: 每个episode的最大步数
             render_mode: 渲染模式，可选'human'或None
+            profiler: 分阶段耗时统计，None表示关闭
+            start_state_sampler: 课程式初始状态采样器，None时使用场景默认初始状态和随机目标
+            env_id: 本环境在采样器中的编号（决定使用哪条随机数流）
+            verify_determinism: 是否对观测流做哈希，回合结束时在info['obs_hash']中给出摘要
+            metrics_logger: 列式指标记录器，列需与 STEP_METRIC_COLUMNS / EPISODE_METRIC_COLUMNS 一致
+            history_len: 观测历史帧数，>1 时观测为最近 history_len 帧状态的展平堆叠（从旧到新）
+            action_rate_limit: 舵面每步最大变化量，None 不限制
+            render_options: render_mode='human' 时传给 TacViewHandler 的参数（实时推送、抽帧、丢帧策略等），
+                            默认写入录像库 logs/recordings（用 python -m visualization.acmi_tool 提取回合）
+            trajectory_recorder: 轨迹记录器，只保存每步平台状态，训练后用 visualization.batch_export 离线生成 ACMI
         """
         super(PointTrackingEnv, self).__init__()
 
         self.simulation = simulation_client
-        self.simulation.connection(scenario="testWzz")
+        self.profiler = profiler if profiler is not None else NULL_PROFILER
+        self.simulation.profiler = self.profiler
+        self.start_state_sampler = start_state_sampler
+        self.env_id = env_id
+        self.obs_hasher = ObservationHasher() if verify_determinism else None
+        self.metrics_logger = metrics_logger
+        self.trajectory_recorder = trajectory_recorder
+        self.episode_count = 0
+        self.min_altitude = math.inf
+        # 预分配的单步/回合指标行，避免每步创建列表
+        self._step_row = np.zeros(len(self.STEP_METRIC_COLUMNS))
+        self._episode_row = np.zeros(len(self.EPISODE_METRIC_COLUMNS))
+        self._reward_terms = np.zeros(3)  # 距离惩罚、到达奖励、时间惩罚
+        if not self.simulation.connect("testWzz"):
+            raise ConnectionError("无法连接到仿真服务端")
         self.max_steps = max_steps
+        self.termination_checker = PointTrackingTerminationChecker(max_steps=max_steps)
+        # 本步的几何量，奖励计算和终止判定共用
+        self._geometry = {"distance": 0.0, "altitude": 0.0, "step": 0}
         self.render_mode = render_mode
+        # 渲染在后台线程完成，step 中只提交帧引用
+        self.tacview_handler = None
+        if render_mode == "human":
+            options = {"recording_dir": os.path.join('logs', 'recordings')}
+            options.update(render_options or {})
+            self.tacview_handler = TacViewHandler(**options)
         self.current_step = 0
         self.action_pre = np.zeros(4)
         self.observation = None
+        # step_wait 推迟到下一次 step_async / reset / close 的工作
+        self._deferred = None
+        self.history_len = history_len
+        self.frame_stack = FrameStack(history_len, self.STATE_DIM, dtype=np.float64) if history_len > 1 else None
 
-        # 定义动作空间：连续动作，控制点的移动 [x, y, z, 其他参数?]
-        # 根据你的仿真平台调整维度
-        self.action_space = spaces.Box(
-            low=np.array([-1.0, -1.0, -1.0, 0.0]),  # 最小控制值
-            high=np.array([1.0, 1.0, 1.0, 1.0]),  # 最大控制值
-            shape=(4,),
-            dtype=np.float64
-        )
+        # 定义动作空间：升降舵、副翼、方向舵 [-1, 1]，油门 [0, 1]
+        self.action_adapter = PointTrackingActionAdapter(max_rate=action_rate_limit)
+        self.action_space = self.action_adapter.space
 
         # 定义观测空间：环境返回的数据
-        # 这里需要根据simulation.get_environment_data返回的实际结构调整
+        # 这里需要根据simulation.step返回的实际结构调整
         # 假设观测是包含位置、速度等信息的向量
         self.observation_space = spaces.Box(
             low=-np.inf,
             high=np.inf,
-            shape=(14,),  # 根据实际观测维度调整
+            shape=(self.STATE_DIM * history_len,),  # 根据实际观测维度调整
             dtype=np.float64
         )
 
@@ -57,6 +115,9 @@ class PointTrackingEnv(gym.Env):
         # 中心点的经、纬、高度
         self.center_position = {'alt': 0.0, 'lat': 0.0, 'lon': 0.0}
 
+        # 以目标点为切点的本地坐标系，每回合设置目标时构造一次，逐步复用中心点的三角函数
+        self.target_frame = None
+
         # 用于跟踪episode信息
         self.episode_reward = 0
         self.episode_length = 0
@@ -69,13 +130,13 @@ class PointTrackingEnv(gym.Env):
         处理原始观测数据，转换为numpy数组
 
         Args:
-            raw_observation: 仿真平台返回的原始观测
+            observation: 仿真平台返回的单个环境观测帧
 
         Returns:
             处理后的观测数组
         """
-        plane_info = observation["data"]["0"]["obs"]['platforms'][0]
-        delta_x, delta_y = RAMathUtil.convert_lat_long_to_xy(plane_info, self.target_position)
+        plane_info = observation['platforms'][0]
+        delta_x, delta_y = self.target_frame.to_local_xy(plane_info)
         delta_z = self.target_position["alt"] - plane_info["alt"]
 
         state = np.array([delta_x, delta_y, delta_z, plane_info["heading"],
@@ -84,20 +145,31 @@ class PointTrackingEnv(gym.Env):
                           self.action_pre[0], self.action_pre[1], self.action_pre[2], self.action_pre[3], ], dtype=np.float64)
         return np.array(state)
 
-    def _calculate_reward(self, observation, state) -> float:
+    def _update_geometry(self, observation, state) -> Dict[str, Any]:
+        """
+        计算本步的几何量（与目标的距离、高度、步数），供奖励和终止判定共用
+
+        Args:
+            observation: 当前观测帧
+            state: 处理后的观测数组（前3个元素是与目标的相对位置）
+        """
+        geometry = self._geometry
+        geometry["distance"] = math.sqrt(state[0] ** 2 + state[1] ** 2 + state[2] ** 2)
+        geometry["altitude"] = observation['platforms'][0]['alt']
+        geometry["step"] = self.current_step
+        return geometry
+
+    def _calculate_reward(self, geometry) -> float:
         """
         计算奖励值
 
         Args:
-            observation: 当前观测
+            geometry: 本步几何量，见 _update_geometry
 
         Returns:
             奖励值
         """
-        # 提取当前位置（假设前3个元素是位置）
-        delta_x, delta_y, delta_z = state[0], state[1], state[2]
-
-        distance = math.sqrt(delta_x ** 2 + delta_y ** 2 + delta_z ** 2)
+        distance = geometry["distance"]
 
         # 奖励函数设计
         # 1. 距离惩罚（负奖励）
@@ -113,54 +185,21 @@ class PointTrackingEnv(gym.Env):
         # velocity = observation[3:6]
         # smooth_penalty = -0.001 * np.linalg.norm(velocity)
 
+        self._reward_terms[0] = distance_penalty
+        self._reward_terms[1] = success_reward
+        self._reward_terms[2] = time_penalty
+
         # 5.超出高度限制，判定飞机坠毁
-        plane_info = observation["data"]["0"]["obs"]['platforms'][0]
-        if plane_info['alt'] < 1000.0:
+        if geometry["altitude"] < 1000.0:
             return float(-10.0)
 
         total_reward = distance_penalty + success_reward + time_penalty
 
         return float(total_reward)
 
-    def _check_terminated(self, observation, state) -> bool:
-        """
-        检查是否终止（任务完成）
-
-        Args:
-            observation: 当前观测
-
-        Returns:
-            bool: 是否终止
-        """
-        # 成功到达目标
-        delta_x, delta_y, delta_z = state[0], state[1], state[2]
-        distance = math.sqrt(delta_x ** 2 + delta_y ** 2 + delta_z ** 2)
-
-        if distance < 500:  # 到达目标的阈值
-            return True
-
-        # 飞机坠毁
-        plane_info = observation["data"]["0"]["obs"]['platforms'][0]
-        if plane_info['alt'] < 1000.0:
-            return True
-
-        return False
-
-    def _check_truncated(self, observation, state) -> bool:
-        """
-        检查是否截断（时间耗尽等）
-
-        Args:
-            observation: 当前观测
-
-        Returns:
-            bool: 是否截断
-        """
-        # 达到最大步数
-        if self.current_step >= self.max_steps:
-            return True
-
-        return False
+    def _is_success(self) -> bool:
+        """是否到达目标"""
+        return self._geometry["distance"] < self.termination_checker.target_radius
 
     def step(self, action: np.ndarray, slice: int = 1) -> Tuple[np.ndarray, float, bool, bool, Dict]:
         """
@@ -172,25 +211,54 @@ class PointTrackingEnv(gym.Env):
         Returns:
             tuple: (observation, reward, terminated, truncated, info)
         """
+        self.step_async(action, slice)
+        return self._step_wait(defer=False)
+
+    def step_async(self, action: np.ndarray, slice: int = 1):
+        """
+        流水线模式的前半步：转换并发出动作后立即返回，服务端计算期间执行上一步推迟的渲染、轨迹记录和指标写入
+
+        step_async / step_wait 必须成对调用，期间不能调用 reset 或 step。推迟的工作在下一次 step_async、
+        reset 或 close 时执行，因此渲染 / 轨迹 / 指标比返回值晚一步落盘，返回值与 step 完全相同
+        """
+        profiler = self.profiler
+        profiler.begin_step()
+
         # 确保动作在合法范围内
-        action = np.clip(action, self.action_space.low, self.action_space.high)
-        self.action_pre = action
-        for i in range(slice):
+        with profiler.stage("action_convert"):
+            action_vals, _ = self.action_adapter.convert_scalar(action)
+            self.action_pre[:] = action_vals
+        for i in range(slice - 1):
             # 连续多少帧再重新生成一个新的动作
-            observation = self.simulation.get_environment_data([action.tolist()])
-            self.observation = observation
+            self.observation = self.simulation.step(action_vals)
+        self.simulation.step_async({"0": action_vals})
+        self._flush_deferred()
+
+    def step_wait(self) -> Tuple[np.ndarray, float, bool, bool, Dict]:
+        """流水线模式的后半步：取回观测并计算状态、奖励和终止，渲染等副作用推迟到下一次 step_async"""
+        return self._step_wait(defer=True)
+
+    def _step_wait(self, defer: bool) -> Tuple[np.ndarray, float, bool, bool, Dict]:
+        profiler = self.profiler
+        observation = self.simulation.step_wait()["0"]
+        self.observation = observation
 
         # 处理观测
-        state = self._process_observation(observation)
+        with profiler.stage("feature"):
+            state = self._process_observation(observation)
 
         # 计算奖励
-        reward = self._calculate_reward(observation, state)
-
-        # 检查是否终止和截断
-        terminated = self._check_terminated(observation, state)
-        if terminated:
-            print(reward)
-        truncated = self._check_truncated(observation, state)
+        with profiler.stage("reward"):
+            geometry = self._update_geometry(observation, state)
+            reward = self._calculate_reward(geometry)
+
+        # 检查是否终止和截断（坠地、到达目标、步数耗尽）
+        with profiler.stage("termination"):
+            terminated, truncated, termination_reason = self.termination_checker.evaluate(geometry)
+        if (terminated or truncated) and self.start_state_sampler is not None:
+            self.start_state_sampler.record_outcome(self._is_success())
+        if self.obs_hasher is not None:
+            self.obs_hasher.update(state, reward)
 
         # 更新步数
         self.current_step += 1
@@ -205,12 +273,86 @@ class PointTrackingEnv(gym.Env):
             },
         }
 
-        # 如果需要渲染
-        if self.render_mode == "human":
-            self.render()
+        done = terminated or truncated
+        if not defer:
+            with profiler.stage("visualization"):
+                self._write_outputs(observation, done, termination_reason)
 
+        if done:
+            info['termination_reason'] = termination_reason
+        if self.obs_hasher is not None and done:
+            info['obs_hash'] = self.obs_hasher.hexdigest()
+
+        profiler.end_step()
+        if profiler.enabled:
+            info['latency_ms'] = profiler.last_step()
+        step_latency_ms = profiler.last_ms('step_total') if profiler.enabled else np.nan
+
+        if defer:
+            self._deferred = (observation, reward, done, termination_reason, step_latency_ms)
+        elif self.metrics_logger is not None:
+            self._log_metrics(observation, reward, done, step_latency_ms)
+
+        if self.frame_stack is not None:
+            self.frame_stack.push(state)
+            # 返回副本：环形缓冲区的视图会被下一次 push / reset 覆盖（VecEnv 保存的 terminal_observation 会被改写）
+            return self.frame_stack.flat().copy(), reward, terminated, truncated, info
         return state, reward, terminated, truncated, info
 
+    def _write_outputs(self, observation, done: bool, termination_reason):
+        """提交渲染帧、记录轨迹，回合结束时附带回合信息"""
+        if self.tacview_handler is None and self.trajectory_recorder is None:
+            return
+        meta = {"return": self.episode_reward, "length": self.episode_length,
+                "success": self._is_success(), "termination_reason": termination_reason} if done else None
+        if self.tacview_handler is not None:
+            self.tacview_handler.submit(observation)
+            if done:
+                self.tacview_handler.end_episode(meta)
+        if self.trajectory_recorder is not None:
+            self.trajectory_recorder.record(observation)
+            if done:
+                self.trajectory_recorder.end_episode(meta)
+
+    def _flush_deferred(self):
+        """执行 step_wait 推迟的渲染、轨迹记录和指标写入"""
+        deferred, self._deferred = self._deferred, None
+        if deferred is None:
+            return
+        observation, reward, done, termination_reason, step_latency_ms = deferred
+        with self.profiler.stage("visualization"):
+            self._write_outputs(observation, done, termination_reason)
+        if self.metrics_logger is not None:
+            self._log_metrics(observation, reward, done, step_latency_ms)
+
+    def _log_metrics(self, observation, reward: float, done: bool, step_latency_ms: float = np.nan):
+        """写入单步指标，回合结束时追加一行回合指标"""
+        obs = observation
+        altitude = self._geometry["altitude"]
+        distance = self._geometry["distance"]
+        self.min_altitude = min(self.min_altitude, altitude)
+
+        row = self._step_row
+        row[0] = self.episode_count
+        row[1] = self.current_step
+        row[2] = reward
+        row[3:6] = self._reward_terms
+        row[6] = distance
+        row[7] = altitude
+        row[8] = obs.get('sim_time', 0.0)
+        row[9] = step_latency_ms
+        self.metrics_logger.log_step(row)
+
+        if done:
+            row = self._episode_row
+            row[0] = self.episode_count
+            row[1] = self.episode_length
+            row[2] = self.episode_reward
+            row[3] = float(self._is_success())
+            row[4] = distance
+            row[5] = self.min_altitude
+            self.metrics_logger.log_episode(row)
+
     def reset(self,
               seed: Optional[int] = None,
               options: Optional[Dict] = None) -> Tuple[np.ndarray, Dict]:
@@ -219,58 +361,92 @@ class PointTrackingEnv(gym.Env):
 
         Args:
             seed: 随机种子
-            options: 重置选项，可以包含scenario和target_position
+            options: 重置选项，可以包含scenario、target_position、custom_state（下发给服务端的初始状态）
+                     和snapshot（快照名称，从快照恢复而不是重载场景）
 
         Returns:
             tuple: (observation, info)
         """
+        self._flush_deferred()
         # 设置随机种子
         super().reset(seed=seed)
+        self.action_adapter.reset()
+        self.termination_checker.reset()
 
         # 从options中获取参数
         scenario = "testWzz"
         target_position = None
+        snapshot_name = None
+        custom_state = None
         self.observation = None
         self.reset_logs()
 
         if options is not None:
             scenario = options.get("scenario", "testWzz")
             target_position = options.get("target_position", None)
-
-        # 重置仿真
-        try:
-            self.simulation.reset()
-        except Exception as e:
-            # 返回零观测和错误信息
-            info = {"error": str(e)}
-            return np.zeros(self.observation_space.shape, dtype=np.float64), info
-
-        # 传入默认初始动作
-        observation = self.simulation.get_environment_data([[0.5, 0.0, 0.0, 1.0]])
+            snapshot_name = options.get("snapshot", None)
+            custom_state = options.get("custom_state", None)
+
+        if snapshot_name is not None:
+            # 从快照恢复，跳过场景重载和默认初始动作
+            try:
+                observation = self.simulation.restore(snapshot_name)
+            except Exception as e:
+                info = {"error": str(e)}
+                return np.zeros(self.observation_space.shape, dtype=np.float64), info
+            if target_position is None:
+                target_position = self.simulation.snapshot_meta(snapshot_name).get("target_position")
+        else:
+            # 重置仿真，有采样器时按当前课程难度下发初始状态
+            custom_states = {"0": dict(custom_state)} if custom_state is not None else None
+            # 服务端种子由环境的随机数流派生，给定初始seed后每个回合的仿真随机过程都可复现；
+            # 服务端不支持种子时不下发（仍从随机数流取一次，保证其余采样序列与传输方式无关）
+            server_seed = int(self.np_random.integers(2 ** 31 - 1))
+            seeds = {"0": server_seed} if self.simulation.supports(CAP_SEEDS) else None
+            if self.start_state_sampler is not None and target_position is None and custom_state is None:
+                if seed is not None:
+                    self.start_state_sampler.seed_env(self.env_id, seed)
+                sample = self.start_state_sampler.sample(self.env_id)
+                custom_states = {"0": sample["custom_state"]}
+                target_position = sample["target"]
+            try:
+                self.simulation.reset_batch(["0"], custom_states=custom_states, seeds=seeds)
+            except Exception as e:
+                # 返回零观测和错误信息
+                info = {"error": str(e)}
+                return np.zeros(self.observation_space.shape, dtype=np.float64), info
+
+            # 传入默认初始动作
+            observation = self.simulation.step([0.5, 0.0, 0.0, 1.0])
         self.observation = observation
+        self.center_position = observation['platforms'][0]
 
         # 设置新的目标位置
         if target_position is not None:
-            self.target_position = np.array(target_position, dtype=np.float64)
+            self.target_position = dict(target_position)
         else:
             # 随机生成目标位置（可选）
-            random_target_position = RAMathUtil.generate_target_arc()
-            self.target_position = RAMathUtil.convert_xy_to_lat_long(
-                observation["data"]["0"]["obs"]['platforms'][0],
+            random_target_position = RAMathUtil.generate_target_arc(rng=self.np_random)
+            self.target_position = LocalTangentFrame(self.center_position).offset_to_geodetic(
                 random_target_position[0],
                 random_target_position[1],
-                delta_z=random_target_position[2]
+                random_target_position[2]
             )
+        self.target_frame = LocalTangentFrame(self.target_position)
 
         # 重置步数和奖励
+        if self.current_step > 0:
+            self.episode_count += 1
+        self.min_altitude = math.inf
         self.current_step = 0
         self.episode_reward = 0
         self.episode_length = 0
 
-        self.center_position = observation["data"]["0"]["obs"]['platforms'][0]
-
         # 处理观测
         state = self._process_observation(observation)
+        if self.obs_hasher is not None:
+            self.obs_hasher.reset()
+            self.obs_hasher.update(state)
 
         # 构建信息字典
         info = {
@@ -279,104 +455,68 @@ class PointTrackingEnv(gym.Env):
         }
 
         # 如果需要渲染
-        if self.render_mode == "human":
-            self.render()
-
+        if self.tacview_handler is not None:
+            self.tacview_handler.begin_episode({"episode": self.episode_count})
+            self.tacview_handler.submit(observation)
+        if self.trajectory_recorder is not None:
+            self.trajectory_recorder.begin_episode({"episode": self.episode_count})
+            self.trajectory_recorder.record(observation)
+
+        if self.frame_stack is not None:
+            self.frame_stack.reset(state)
+            return self.frame_stack.flat().copy(), info
         return state, info
 
-    def render(self, output_dir='logs', output_file='fighter.acmi'):
+    def save_snapshot(self, name: str):
         """
-        简化的render方法，精确匹配提供的ACMI格式
+        保存当前仿真状态为命名快照，同时记录当前目标点，
+        之后可通过 reset(options={"snapshot": name}) 直接回到该状态
+
+        Args:
+            name: 快照名称
         """
-        output_path = os.path.join(output_dir, output_file)
+        return self.simulation.snapshot(name, meta={"target_position": dict(self.target_position)})
+
+    def get_training_state(self) -> Dict[str, Any]:
+        """断点续训需要保存的环境状态：回合计数、环境随机数流、课程采样器"""
+        return {
+            "episode_count": self.episode_count,
+            "np_random": self.np_random.bit_generator.state,
+            "start_state_sampler": self.start_state_sampler.state_dict() if self.start_state_sampler else None,
+        }
 
-        if not hasattr(self, 'observation') or self.observation is None:
-            return None
+    def set_training_state(self, state: Dict[str, Any]):
+        """恢复 get_training_state 保存的状态"""
+        self.episode_count = state["episode_count"]
+        self.np_random.bit_generator.state = state["np_random"]
+        if self.start_state_sampler is not None and state.get("start_state_sampler") is not None:
+            self.start_state_sampler.load_state_dict(state["start_state_sampler"])
 
-        try:
-            # 解析数据
-            if isinstance(self.observation, str):
-                data = json.loads(self.observation)
-            else:
-                data = self.observation
-
-            platforms = data.get('data', {}).get('0', {}).get('obs', {}).get('platforms', [])
-            sim_time = data.get('data', {}).get('0', {}).get('obs', {}).get('sim_time', 0)
-
-            if not platforms:
-                return None
-
-            # 初始化（如果是第一次调用）
-            if not hasattr(self, '_base_time'):
-                self._base_time = datetime.now()
-                self._frame_count = 0
-                self._platform_ids = {'1001': '5160'}  # 根据你的数据分配ID
-
-            # 以追加模式打开文件
-            with open(output_path, 'a', encoding='utf-8') as f:
-                # 如果是新文件，写入头信息
-                if self._frame_count == 0:
-                    f.write("FileType=text/acmi/tacview\n")
-                    f.write("FileVersion=2.2\n")
-                    f.write(f"0,ReferenceTime={self._base_time.strftime('%Y-%m-%dT%H:%M:%S')}Z\n")
-
-                # 写入时间戳
-                f.write(f"#{sim_time:.2f}\n")
-
-                # 为每个平台写入数据
-                for i, platform in enumerate(platforms):
-                    name = platform.get('name', '1001')
-
-                    # 获取ID映射
-                    if name in self._platform_ids:
-                        object_id = self._platform_ids[name]
-                    else:
-                        object_id = str(5160 + i)
-                        self._platform_ids[name] = object_id
-
-                    # 获取数据
-                    lat = platform.get('lat', 0)
-                    lon = platform.get('lon', 0)
-                    alt = platform.get('alt', 0)
-                    roll = platform.get('roll', 0)
-                    pitch = platform.get('pitch', 0)
-                    heading = platform.get('heading', 0)
-
-                    # 构建数据行
-                    # 格式: ID,T=时间戳|经度|纬度|高度|滚转|俯仰|偏航,Name=名称,Type=类型,CallSign=呼号,Color=颜色
-                    data_line = (f"{object_id},T={lon:.8f}|{lat:.8f}|{alt:.2f}|"
-                                 f"{roll:.12f}|{pitch:.12f}|{heading:.6f},"
-                                 f"Name=F-16,Type=Air+FixedWing,CallSign=F-16,Color=Red")
-
-                    f.write(data_line + "\n")
-
-                self._frame_count += 1
-
-            return output_path
-
-        except Exception as e:
-            print(f"错误: {e}")
+    def render(self):
+        """
+        返回后台渲染的统计信息；render_mode='human' 时 reset/step 已自动提交每一帧，这里不再重复提交
+        """
+        if self.tacview_handler is None:
             return None
+        return self.tacview_handler.stats
 
-    def reset_logs(self, output_dir='logs', output_file='fighter.acmi'):
-        # 确保输出目录存在
+    def reset_logs(self, output_dir='logs'):
+        # 确保输出目录存在；回合录像由录像库按回合追加保存，不再删除之前的记录
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
             print(f"创建目录: {output_dir}")
-        # 构建完整的输出文件路径
-        output_path = os.path.join(output_dir, output_file)
-
-        # 如果文件已存在，先删除
-        if os.path.exists(output_path):
-            os.remove(output_path)
-            print(f"删除已存在的文件: {output_path}")
 
     def close(self):
         """
         关闭环境
         """
+        self._flush_deferred()
         if hasattr(self, 'simulation') and self.simulation:
             self.simulation.close()
+        if self.metrics_logger is not None:
+            self.metrics_logger.close()
+        if self.tacview_handler is not None:
+            self.tacview_handler.close()
 
 
 # 使用示例
@@ -0,0 +1,20 @@
+from core.base.termination_checker_base import TerminationCheckerBase, ground_collision, target_reached, timeout
+
+
+class PointTrackingTerminationChecker(TerminationCheckerBase):
+    """
+    点跟踪终止检查器
+
+    上下文 {"distance", "altitude", "step"} 由环境在计算奖励时一并给出，检查器不重复计算几何量
+    """
+
+    def __init__(self, max_steps: int = 200, min_altitude: float = 1000.0, target_radius: float = 500.0):
+        self.max_steps = max_steps
+        self.min_altitude = min_altitude
+        self.target_radius = target_radius
+        super().__init__()
+
+    def _register_conditions(self):
+        self.register("ground_collision", ground_collision(self.min_altitude))
+        self.register("target_reached", target_reached(self.target_radius))
+        self.register("timeout", timeout(self.max_steps), truncation=True)
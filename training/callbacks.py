@@ -0,0 +1,115 @@
+import os
+from collections import deque
+from typing import Optional
+
+from stable_baselines3.common.callbacks import BaseCallback
+
+
+class LatencyTensorboardCallback(BaseCallback):
+    """
+    将环境中 LatencyProfiler 的分阶段耗时写入 TensorBoard
+
+    每次 rollout 结束时读取各子环境的 profiler 摘要，以 latency/<stage>_<stat> 的名称
+    与 PPO 自身的日志一起 dump；可选地同时写出 Prometheus 文本格式文件供外部抓取
+    """
+
+    def __init__(self, prometheus_path: Optional[str] = None, reset_after_log: bool = True, verbose: int = 0):
+        super().__init__(verbose)
+        self.prometheus_path = prometheus_path
+        self.reset_after_log = reset_after_log
+
+    def _on_step(self) -> bool:
+        return True
+
+    def _on_rollout_end(self) -> None:
+        all_profilers = self.training_env.get_attr("profiler")
+        # 保留子环境的原始下标，部分环境未开启统计时标签仍对应正确的环境
+        profilers = [(env_idx, p) for env_idx, p in enumerate(all_profilers) if p is not None and p.enabled]
+        if not profilers:
+            return
+
+        for env_idx, profiler in profilers:
+            prefix = "latency" if len(all_profilers) == 1 else f"latency/env_{env_idx}"
+            for stage, stats in profiler.summary().items():
+                for key in ("p50", "p90", "p99", "mean"):
+                    self.logger.record(f"{prefix}/{stage}_{key}_ms", stats[key])
+
+        if self.prometheus_path:
+            text = "".join(profiler.to_prometheus(labels={"env": str(env_idx)}, header=(i == 0))
+                           for i, (env_idx, profiler) in enumerate(profilers))
+            tmp_path = self.prometheus_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, self.prometheus_path)
+
+        if self.reset_after_log:
+            for _, profiler in profilers:
+                profiler.reset()
+
+
+class SweepReportCallback(BaseCallback):
+    """
+    超参数扫描中向编排进程上报中间结果（最近若干回合的平均回报）
+
+    每满 report_every 个时间步上报一次，上报步数对齐到 report_every 的整数倍，
+    不同 n_steps 的试验因此能在同一步上比较；被剪枝后返回 False 结束训练
+    """
+
+    def __init__(self, reporter, report_every: int = 8192, window: int = 20, verbose: int = 0):
+        super().__init__(verbose)
+        self.reporter = reporter
+        self.report_every = report_every
+        self.returns = deque(maxlen=window)
+        self._next_report = report_every
+
+    def _on_step(self) -> bool:
+        for info, done in zip(self.locals["infos"], self.locals["dones"]):
+            if done and "episode" in info:
+                self.returns.append(info["episode"]["r"])
+        if self.num_timesteps < self._next_report:
+            return True
+        step = self._next_report
+        self._next_report += self.report_every
+        if not self.returns:
+            return not self.reporter.should_stop
+        return self.reporter.report(step, self.mean_return)
+
+    @property
+    def mean_return(self) -> float:
+        return float(sum(self.returns) / len(self.returns)) if self.returns else float("nan")
+
+
+class AsyncCheckpointCallback(BaseCallback):
+    """
+    周期性写断点（见 training.checkpoint.AsyncCheckpointer）
+
+    在 rollout 开始时保存：此时上一轮更新已完成、rollout 缓冲区为空，恢复后从一个完整的 rollout 开始，
+    不会重复或遗漏训练数据。状态拷贝在训练线程，写盘在后台线程
+    """
+
+    def __init__(self, checkpointer, save_every: int = 10000, verbose: int = 0):
+        super().__init__(verbose)
+        self.checkpointer = checkpointer
+        self.save_every = save_every
+        self._next_save = None
+
+    def _on_training_start(self) -> None:
+        self._next_save = (self.num_timesteps // self.save_every + 1) * self.save_every
+
+    def _on_rollout_start(self) -> None:
+        if self.num_timesteps >= self._next_save:
+            self.save()
+            self._next_save = (self.num_timesteps // self.save_every + 1) * self.save_every
+
+    def _on_step(self) -> bool:
+        return True
+
+    def _on_training_end(self) -> None:
+        self.save()
+        self.checkpointer.wait()
+
+    def save(self):
+        from training.checkpoint import capture_training_state
+        self.checkpointer.save(self.num_timesteps, capture_training_state(self.model))
+        if self.verbose:
+            print(f"断点已提交: step={self.num_timesteps}")
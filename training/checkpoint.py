@@ -0,0 +1,222 @@
+"""
+训练断点：周期性地在后台线程写出完整训练状态，崩溃后可从最近一次断点继续
+
+保存内容: 策略参数、优化器状态、时间步/回合/更新计数、python/numpy/torch 随机数状态、
+VecNormalize 统计量、各子环境状态（回合计数、随机数流、课程采样器）
+"""
+import copy
+import glob
+import os
+import pickle
+import queue
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional, Callable
+
+import numpy as np
+
+CHECKPOINT_PATTERN = "ckpt_{:012d}.pt"
+LATEST_FILE = "latest"
+
+
+def _torch_save(state, path):
+    import torch
+    torch.save(state, path)
+
+
+def _torch_load(path):
+    import torch
+    return torch.load(path, map_location="cpu", weights_only=False)
+
+
+class AsyncCheckpointer:
+    """
+    后台线程写断点
+
+    save() 只在调用线程里拷贝状态（小型 MLP 策略耗时在毫秒级），序列化和写盘在后台线程完成，
+    不阻塞采样。写入先落到临时文件并 fsync，再 os.replace 为正式文件名，最后原子更新 latest 指针，
+    任何时刻崩溃都不会留下半个断点。上一个断点还没写完时，新的断点替换掉排队中的旧断点
+    """
+
+    def __init__(self, directory: str, keep_last: int = 3,
+                 save_fn: Callable = _torch_save, load_fn: Callable = _torch_load):
+        """
+        Args:
+            directory: 断点目录
+            keep_last: 保留最近的断点个数
+            save_fn / load_fn: 序列化函数，默认 torch.save / torch.load
+        """
+        self.directory = directory
+        self.keep_last = keep_last
+        self.save_fn = save_fn
+        self.load_fn = load_fn
+        os.makedirs(directory, exist_ok=True)
+        self._queue = queue.Queue(maxsize=1)
+        self.last_error: Optional[BaseException] = None
+        self.last_saved: Optional[str] = None
+        self._thread = threading.Thread(target=self._worker, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+
+    def save(self, step: int, state: Dict[str, Any]):
+        """提交一个断点（state 需已与训练解耦，见 capture_training_state）"""
+        item = (step, state)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            # 丢弃排队中尚未开始写的旧断点
+            try:
+                self._queue.get_nowait()
+                self._queue.task_done()
+            except queue.Empty:
+                pass
+            self._queue.put_nowait(item)
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            step, state = item
+            try:
+                self._write(step, state)
+            except Exception as e:
+                self.last_error = e
+                print(f"× 断点写入失败 (step={step}): {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, step: int, state: Dict[str, Any]):
+        path = os.path.join(self.directory, CHECKPOINT_PATTERN.format(step))
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            self.save_fn(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+        latest = os.path.join(self.directory, LATEST_FILE)
+        with open(latest + ".tmp", "w", encoding="utf-8") as f:
+            f.write(os.path.basename(path))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(latest + ".tmp", latest)
+        self.last_saved = path
+        self._prune()
+
+    def _prune(self):
+        paths = sorted(glob.glob(os.path.join(self.directory, "ckpt_*.pt")))
+        for path in paths[:-self.keep_last] if self.keep_last > 0 else []:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def wait(self):
+        """等待排队的断点全部写完"""
+        self._queue.join()
+
+    def close(self):
+        self.wait()
+        self._queue.put(None)
+        self._thread.join()
+
+    def latest(self) -> Optional[str]:
+        """最近一次完整写出的断点路径"""
+        latest = os.path.join(self.directory, LATEST_FILE)
+        if not os.path.exists(latest):
+            return None
+        with open(latest, "r", encoding="utf-8") as f:
+            path = os.path.join(self.directory, f.read().strip())
+        return path if os.path.exists(path) else None
+
+    def load(self, path: Optional[str] = None) -> Dict[str, Any]:
+        path = path or self.latest()
+        if path is None:
+            raise FileNotFoundError(f"{self.directory} 中没有断点")
+        with open(path, "rb") as f:
+            return self.load_fn(f)
+
+
+def _find_vec_normalize(env):
+    """沿 VecEnvWrapper 链查找 VecNormalize"""
+    while env is not None:
+        if hasattr(env, "obs_rms") and hasattr(env, "ret_rms"):
+            return env
+        env = getattr(env, "venv", None)
+    return None
+
+
+def capture_training_state(model, extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    在调用线程中拷贝完整训练状态，返回的字典之后可安全地交给后台线程序列化
+
+    Args:
+        model: SB3 算法实例
+        extra: 额外需要保存的内容
+    """
+    import torch
+
+    env = model.get_env()
+    state = {
+        "saved_at": time.time(),
+        "num_timesteps": model.num_timesteps,
+        "episode_num": model._episode_num,
+        "n_updates": getattr(model, "_n_updates", 0),
+        "policy": {k: v.detach().cpu().clone() for k, v in model.policy.state_dict().items()},
+        "optimizer": copy.deepcopy(model.policy.optimizer.state_dict()),
+        "ep_info_buffer": list(model.ep_info_buffer) if model.ep_info_buffer is not None else [],
+        "rng": {
+            "python": random.getstate(),
+            "numpy": np.random.get_state(),
+            "torch": torch.get_rng_state(),
+            "cuda": torch.cuda.get_rng_state_all() if torch.cuda.is_available() else None,
+        },
+        "vec_normalize": None,
+        "envs": None,
+        "extra": extra or {},
+    }
+    vec_normalize = _find_vec_normalize(env)
+    if vec_normalize is not None:
+        state["vec_normalize"] = pickle.dumps({
+            "obs_rms": vec_normalize.obs_rms,
+            "ret_rms": vec_normalize.ret_rms,
+            "returns": vec_normalize.returns,
+        })
+    if env is not None and env.has_attr("get_training_state"):
+        state["envs"] = env.env_method("get_training_state")
+    return state
+
+
+def restore_training_state(model, state: Dict[str, Any]):
+    """把 capture_training_state 的结果恢复到新建的同结构模型和环境上"""
+    import torch
+
+    model.policy.load_state_dict(state["policy"])
+    model.policy.optimizer.load_state_dict(state["optimizer"])
+    model.num_timesteps = state["num_timesteps"]
+    model._episode_num = state["episode_num"]
+    if hasattr(model, "_n_updates"):
+        model._n_updates = state["n_updates"]
+    model.ep_info_buffer = deque(state["ep_info_buffer"], maxlen=getattr(model, "_stats_window_size", 100))
+
+    rng = state["rng"]
+    random.setstate(rng["python"])
+    np.random.set_state(rng["numpy"])
+    torch.set_rng_state(rng["torch"])
+    if rng.get("cuda") is not None and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(rng["cuda"])
+
+    env = model.get_env()
+    vec_normalize = _find_vec_normalize(env)
+    if vec_normalize is not None and state.get("vec_normalize") is not None:
+        stats = pickle.loads(state["vec_normalize"])
+        vec_normalize.obs_rms = stats["obs_rms"]
+        vec_normalize.ret_rms = stats["ret_rms"]
+        vec_normalize.returns = stats["returns"]
+    if env is not None and state.get("envs") is not None:
+        for index, env_state in enumerate(state["envs"]):
+            env.env_method("set_training_state", env_state, indices=[index])
+    return state.get("extra", {})
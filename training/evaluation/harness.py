@@ -0,0 +1,275 @@
+"""
+并行评估：把评估套件中的回合分发给多个仿真端点上的评估进程，汇总成功率、到达时间、最低高度和回报分布，
+可选只为失败回合导出 ACMI 以便在 Tacview 中复盘
+
+运行:
+    python -m training.evaluation.harness --model ppo_point_tracking.zip --env point_tracking \
+        --endpoints tcp://127.0.0.1:8888,tcp://127.0.0.1:8889 --episodes 100 --acmi-dir eval_failures
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import queue
+import traceback
+from typing import Callable, Dict, Any, List, Optional, Sequence
+
+import numpy as np
+
+from core.base.environment_base import AirCombatEnvironmentBase
+from core.environments.point_tracking.point_tracking_env import PointTrackingEnv
+from training.evaluation.suite import EvaluationSuite, EpisodeSpec
+from visualization.acmi import write_acmi
+
+# 环境类没有声明 SUCCESS_REASONS 时视为成功的终止原因（各环境类常量的并集）
+SUCCESS_REASONS = AirCombatEnvironmentBase.SUCCESS_REASONS | PointTrackingEnv.SUCCESS_REASONS
+
+
+# ---------- 环境与策略构造（需为顶层函数，spawn 子进程中按名称导入） ----------
+def make_point_tracking_env(endpoint: str, max_steps: int = 200):
+    from communication.client_factory import ClientFactory
+    from core.environments.point_tracking.point_tracking_env import PointTrackingEnv
+    return PointTrackingEnv(simulation_client=ClientFactory.create_client(endpoint), max_steps=max_steps)
+
+
+def make_combat_env(env_name: str):
+    def _make(endpoint: str, max_steps: int = 3000):
+        from communication.client_factory import ClientFactory
+        from core.environments.environment_factory import EnvironmentFactory
+        return EnvironmentFactory.create_environment(env_name, ClientFactory.create_client(endpoint))
+    return _make
+
+
+EVAL_ENVS: Dict[str, Callable] = {
+    "point_tracking": make_point_tracking_env,
+    "basic_combat": make_combat_env("basic_combat"),
+    "bvr_combat": make_combat_env("bvr_combat"),
+}
+
+
+def load_sb3_policy(model_path: str):
+    """默认策略加载：SB3 PPO 模型文件"""
+    from stable_baselines3 import PPO
+    return PPO.load(model_path, device="cpu")
+
+
+# ---------- 单回合 ----------
+def _frame_of(env, info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """当前观测帧：点跟踪环境保存在 env.observation，对抗环境在 info['raw_data']"""
+    frame = getattr(env.unwrapped, "observation", None)
+    return frame if isinstance(frame, dict) else info.get("raw_data")
+
+
+def _altitude_of(frame: Optional[Dict[str, Any]]) -> float:
+    if not frame:
+        return math.nan
+    if frame.get("platforms"):
+        return frame["platforms"][0].get("alt", math.nan)
+    return frame.get("ownship", {}).get("altitude", math.nan)
+
+
+def run_episode(env, policy, spec: EpisodeSpec, max_steps: int, record_frames: bool) -> Dict[str, Any]:
+    """
+    运行一个评估回合
+
+    Returns:
+        回合结果字典；record_frames=True 时带 "frames": [(sim_time, platforms), ...]
+    """
+    obs, info = env.reset(seed=spec.seed, options=spec.reset_options())
+    frames = []
+    total_reward = 0.0
+    min_altitude = math.inf
+    reason = None
+    steps = 0
+    frame = _frame_of(env, info)
+    for steps in range(1, max_steps + 1):
+        if frame is not None:
+            min_altitude = min(min_altitude, _altitude_of(frame))
+            if record_frames and frame.get("platforms"):
+                frames.append((frame.get("sim_time", 0.0), frame["platforms"]))
+        action, _ = policy.predict(obs, deterministic=True)
+        obs, reward, terminated, truncated, info = env.step(action)
+        total_reward += float(reward)
+        frame = _frame_of(env, info)
+        if terminated or truncated:
+            reason = info.get("termination_reason", "terminated" if terminated else "truncated")
+            break
+    else:
+        reason = "max_steps"
+    if frame is not None:
+        min_altitude = min(min_altitude, _altitude_of(frame))
+        if record_frames and frame.get("platforms"):
+            frames.append((frame.get("sim_time", 0.0), frame["platforms"]))
+
+    success = reason in getattr(env.unwrapped, "SUCCESS_REASONS", SUCCESS_REASONS)
+    result = {
+        "episode_id": spec.episode_id,
+        "seed": spec.seed,
+        "success": success,
+        "reason": reason,
+        "steps": steps,
+        "return": total_reward,
+        "min_altitude": min_altitude,
+        "time_to_target": frame.get("sim_time", math.nan) if success and frame else math.nan,
+    }
+    if record_frames:
+        result["frames"] = frames
+    return result
+
+
+def _worker(endpoint: str, env_name: str, model_path: str, policy_loader: Callable, max_steps: int,
+            acmi_dir: Optional[str], tasks, results):
+    """评估进程：独占一个仿真端点，循环领取回合直到收到 None"""
+    env = None
+    try:
+        env = EVAL_ENVS[env_name](endpoint)
+        policy = policy_loader(model_path)
+        while True:
+            spec = tasks.get()
+            if spec is None:
+                break
+            spec = EpisodeSpec.from_dict(spec)
+            try:
+                result = run_episode(env, policy, spec, max_steps, record_frames=acmi_dir is not None)
+            except Exception:
+                result = {"episode_id": spec.episode_id, "seed": spec.seed, "success": False,
+                          "reason": "error", "error": traceback.format_exc()}
+            frames = result.pop("frames", None)
+            if frames and not result["success"]:
+                result["acmi"] = write_acmi(os.path.join(acmi_dir, f"episode_{spec.episode_id:05d}.acmi"), frames)
+            result["endpoint"] = endpoint
+            results.put(result)
+    except Exception:
+        results.put({"worker_error": traceback.format_exc(), "endpoint": endpoint})
+    finally:
+        if env is not None:
+            env.close()
+
+
+# ---------- 汇总 ----------
+def _distribution(values: Sequence[float]) -> Dict[str, float]:
+    values = np.asarray([v for v in values if not math.isnan(v)], dtype=np.float64)
+    if values.size == 0:
+        return {}
+    return {"mean": float(values.mean()), "std": float(values.std()), "min": float(values.min()),
+            "p10": float(np.percentile(values, 10)), "p50": float(np.percentile(values, 50)),
+            "p90": float(np.percentile(values, 90)), "max": float(values.max())}
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """按回合结果计算评估指标"""
+    done = [r for r in results if r.get("reason") != "error"]
+    reasons: Dict[str, int] = {}
+    for r in results:
+        reasons[r["reason"]] = reasons.get(r["reason"], 0) + 1
+    successes = [r for r in done if r["success"]]
+    return {
+        "episodes": len(results),
+        "errors": len(results) - len(done),
+        "success_rate": len(successes) / len(done) if done else 0.0,
+        "termination_reasons": reasons,
+        "time_to_target": _distribution([r["time_to_target"] for r in successes]),
+        "min_altitude": _distribution([r["min_altitude"] for r in done]),
+        "return": _distribution([r["return"] for r in done]),
+        "steps": _distribution([r["steps"] for r in done]),
+    }
+
+
+class EvaluationHarness:
+    """
+    并行评估
+
+    每个仿真端点一个评估进程，回合通过共享队列动态分发，先完成的进程先领取下一个回合，
+    端点速度不一致时也不会互相等待
+    """
+
+    def __init__(self, env_name: str, model_path: str, endpoints: Sequence[str], max_steps: int = 2000,
+                 acmi_dir: Optional[str] = None, policy_loader: Callable = load_sb3_policy,
+                 start_method: str = "spawn"):
+        """
+        Args:
+            env_name: EVAL_ENVS 中的环境名称
+            model_path: 策略文件
+            endpoints: 仿真服务地址列表（ClientFactory 格式），每个地址一个评估进程
+            max_steps: 单回合最大步数
+            acmi_dir: 失败回合的 ACMI 输出目录，None 不导出
+            policy_loader: policy_loader(model_path) -> 带 predict(obs, deterministic) 的对象，需为顶层函数
+        """
+        if env_name not in EVAL_ENVS:
+            raise ValueError(f"环境 '{env_name}' 不支持评估。可用环境: {list(EVAL_ENVS.keys())}")
+        self.env_name = env_name
+        self.model_path = model_path
+        self.endpoints = list(endpoints)
+        self.max_steps = max_steps
+        self.acmi_dir = acmi_dir
+        self.policy_loader = policy_loader
+        self.ctx = multiprocessing.get_context(start_method)
+        if acmi_dir:
+            os.makedirs(acmi_dir, exist_ok=True)
+
+    def run(self, suite: EvaluationSuite) -> Dict[str, Any]:
+        tasks = self.ctx.Queue()
+        results = self.ctx.Queue()
+        for spec in suite.episodes:
+            tasks.put(spec.to_dict())
+        for _ in self.endpoints:
+            tasks.put(None)
+
+        workers = [self.ctx.Process(target=_worker, daemon=True,
+                                    args=(endpoint, self.env_name, self.model_path, self.policy_loader,
+                                          self.max_steps, self.acmi_dir, tasks, results))
+                   for endpoint in self.endpoints]
+        for worker in workers:
+            worker.start()
+
+        collected: List[Dict[str, Any]] = []
+        alive = len(workers)
+        while len(collected) < len(suite) and alive:
+            try:
+                result = results.get(timeout=1.0)
+            except queue.Empty:
+                alive = sum(w.is_alive() for w in workers)
+                continue
+            if "worker_error" in result:
+                print(f"× 评估进程 {result['endpoint']} 失败:\n{result['worker_error']}")
+                continue
+            collected.append(result)
+            mark = "✓" if result["success"] else "×"
+            print(f"{mark} 回合 {result['episode_id']} ({result['reason']}) return={result.get('return', math.nan):.3f}")
+        for worker in workers:
+            worker.join(timeout=10)
+
+        collected.sort(key=lambda r: r["episode_id"])
+        summary = summarize(collected)
+        summary.update({"suite": suite.name, "env": self.env_name, "model": self.model_path})
+        return {"summary": summary, "episodes": collected}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="策略并行评估")
+    parser.add_argument("--model", required=True, help="策略文件")
+    parser.add_argument("--env", default="point_tracking", choices=list(EVAL_ENVS.keys()))
+    parser.add_argument("--endpoints", default="tcp://127.0.0.1:8888", help="逗号分隔的仿真服务地址")
+    parser.add_argument("--suite", default=None, help="评估套件 JSON，不存在时按 --episodes/--seed 生成并保存")
+    parser.add_argument("--episodes", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--difficulty", type=float, default=0.5)
+    parser.add_argument("--max-steps", type=int, default=2000)
+    parser.add_argument("--acmi-dir", default=None, help="失败回合的 ACMI 输出目录")
+    parser.add_argument("--output", default="evaluation.json")
+    args = parser.parse_args()
+
+    if args.suite and os.path.exists(args.suite):
+        suite = EvaluationSuite.load(args.suite)
+    else:
+        difficulty = args.difficulty if args.env == "point_tracking" else None
+        suite = EvaluationSuite.generate(f"{args.env}_seed{args.seed}", args.episodes, args.seed, difficulty)
+        if args.suite:
+            suite.save(args.suite)
+
+    harness = EvaluationHarness(args.env, args.model, args.endpoints.split(","), args.max_steps, args.acmi_dir)
+    report = harness.run(suite)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(json.dumps(report["summary"], indent=2, ensure_ascii=False))
@@ -0,0 +1,84 @@
+import json
+from typing import Dict, Any, List, Optional
+
+from core.curriculum.start_state_sampler import StartStateSampler, AdaptiveCurriculum
+from utils.seeding import derive_seeds
+
+
+class EpisodeSpec:
+    """评估套件中的一个回合：环境种子、下发给服务端的初始状态和目标点"""
+
+    __slots__ = ("episode_id", "seed", "custom_state", "target")
+
+    def __init__(self, episode_id: int, seed: int, custom_state: Optional[Dict[str, float]] = None,
+                 target: Optional[Dict[str, float]] = None):
+        self.episode_id = episode_id
+        self.seed = seed
+        self.custom_state = custom_state
+        self.target = target
+
+    def reset_options(self) -> Dict[str, Any]:
+        options = {}
+        if self.custom_state is not None:
+            options["custom_state"] = self.custom_state
+        if self.target is not None:
+            options["target_position"] = self.target
+        return options
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"episode_id": self.episode_id, "seed": self.seed,
+                "custom_state": self.custom_state, "target": self.target}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "EpisodeSpec":
+        return cls(data["episode_id"], data["seed"], data.get("custom_state"), data.get("target"))
+
+
+class EvaluationSuite:
+    """
+    固定的评估回合集合
+
+    由主种子和难度完全确定，保存为 JSON 后可在不同策略、不同时间之间复用，保证比较的是同一批初始状态
+    """
+
+    def __init__(self, name: str, episodes: List[EpisodeSpec]):
+        self.name = name
+        self.episodes = episodes
+
+    def __len__(self):
+        return len(self.episodes)
+
+    @classmethod
+    def generate(cls, name: str, num_episodes: int, seed: int = 0, difficulty: Optional[float] = 0.5,
+                 origin: Optional[Dict[str, float]] = None) -> "EvaluationSuite":
+        """
+        生成评估套件
+
+        Args:
+            name: 套件名称
+            num_episodes: 回合数
+            seed: 主种子
+            difficulty: 用课程采样器在该难度下采样初始状态和目标点；None 表示只固定种子，
+                        初始状态由环境自行决定（对抗环境）
+            origin: 初始位置经纬度
+        """
+        seeds = derive_seeds(seed, num_episodes)
+        if difficulty is None:
+            return cls(name, [EpisodeSpec(i, s) for i, s in enumerate(seeds)])
+        sampler = StartStateSampler(num_envs=1, origin=origin, seed=seed,
+                                    curriculum=AdaptiveCurriculum(initial_difficulty=difficulty))
+        episodes = []
+        for i, episode_seed in enumerate(seeds):
+            sample = sampler.sample(0)
+            episodes.append(EpisodeSpec(i, episode_seed, sample["custom_state"], sample["target"]))
+        return cls(name, episodes)
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"name": self.name, "episodes": [e.to_dict() for e in self.episodes]}, f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "EvaluationSuite":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["name"], [EpisodeSpec.from_dict(e) for e in data["episodes"]])
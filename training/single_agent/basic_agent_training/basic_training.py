@@ -1,23 +1,40 @@
+from typing import Dict, Any, Optional
+
 import torch
 import torch.nn as nn
 import gymnasium as gym
 from stable_baselines3 import PPO
 from stable_baselines3.common.env_checker import check_env
 
-from core.environment import AirCombatEnv
-from communication.http_client import SimulationClient
+from core.environments.environment_factory import EnvironmentFactory
+from communication.client_factory import ClientFactory
+
+# 默认 PPO 超参数，扫描试验的参数覆盖其中同名项
+DEFAULT_PPO_PARAMS = {
+    "learning_rate": 3e-4,
+    "n_steps": 2048,
+    "batch_size": 64,
+    "n_epochs": 10,
+    "gamma": 0.99,
+    "gae_lambda": 0.95,
+    "clip_range": 0.2,
+}
 
 
-def train_single_agent_combat():
+def train_single_agent_combat(params: Optional[Dict[str, Any]] = None,
+                              endpoint: str = "http://simulation-server:8080",
+                              total_timesteps: int = 1_000_000,
+                              callback=None,
+                              save_path: Optional[str] = "./models/single_agent_combat") -> PPO:
     """单智能体对抗训练"""
 
     # 初始化仿真客户端
-    sim_client = SimulationClient("http://simulation-server:8080")
+    sim_client = ClientFactory.create_client(endpoint)
 
     # 创建环境
-    env = AirCombatEnv(
+    env = EnvironmentFactory.create_environment(
+        "basic_combat",
         sim_client=sim_client,
-        env_name="air_combat_basic",
         render=False,
         save_acmi=True,
         acmi_file_path="./logs/training.acmi"
@@ -30,28 +47,25 @@ def train_single_agent_combat():
     model = PPO(
         "MlpPolicy",
         env,
-        learning_rate=3e-4,
-        n_steps=2048,
-        batch_size=64,
-        n_epochs=10,
-        gamma=0.99,
-        gae_lambda=0.95,
-        clip_range=0.2,
         verbose=1,
-        tensorboard_log="./logs/tensorboard/"
+        tensorboard_log="./logs/tensorboard/",
+        **dict(DEFAULT_PPO_PARAMS, **(params or {}))
     )
 
     # 训练模型
     model.learn(
-        total_timesteps=1_000_000,
+        total_timesteps=total_timesteps,
         log_interval=10,
-        tb_log_name="single_agent_combat"
+        tb_log_name="single_agent_combat",
+        callback=callback
     )
 
     # 保存模型
-    model.save("./models/single_agent_combat")
+    if save_path:
+        model.save(save_path)
 
     env.close()
+    return model
 
 
 if __name__ == "__main__":
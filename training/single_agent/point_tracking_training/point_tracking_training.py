@@ -1,47 +1,126 @@
+import argparse
+import os
+from typing import Dict, Any, Optional
+
 from stable_baselines3 import PPO
 from stable_baselines3.common.monitor import Monitor
-from stable_baselines3.common.vec_env import DummyVecEnv
-from stable_baselines3.common.callbacks import CheckpointCallback
-from communication.tcp_client import SimulationClient
+from stable_baselines3.common.vec_env import DummyVecEnv, VecNormalize
+from communication.client_factory import ClientFactory
 from core.environments.point_tracking.point_tracking_env import PointTrackingEnv
+from training.callbacks import LatencyTensorboardCallback, SweepReportCallback, AsyncCheckpointCallback
+from training.checkpoint import AsyncCheckpointer, restore_training_state
+from utils.latency import LatencyProfiler
+
+# 默认 PPO 超参数，扫描试验的参数覆盖其中同名项
+DEFAULT_PPO_PARAMS = {
+    "learning_rate": 3e-4,
+    "n_steps": 2048,
+    "batch_size": 64,
+    "n_epochs": 10,
+    "gamma": 0.99,
+    "gae_lambda": 0.95,
+    "clip_range": 0.2,
+    "ent_coef": 0.01,
+}
 
+# 扫描试验上报中间结果的间隔（时间步），ASHA 的最低档需为其整数倍
+SWEEP_REPORT_EVERY = 8192
 
-def make_env():
-    simulation = SimulationClient(host='127.0.0.1', port=8888)
-    env = PointTrackingEnv(simulation_client=simulation, max_steps=200)
+
+def make_env(endpoint: str = "tcp://127.0.0.1:8888", max_steps: int = 200):
+    simulation = ClientFactory.create_client(endpoint)
+    env = PointTrackingEnv(simulation_client=simulation, max_steps=max_steps, profiler=LatencyProfiler())
     return env
 
 
-# 创建向量化环境
-env = DummyVecEnv([make_env])
-
-# 创建模型
-model = PPO(
-    "MlpPolicy",
-    env,
-    verbose=1,
-    learning_rate=3e-4,
-    n_steps=2048,
-    batch_size=64,
-    n_epochs=10,
-    gamma=0.99,
-    gae_lambda=0.95,
-    clip_range=0.2,
-    ent_coef=0.01,
-    tensorboard_log="./ppo_tracking_tensorboard/"
-)
-
-# 训练
-model.learn(total_timesteps=100000)
-model.save("ppo_point_tracking")
-
-# 测试
-# env = make_env()
-# obs, info = env.reset()
-# for _ in range(1000):
-#     action, _ = model.predict(obs, deterministic=True)
-#     obs, reward, terminated, truncated, info = env.step(action)
-#     if terminated or truncated:
-#         obs, info = env.reset()
-
-env.close()
+def train(params: Optional[Dict[str, Any]] = None, endpoint: str = "tcp://127.0.0.1:8888",
+          total_timesteps: int = 100000, callback=None, tensorboard_log: Optional[str] = "./ppo_tracking_tensorboard/",
+          verbose: int = 1, normalize: bool = False, checkpoint_dir: Optional[str] = None,
+          checkpoint_every: int = 10000, resume: Optional[str] = None) -> PPO:
+    """
+    训练点跟踪 PPO
+
+    Args:
+        params: 覆盖 DEFAULT_PPO_PARAMS 的超参数
+        endpoint: 仿真服务地址（ClientFactory 格式）
+        total_timesteps: 训练总步数
+        callback: 额外的回调（与耗时统计回调一起使用）
+        tensorboard_log: TensorBoard 日志目录，None 不记录
+        normalize: 是否使用 VecNormalize 归一化观测和回报
+        checkpoint_dir: 断点目录，None 不写断点
+        checkpoint_every: 断点间隔（时间步）
+        resume: 断点路径，"latest" 表示 checkpoint_dir 中最近的断点；未指定 checkpoint_dir 时
+            使用断点文件所在目录，继续训练的断点也写回该目录
+    """
+    if resume and not checkpoint_dir:
+        if resume == "latest":
+            raise ValueError('resume="latest" 需要指定 checkpoint_dir')
+        checkpoint_dir = os.path.dirname(os.path.abspath(resume))
+
+    # 创建向量化环境
+    env = DummyVecEnv([lambda: make_env(endpoint)])
+    if normalize:
+        env = VecNormalize(env)
+
+    # 创建模型
+    model = PPO(
+        "MlpPolicy",
+        env,
+        verbose=verbose,
+        tensorboard_log=tensorboard_log,
+        **dict(DEFAULT_PPO_PARAMS, **(params or {}))
+    )
+
+    checkpointer = AsyncCheckpointer(checkpoint_dir) if checkpoint_dir else None
+    if resume:
+        state = checkpointer.load(None if resume == "latest" else resume)
+        restore_training_state(model, state)
+        print(f"√ 从第 {model.num_timesteps} 步继续训练")
+
+    # 训练
+    callbacks = [LatencyTensorboardCallback()]
+    if checkpointer is not None:
+        callbacks.append(AsyncCheckpointCallback(checkpointer, save_every=checkpoint_every))
+    if callback is not None:
+        callbacks.append(callback)
+    try:
+        model.learn(total_timesteps=max(0, total_timesteps - model.num_timesteps), callback=callbacks,
+                    reset_num_timesteps=not resume)
+    finally:
+        if checkpointer is not None:
+            checkpointer.close()
+        env.close()
+    return model
+
+
+def sweep_objective(params: Dict[str, Any], endpoint: str, reporter) -> float:
+    """超参数扫描的目标函数：返回训练结束时最近若干回合的平均回报"""
+    total_timesteps = int(params.pop("total_timesteps", 100000))
+    callback = SweepReportCallback(reporter, report_every=SWEEP_REPORT_EVERY)
+    train(params, endpoint, total_timesteps, callback=callback, tensorboard_log=None, verbose=0)
+    return callback.mean_return
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="点跟踪 PPO 训练")
+    parser.add_argument("--endpoint", default="tcp://127.0.0.1:8888")
+    parser.add_argument("--total-timesteps", type=int, default=100000)
+    parser.add_argument("--checkpoint-dir", default="./checkpoints/point_tracking")
+    parser.add_argument("--checkpoint-every", type=int, default=10000)
+    parser.add_argument("--resume", nargs="?", const="latest", default=None,
+                        help="从断点继续，不带参数时使用最近的断点")
+    parser.add_argument("--normalize", action="store_true")
+    args = parser.parse_args()
+
+    model = train(endpoint=args.endpoint, total_timesteps=args.total_timesteps, normalize=args.normalize,
+                  checkpoint_dir=args.checkpoint_dir, checkpoint_every=args.checkpoint_every, resume=args.resume)
+    model.save("ppo_point_tracking")
+
+    # 测试
+    # env = make_env()
+    # obs, info = env.reset()
+    # for _ in range(1000):
+    #     action, _ = model.predict(obs, deterministic=True)
+    #     obs, reward, terminated, truncated, info = env.step(action)
+    #     if terminated or truncated:
+    #         obs, info = env.reset()
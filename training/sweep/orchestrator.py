@@ -0,0 +1,256 @@
+"""
+超参数扫描编排：在固定的仿真端点池上并发调度训练试验，提前终止表现差的试验，结果写入 sqlite
+
+运行点跟踪 PPO 扫描:
+    python -m training.sweep.orchestrator --endpoints tcp://127.0.0.1:8888,tcp://127.0.0.1:8889 \
+        --trials 20 --cores-per-trial 2 --pruner asha --db sweeps.db
+"""
+import argparse
+import multiprocessing
+import os
+import queue
+import sys
+import time
+import traceback
+from typing import Callable, Dict, Any, Optional
+
+import numpy as np
+
+from training.sweep.search_space import SearchSpace, LogUniform, Uniform, Choice
+from training.sweep.resource_pool import ResourcePool, Lease
+from training.sweep.pruners import PrunerBase, NopPruner, MedianPruner, ASHAPruner
+from training.sweep.storage import SweepStorage, TRIAL_COMPLETE, TRIAL_PRUNED, TRIAL_FAILED
+
+# 试验子进程中限制线程数的数值库环境变量
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+# objective(params, endpoint, reporter) -> 最终目标值
+Objective = Callable[[Dict[str, Any], str, "TrialReporter"], float]
+
+
+class TrialReporter:
+    """试验子进程内的上报句柄：中间结果发给编排进程，被剪枝后 should_stop 变为 True"""
+
+    def __init__(self, trial_id: int, messages, stop_event, cores):
+        self.trial_id = trial_id
+        self.cores = cores
+        self._messages = messages
+        self._stop_event = stop_event
+
+    @property
+    def should_stop(self) -> bool:
+        return self._stop_event.is_set()
+
+    def report(self, step: int, value: float) -> bool:
+        """上报 step 处的中间结果，返回是否继续训练"""
+        self._messages.put(("report", self.trial_id, int(step), float(value)))
+        return not self._stop_event.is_set()
+
+
+def _run_trial(objective: Objective, trial_id: int, params: Dict[str, Any], endpoint: str, cores, messages,
+               stop_event):
+    """
+    试验子进程入口：绑定 CPU 核后执行 objective
+
+    线程数环境变量由编排进程在启动子进程前设置（spawn 子进程反序列化 objective 时就会导入 torch，
+    在这里设置已经来不及）；fork 方式下 torch 可能已在父进程导入，再直接设置一次线程数
+    """
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(len(cores))
+    reporter = TrialReporter(trial_id, messages, stop_event, cores)
+    try:
+        value = objective(params, endpoint, reporter)
+        messages.put(("done", trial_id, None if value is None else float(value), None))
+    except Exception:
+        messages.put(("done", trial_id, None, traceback.format_exc()))
+
+
+class _RunningTrial:
+    __slots__ = ("trial_id", "lease", "process", "stop_event", "pruned", "done", "stop_requested_at")
+
+    def __init__(self, trial_id, lease, process, stop_event):
+        self.trial_id = trial_id
+        self.lease = lease
+        self.process = process
+        self.stop_event = stop_event
+        self.pruned = False
+        self.done = False
+        self.stop_requested_at = None
+
+
+class SweepOrchestrator:
+    """
+    扫描编排器
+
+    资源池有空闲端点和核时就采样一组参数启动新试验（子进程）；子进程通过队列上报中间结果，
+    编排进程写入存储并询问剪枝器，需要剪枝时通知子进程自行停止（超过 stop_grace 秒仍未退出则强制结束）
+    """
+
+    def __init__(self, objective: Objective, space: SearchSpace, pool: ResourcePool, storage: SweepStorage,
+                 pruner: Optional[PrunerBase] = None, n_trials: int = 20, direction: str = "maximize",
+                 seed: Optional[int] = None, stop_grace: float = 60.0, start_method: str = "spawn"):
+        """
+        Args:
+            objective: 顶层函数（spawn 方式需可被子进程导入）
+            space: 搜索空间
+            pool: 仿真端点与 CPU 核资源池
+            storage: 结果存储
+            pruner: 剪枝器，None 表示不剪枝
+            n_trials: 试验总数
+            direction: "maximize" 或 "minimize"
+            seed: 参数采样的随机种子
+            stop_grace: 剪枝后等待子进程自行退出的时间（秒）
+            start_method: 子进程启动方式
+        """
+        self.objective = objective
+        self.space = space
+        self.pool = pool
+        self.storage = storage
+        self.pruner = pruner or NopPruner(direction)
+        if self.pruner.direction is None:
+            self.pruner.direction = direction
+        elif self.pruner.direction != direction:
+            raise ValueError(f"剪枝器方向 {self.pruner.direction} 与扫描方向 {direction} 不一致")
+        self.n_trials = n_trials
+        self.direction = direction
+        self.rng = np.random.default_rng(seed)
+        self.stop_grace = stop_grace
+        self.ctx = multiprocessing.get_context(start_method)
+        self.messages = self.ctx.Queue()
+        self.running: Dict[int, _RunningTrial] = {}
+        self.started = 0
+
+    def _launch(self, lease: Lease):
+        params = self.space.sample(self.rng)
+        trial_id = self.storage.create_trial(params, lease.endpoint, lease.cores)
+        stop_event = self.ctx.Event()
+        process = self.ctx.Process(target=_run_trial, daemon=True,
+                                   args=(self.objective, trial_id, params, lease.endpoint, lease.cores,
+                                         self.messages, stop_event))
+        # 子进程启动时继承环境变量，在导入 torch 之前生效
+        saved = {var: os.environ.get(var) for var in THREAD_ENV_VARS}
+        os.environ.update({var: str(len(lease.cores)) for var in THREAD_ENV_VARS})
+        try:
+            process.start()
+        finally:
+            for var, value in saved.items():
+                if value is None:
+                    os.environ.pop(var, None)
+                else:
+                    os.environ[var] = value
+        self.running[trial_id] = _RunningTrial(trial_id, lease, process, stop_event)
+        self.started += 1
+        print(f"▶ 试验 {trial_id} 启动 {lease}: {params}")
+
+    def _handle(self, message):
+        kind, trial_id = message[0], message[1]
+        trial = self.running.get(trial_id)
+        if trial is None:
+            return
+        if kind == "report":
+            _, _, step, value = message
+            self.storage.report(trial_id, step, value)
+            if not trial.pruned and self.pruner.should_prune(self.storage, trial_id, step, value):
+                trial.pruned = True
+                trial.stop_requested_at = time.time()
+                trial.stop_event.set()
+                print(f"✂ 试验 {trial_id} 在第 {step} 步被剪枝 (value={value:.4f})")
+        elif kind == "done":
+            _, _, value, error = message
+            trial.done = True
+            if error is not None:
+                self.storage.finish(trial_id, TRIAL_FAILED, error=error)
+                print(f"× 试验 {trial_id} 失败:\n{error}")
+            elif trial.pruned:
+                self.storage.finish(trial_id, TRIAL_PRUNED)
+            else:
+                self.storage.finish(trial_id, TRIAL_COMPLETE, value)
+                print(f"✓ 试验 {trial_id} 完成 value={value}")
+
+    def _reap(self):
+        """回收已退出的子进程并释放资源"""
+        for trial_id, trial in list(self.running.items()):
+            if trial.process.is_alive():
+                if trial.stop_requested_at and time.time() - trial.stop_requested_at > self.stop_grace:
+                    trial.process.terminate()
+                continue
+            if not trial.done:
+                # 子进程退出时 done 消息可能还在队列里
+                self._drain(timeout=0.2)
+            if not trial.done:
+                state = TRIAL_PRUNED if trial.pruned else TRIAL_FAILED
+                self.storage.finish(trial_id, state, error=None if trial.pruned else f"exitcode {trial.process.exitcode}")
+            trial.process.join()
+            self.pool.release(trial.lease)
+            del self.running[trial_id]
+
+    def _drain(self, timeout: float):
+        try:
+            self._handle(self.messages.get(timeout=timeout))
+            while True:
+                self._handle(self.messages.get_nowait())
+        except queue.Empty:
+            pass
+
+    def run(self) -> Optional[Dict[str, Any]]:
+        """运行全部试验，返回最优试验"""
+        try:
+            while self.started < self.n_trials or self.running:
+                while self.started < self.n_trials:
+                    lease = self.pool.try_acquire()
+                    if lease is None:
+                        break
+                    self._launch(lease)
+                self._drain(timeout=0.5)
+                self._reap()
+        finally:
+            for trial in self.running.values():
+                trial.process.terminate()
+        best = self.storage.best_trial(self.direction)
+        if best is not None:
+            print(f"★ 最优试验 {best['trial_id']} value={best['value']}: {best['params']}")
+        return best
+
+
+POINT_TRACKING_SPACE = SearchSpace({
+    "learning_rate": LogUniform(1e-5, 1e-3),
+    "n_steps": Choice([512, 1024, 2048]),
+    "clip_range": Uniform(0.1, 0.3),
+    "ent_coef": LogUniform(1e-4, 5e-2),
+    "gamma": 0.99,
+})
+
+
+if __name__ == "__main__":
+    from training.single_agent.point_tracking_training.point_tracking_training import sweep_objective
+
+    parser = argparse.ArgumentParser(description="点跟踪 PPO 超参数扫描")
+    parser.add_argument("--endpoints", default="tcp://127.0.0.1:8888", help="逗号分隔的仿真服务地址")
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--cores-per-trial", type=int, default=1)
+    parser.add_argument("--pruner", choices=["none", "median", "asha"], default="asha")
+    parser.add_argument("--direction", choices=["maximize", "minimize"], default="maximize")
+    parser.add_argument("--min-resource", type=int, default=8192, help="ASHA 最低档的训练步数")
+    parser.add_argument("--db", default="sweeps.db")
+    parser.add_argument("--sweep", default="point_tracking")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    pruners = {
+        "none": NopPruner(),
+        "median": MedianPruner(n_warmup_steps=args.min_resource),
+        "asha": ASHAPruner(min_resource=args.min_resource),
+    }
+    orchestrator = SweepOrchestrator(
+        objective=sweep_objective,
+        space=POINT_TRACKING_SPACE,
+        pool=ResourcePool(args.endpoints.split(","), cores_per_trial=args.cores_per_trial),
+        storage=SweepStorage(args.db, sweep=args.sweep),
+        pruner=pruners[args.pruner],
+        n_trials=args.trials,
+        direction=args.direction,
+        seed=args.seed,
+    )
+    orchestrator.run()
@@ -0,0 +1,77 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import numpy as np
+
+from training.sweep.storage import SweepStorage
+
+
+class PrunerBase(ABC):
+    """提前终止表现差的试验，direction 为 None 时由 SweepOrchestrator 设为扫描的优化方向"""
+
+    def __init__(self, direction: Optional[str] = None):
+        self.direction = direction
+
+    def _better(self, a: float, b: float) -> bool:
+        return a < b if self.direction == "minimize" else a > b
+
+    @abstractmethod
+    def should_prune(self, storage: SweepStorage, trial_id: int, step: int, value: float) -> bool:
+        """trial_id 在 step 上报 value 后是否应终止"""
+        pass
+
+
+class NopPruner(PrunerBase):
+    """不剪枝"""
+
+    def should_prune(self, storage, trial_id, step, value) -> bool:
+        return False
+
+
+class MedianPruner(PrunerBase):
+    """
+    中位数剪枝：同一步上至少有 n_startup_trials 个其他试验的结果后，
+    当前试验不如它们的中位数即终止
+    """
+
+    def __init__(self, direction: Optional[str] = None, n_startup_trials: int = 4, n_warmup_steps: int = 0):
+        super().__init__(direction)
+        self.n_startup_trials = n_startup_trials
+        self.n_warmup_steps = n_warmup_steps
+
+    def should_prune(self, storage, trial_id, step, value) -> bool:
+        if step < self.n_warmup_steps:
+            return False
+        others = storage.values_at_step(step, exclude_trial=trial_id)
+        if len(others) < self.n_startup_trials:
+            return False
+        return self._better(float(np.median(others)), value)
+
+
+class ASHAPruner(PrunerBase):
+    """
+    异步连续减半（ASHA）：资源档位为 min_resource * reduction_factor^k。
+    试验到达某一档时，只有位列该档已有结果的前 1/reduction_factor 才继续，否则终止；
+    不等待同批试验，先到的试验按当时已有的结果判定
+    """
+
+    def __init__(self, direction: Optional[str] = None, min_resource: int = 10000, reduction_factor: int = 3,
+                 max_resource: int = None):
+        super().__init__(direction)
+        self.min_resource = min_resource
+        self.reduction_factor = reduction_factor
+        self.max_resource = max_resource
+
+    def is_rung(self, step: int) -> bool:
+        rung = self.min_resource
+        while rung < step:
+            rung *= self.reduction_factor
+        return rung == step and (self.max_resource is None or step < self.max_resource)
+
+    def should_prune(self, storage, trial_id, step, value) -> bool:
+        if not self.is_rung(step):
+            return False
+        values = storage.values_at_step(step, exclude_trial=trial_id) + [value]
+        keep = max(1, len(values) // self.reduction_factor)
+        ordered = sorted(values, reverse=self.direction != "minimize")
+        return self._better(ordered[keep - 1], value)
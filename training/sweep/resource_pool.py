@@ -0,0 +1,61 @@
+import os
+import threading
+from typing import List, Optional, Sequence
+
+
+class Lease:
+    """分配给一个试验的资源：一个仿真端点和一组 CPU 核"""
+
+    __slots__ = ("endpoint", "cores")
+
+    def __init__(self, endpoint: str, cores: List[int]):
+        self.endpoint = endpoint
+        self.cores = cores
+
+    def __repr__(self):
+        return f"Lease({self.endpoint}, cores={self.cores})"
+
+
+class ResourcePool:
+    """
+    仿真端点（AFSim 许可）和 CPU 核的资源池
+
+    每个试验独占一个端点和 cores_per_trial 个核；两者任一不足时不再启动新试验。
+    并发试验数因此不会超过 min(端点数, 核数 // cores_per_trial)
+    """
+
+    def __init__(self, endpoints: Sequence[str], cores_per_trial: int = 1, cores: Optional[Sequence[int]] = None):
+        """
+        Args:
+            endpoints: 仿真服务地址列表，格式同 ClientFactory，例如 tcp://127.0.0.1:8888
+            cores_per_trial: 每个试验占用的 CPU 核数
+            cores: 可分配的核编号，None 时使用本进程可用的全部核
+        """
+        if cores is None:
+            cores = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else range(os.cpu_count() or 1)
+        self.cores_per_trial = max(1, min(cores_per_trial, len(cores)))
+        self._free_endpoints = list(endpoints)
+        self._free_cores = list(cores)
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        """当前空闲资源还能启动的试验数"""
+        with self._lock:
+            return min(len(self._free_endpoints), len(self._free_cores) // self.cores_per_trial)
+
+    def try_acquire(self) -> Optional[Lease]:
+        """申请一份资源，不足时返回 None"""
+        with self._lock:
+            if not self._free_endpoints or len(self._free_cores) < self.cores_per_trial:
+                return None
+            endpoint = self._free_endpoints.pop(0)
+            cores = self._free_cores[:self.cores_per_trial]
+            del self._free_cores[:self.cores_per_trial]
+            return Lease(endpoint, cores)
+
+    def release(self, lease: Lease):
+        with self._lock:
+            self._free_endpoints.append(lease.endpoint)
+            self._free_cores.extend(lease.cores)
+            self._free_cores.sort()
@@ -0,0 +1,68 @@
+import math
+from typing import Dict, Any, Sequence
+
+import numpy as np
+
+
+class Distribution:
+    """超参数分布基类"""
+
+    def sample(self, rng: np.random.Generator):
+        raise NotImplementedError
+
+
+class Uniform(Distribution):
+    def __init__(self, low: float, high: float):
+        self.low = low
+        self.high = high
+
+    def sample(self, rng: np.random.Generator) -> float:
+        return float(rng.uniform(self.low, self.high))
+
+
+class LogUniform(Distribution):
+    """对数均匀分布，适合学习率等跨数量级的参数"""
+
+    def __init__(self, low: float, high: float):
+        self.low = low
+        self.high = high
+
+    def sample(self, rng: np.random.Generator) -> float:
+        return float(math.exp(rng.uniform(math.log(self.low), math.log(self.high))))
+
+
+class IntUniform(Distribution):
+    """[low, high] 闭区间整数"""
+
+    def __init__(self, low: int, high: int):
+        self.low = low
+        self.high = high
+
+    def sample(self, rng: np.random.Generator) -> int:
+        return int(rng.integers(self.low, self.high + 1))
+
+
+class Choice(Distribution):
+    def __init__(self, options: Sequence):
+        self.options = list(options)
+
+    def sample(self, rng: np.random.Generator):
+        value = self.options[int(rng.integers(len(self.options)))]
+        return value.item() if isinstance(value, np.generic) else value
+
+
+class SearchSpace:
+    """
+    搜索空间：{参数名: 分布或常量}，常量原样出现在每个试验的参数中
+
+    例:
+        SearchSpace({"learning_rate": LogUniform(1e-5, 1e-3), "n_steps": Choice([512, 1024, 2048]),
+                     "gamma": 0.99})
+    """
+
+    def __init__(self, params: Dict[str, Any]):
+        self.params = params
+
+    def sample(self, rng: np.random.Generator) -> Dict[str, Any]:
+        return {name: dist.sample(rng) if isinstance(dist, Distribution) else dist
+                for name, dist in self.params.items()}
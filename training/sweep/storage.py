@@ -0,0 +1,102 @@
+import json
+import sqlite3
+import time
+from typing import Dict, Any, List, Optional
+
+# 试验状态
+TRIAL_RUNNING = "running"
+TRIAL_COMPLETE = "complete"
+TRIAL_PRUNED = "pruned"
+TRIAL_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trials (
+    trial_id    INTEGER PRIMARY KEY AUTOINCREMENT,
+    sweep       TEXT NOT NULL,
+    params      TEXT NOT NULL,
+    state       TEXT NOT NULL,
+    value       REAL,
+    endpoint    TEXT,
+    cores       TEXT,
+    error       TEXT,
+    started_at  REAL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS intermediate (
+    trial_id INTEGER NOT NULL,
+    step     INTEGER NOT NULL,
+    value    REAL NOT NULL,
+    PRIMARY KEY (trial_id, step)
+);
+CREATE INDEX IF NOT EXISTS intermediate_step ON intermediate (step);
+"""
+
+
+class SweepStorage:
+    """
+    试验结果的本地 sqlite 存储
+
+    只由编排进程写入（试验子进程通过队列上报），不需要跨进程加锁
+    """
+
+    def __init__(self, path: str = "sweeps.db", sweep: str = "default"):
+        self.path = path
+        self.sweep = sweep
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(_SCHEMA)
+        self.conn.commit()
+
+    def create_trial(self, params: Dict[str, Any], endpoint: str = None, cores=None) -> int:
+        cur = self.conn.execute(
+            "INSERT INTO trials (sweep, params, state, endpoint, cores, started_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (self.sweep, json.dumps(params), TRIAL_RUNNING, endpoint, json.dumps(cores), time.time()))
+        self.conn.commit()
+        return cur.lastrowid
+
+    def report(self, trial_id: int, step: int, value: float):
+        """记录中间结果"""
+        self.conn.execute("INSERT OR REPLACE INTO intermediate (trial_id, step, value) VALUES (?, ?, ?)",
+                          (trial_id, step, value))
+        self.conn.commit()
+
+    def finish(self, trial_id: int, state: str, value: Optional[float] = None, error: Optional[str] = None):
+        """结束试验；value 为 None 时取最后一次中间结果"""
+        if value is None:
+            row = self.conn.execute("SELECT value FROM intermediate WHERE trial_id = ? ORDER BY step DESC LIMIT 1",
+                                    (trial_id,)).fetchone()
+            value = row[0] if row else None
+        self.conn.execute("UPDATE trials SET state = ?, value = ?, error = ?, finished_at = ? WHERE trial_id = ?",
+                          (state, value, error, time.time(), trial_id))
+        self.conn.commit()
+
+    def values_at_step(self, step: int, exclude_trial: Optional[int] = None) -> List[float]:
+        """本次扫描中所有试验在指定步的中间结果"""
+        rows = self.conn.execute(
+            "SELECT i.value FROM intermediate i JOIN trials t ON t.trial_id = i.trial_id "
+            "WHERE t.sweep = ? AND i.step = ? AND i.trial_id != ?",
+            (self.sweep, step, -1 if exclude_trial is None else exclude_trial)).fetchall()
+        return [r[0] for r in rows]
+
+    def trials(self, state: Optional[str] = None) -> List[Dict[str, Any]]:
+        query = "SELECT trial_id, params, state, value, endpoint, error, started_at, finished_at FROM trials WHERE sweep = ?"
+        args = [self.sweep]
+        if state is not None:
+            query += " AND state = ?"
+            args.append(state)
+        keys = ("trial_id", "params", "state", "value", "endpoint", "error", "started_at", "finished_at")
+        result = []
+        for row in self.conn.execute(query + " ORDER BY trial_id", args):
+            trial = dict(zip(keys, row))
+            trial["params"] = json.loads(trial["params"])
+            result.append(trial)
+        return result
+
+    def best_trial(self, direction: str = "maximize") -> Optional[Dict[str, Any]]:
+        """已完成试验中目标值最好的一个"""
+        done = [t for t in self.trials(TRIAL_COMPLETE) if t["value"] is not None]
+        if not done:
+            return None
+        return (max if direction == "maximize" else min)(done, key=lambda t: t["value"])
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,235 @@
+import time
+from typing import Dict, Iterable, Optional
+
+
+# step 内各阶段的默认名称，顺序即输出顺序
+STEP_STAGES = (
+    "action_convert",  # 动作转换
+    "send",            # 发送请求
+    "receive",         # 接收回包
+    "decode",          # 反序列化
+    "feature",         # 特征提取 / 观测处理
+    "reward",          # 奖励计算
+    "termination",     # 终止判断
+    "visualization",   # 可视化 / ACMI
+)
+
+
+class LatencyHistogram:
+    """
+    HDR风格的对数分桶直方图，单位微秒
+
+    每个2的幂区间再线性切分为 2^(sub_bucket_bits-1) 个子桶，
+    相对误差约为 1/2^(sub_bucket_bits-1)，记录一次只需一次整数运算和一次列表自增
+    """
+
+    def __init__(self, highest_us: int = 60_000_000, sub_bucket_bits: int = 7):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.sub_bucket_count = 1 << sub_bucket_bits
+        self.sub_bucket_half = self.sub_bucket_count >> 1
+        self.highest_us = highest_us
+        self.counts = [0] * (self._index_of(highest_us) + 1)
+        self.total_count = 0
+        self.total_us = 0
+        self.min_us = None
+        self.max_us = 0
+
+    def _index_of(self, value: int) -> int:
+        """数值 -> 桶下标"""
+        if value < self.sub_bucket_count:
+            return value
+        shift = value.bit_length() - self.sub_bucket_bits
+        return self.sub_bucket_count + (shift - 1) * self.sub_bucket_half + ((value >> shift) - self.sub_bucket_half)
+
+    def _value_of(self, index: int) -> int:
+        """桶下标 -> 桶内代表值（取桶中点）"""
+        if index < self.sub_bucket_count:
+            return index
+        offset = index - self.sub_bucket_count
+        shift = offset // self.sub_bucket_half + 1
+        top = offset % self.sub_bucket_half + self.sub_bucket_half
+        return (top << shift) + ((1 << shift) >> 1)
+
+    def record(self, value_us: int):
+        """记录一个耗时样本（微秒），超出上限的样本计入最高桶"""
+        if value_us < 0:
+            value_us = 0
+        elif value_us > self.highest_us:
+            value_us = self.highest_us
+        self.counts[self._index_of(value_us)] += 1
+        self.total_count += 1
+        self.total_us += value_us
+        if self.min_us is None or value_us < self.min_us:
+            self.min_us = value_us
+        if value_us > self.max_us:
+            self.max_us = value_us
+
+    def percentile(self, p: float) -> float:
+        """返回第p百分位的耗时（微秒），p取值[0, 100]"""
+        if self.total_count == 0:
+            return 0.0
+        rank = max(1, int(round(p / 100.0 * self.total_count)))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count:
+                seen += count
+                if seen >= rank:
+                    return float(min(self._value_of(index), self.max_us))
+        return float(self.max_us)
+
+    def mean(self) -> float:
+        return self.total_us / self.total_count if self.total_count else 0.0
+
+    def reset(self):
+        self.counts = [0] * len(self.counts)
+        self.total_count = 0
+        self.total_us = 0
+        self.min_us = None
+        self.max_us = 0
+
+
+class _StageTimer:
+    """单个阶段的计时上下文，每个阶段预先创建一个并复用，避免每步分配对象"""
+
+    __slots__ = ("profiler", "name", "start_ns")
+
+    def __init__(self, profiler, name: str):
+        self.profiler = profiler
+        self.name = name
+        self.start_ns = 0
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.profiler.record_ns(self.name, time.perf_counter_ns() - self.start_ns)
+        return False
+
+
+class _NullTimer:
+    """关闭计时时返回的空上下文"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class LatencyProfiler:
+    """
+    step 分阶段耗时统计
+
+    用法:
+        with profiler.stage("send"):
+            sock.sendall(...)
+
+    enabled=False 时 stage() 直接返回共享的空上下文，record_ns() 立即返回，不做任何计时
+    """
+
+    def __init__(self, enabled: bool = True, stages: Iterable[str] = STEP_STAGES):
+        self.enabled = enabled
+        self.stages = list(stages)
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._timers: Dict[str, _StageTimer] = {}
+        self._last_step_ns: Dict[str, int] = {}
+        self._step_start_ns = 0
+        for name in self.stages:
+            self._add_stage(name)
+        self._add_stage("step_total")
+
+    def _add_stage(self, name: str):
+        self.histograms[name] = LatencyHistogram()
+        self._timers[name] = _StageTimer(self, name)
+        self._last_step_ns[name] = 0
+
+    def stage(self, name: str):
+        """返回指定阶段的计时上下文"""
+        if not self.enabled:
+            return _NULL_TIMER
+        timer = self._timers.get(name)
+        if timer is None:
+            self.stages.append(name)
+            self._add_stage(name)
+            timer = self._timers[name]
+        return timer
+
+    def record_ns(self, name: str, elapsed_ns: int):
+        """记录一个阶段的耗时（纳秒），同一步内多次进入同一阶段时累加"""
+        if not self.enabled:
+            return
+        if name not in self.histograms:
+            self.stages.append(name)
+            self._add_stage(name)
+        self._last_step_ns[name] += elapsed_ns
+
+    def begin_step(self):
+        """开始新的一步，清空上一步的阶段累计值"""
+        if not self.enabled:
+            return
+        for name in self._last_step_ns:
+            self._last_step_ns[name] = 0
+        self._step_start_ns = time.perf_counter_ns()
+
+    def end_step(self):
+        """结束当前步，将各阶段累计值写入直方图"""
+        if not self.enabled:
+            return
+        self._last_step_ns["step_total"] = time.perf_counter_ns() - self._step_start_ns
+        for name, elapsed_ns in self._last_step_ns.items():
+            if elapsed_ns:
+                self.histograms[name].record(elapsed_ns // 1000)
+
+    def last_step(self) -> Dict[str, float]:
+        """上一步各阶段耗时（毫秒），用于写入info"""
+        return {name: elapsed_ns / 1e6 for name, elapsed_ns in self._last_step_ns.items()}
+
+    def last_ms(self, name: str) -> float:
+        """上一步某个阶段的耗时（毫秒）"""
+        return self._last_step_ns.get(name, 0) / 1e6
+
+    def summary(self, percentiles=(50, 90, 99)) -> Dict[str, Dict[str, float]]:
+        """各阶段统计摘要（毫秒）"""
+        result = {}
+        for name, hist in self.histograms.items():
+            if hist.total_count == 0:
+                continue
+            stats = {f"p{p}": hist.percentile(p) / 1000.0 for p in percentiles}
+            stats["mean"] = hist.mean() / 1000.0
+            stats["max"] = hist.max_us / 1000.0
+            stats["count"] = hist.total_count
+            result[name] = stats
+        return result
+
+    def reset(self):
+        for hist in self.histograms.values():
+            hist.reset()
+
+    def to_prometheus(self, metric: str = "afsim_step_stage_seconds",
+                      labels: Optional[Dict[str, str]] = None,
+                      quantiles=(0.5, 0.9, 0.99), header: bool = True) -> str:
+        """按Prometheus文本格式导出为summary类型指标，多个profiler拼接时只有第一个带header"""
+        extra = "".join(f',{k}="{v}"' for k, v in (labels or {}).items())
+        lines = []
+        if header:
+            lines.append(f"# HELP {metric} Per-stage latency of env.step in seconds.")
+            lines.append(f"# TYPE {metric} summary")
+        for name, hist in self.histograms.items():
+            if hist.total_count == 0:
+                continue
+            for q in quantiles:
+                value = hist.percentile(q * 100) / 1e6
+                lines.append(f'{metric}{{stage="{name}"{extra},quantile="{q}"}} {value:.9f}')
+            lines.append(f'{metric}_sum{{stage="{name}"{extra}}} {hist.total_us / 1e6:.9f}')
+            lines.append(f'{metric}_count{{stage="{name}"{extra}}} {hist.total_count}')
+        return "\n".join(lines) + "\n"
+
+
+# 关闭状态的共享实例，作为各客户端/环境的默认值
+NULL_PROFILER = LatencyProfiler(enabled=False, stages=())
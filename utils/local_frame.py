@@ -0,0 +1,184 @@
+"""
+回合内固定中心点的本地切平面坐标系
+
+与 RAMathUtil 中按点调用的转换函数结果一致，但中心点的三角函数和旋转矩阵只在构造时计算一次：
+
+    frame = LocalTangentFrame(target)                 # 回合开始时构造
+    x, y = frame.to_local_xy(plane)                   # 等价于 RAMathUtil.convert_lat_long_to_xy(plane, target)
+    xyz = frame.to_local(lat, lon, alt)               # 批量，一次矩阵乘法
+    target = frame.offset_to_geodetic(dx, dy, dz)     # 等价于 RAMathUtil.convert_xy_to_lat_long(center, dx, dy, dz)
+
+正向转换是以中心点为切点的球面心射（gnomonic）投影：把点的单位球面矢量旋转到中心点的东-北-天坐标系 (e, n, u)，
+x = r·e/u, y = r·n/u。to_geodetic 是它的严格逆变换；offset_to_geodetic 则与 convert_xy_to_lat_long 相同，
+按方位角和大圆距离（等距方位投影）计算，两者在几十公里内相差不到米级
+"""
+import math
+from typing import Dict, Any, Iterable, Tuple, Union
+
+import numpy as np
+
+from utils.tools import RAMathUtil
+
+EARTH_RADIUS = 6371000  # 与 RAMathUtil 一致（米）
+
+ArrayLike = Union[float, np.ndarray]
+
+
+class LocalTangentFrame:
+    """以 center 为原点的本地切平面坐标系，ENU（x 东 y 北 z 上）或 NED（x 北 y 东 z 下）"""
+
+    def __init__(self, center: Dict[str, Any], ned: bool = False, radius: float = EARTH_RADIUS):
+        """
+        Args:
+            center: 中心点 {'lat', 'lon'[, 'alt']}（度、米）
+            ned: True 时输出北-东-地坐标
+            radius: 地球半径（米）
+        """
+        self.center = {"lat": center["lat"], "lon": center["lon"], "alt": center.get("alt", 0.0)}
+        self.ned = ned
+        self.radius = radius
+
+        # 正向投影与 convert_lat_long_to_xy 使用相同的角度换算常数，保证结果逐位接近
+        lat0 = RAMathUtil.Deg2Rad(center["lat"])
+        lon0 = RAMathUtil.Deg2Rad(center["lon"])
+        self._lon0 = lon0
+        self._sin_lat0, self._cos_lat0 = math.sin(lat0), math.cos(lat0)
+        self._sin_lon0, self._cos_lon0 = math.sin(lon0), math.cos(lon0)
+        # 地心坐标 → 东/北/天 的旋转矩阵（行向量为 e, n, u）
+        self.rotation = np.array([
+            [-self._sin_lon0, self._cos_lon0, 0.0],
+            [-self._sin_lat0 * self._cos_lon0, -self._sin_lat0 * self._sin_lon0, self._cos_lat0],
+            [self._cos_lat0 * self._cos_lon0, self._cos_lat0 * self._sin_lon0, self._sin_lat0],
+        ])
+
+        # 逆向（等距方位）与 convert_xy_to_lat_long 一致，使用 math.radians
+        inverse_lat0 = math.radians(center["lat"])
+        self._inverse_lon0 = math.radians(center["lon"])
+        self._inverse_sin_lat0, self._inverse_cos_lat0 = math.sin(inverse_lat0), math.cos(inverse_lat0)
+
+    # ---------- 经纬度 → 本地 ----------
+    def to_local_xy(self, point: Dict[str, Any]) -> Tuple[float, float]:
+        """
+        单点水平坐标 (x 东, y 北)，等价于 RAMathUtil.convert_lat_long_to_xy(point, center)；
+        NED 时返回 (北, 东)
+        """
+        lat = RAMathUtil.Deg2Rad(point["lat"])
+        delta_lon = RAMathUtil.Deg2Rad(point["lon"]) - self._lon0
+        cos_lat, sin_lat = math.cos(lat), math.sin(lat)
+        cos_delta_lon = math.cos(delta_lon)
+        tmp = sin_lat * self._sin_lat0 + cos_lat * self._cos_lat0 * cos_delta_lon
+        x = self.radius * cos_lat * math.sin(delta_lon) / tmp
+        y = self.radius * (sin_lat * self._cos_lat0 - cos_lat * self._sin_lat0 * cos_delta_lon) / tmp
+        return (y, x) if self.ned else (x, y)
+
+    def to_local(self, lat: ArrayLike, lon: ArrayLike, alt: ArrayLike = None) -> np.ndarray:
+        """
+        批量转换
+
+        Args:
+            lat / lon: 纬度、经度（度），标量或 (N,) 数组
+            alt: 高度（米），None 时 z 为 0
+
+        Returns:
+            (N, 3) 本地坐标，z 为相对中心点的高度
+        """
+        lat = RAMathUtil.Deg2Rad(np.atleast_1d(np.asarray(lat, dtype=np.float64)))
+        lon = RAMathUtil.Deg2Rad(np.atleast_1d(np.asarray(lon, dtype=np.float64)))
+        cos_lat = np.cos(lat)
+        unit = np.stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)], axis=-1)
+        enu = unit @ self.rotation.T
+        out = np.empty_like(enu)
+        scale = self.radius / enu[:, 2]
+        out[:, 0] = enu[:, 0] * scale
+        out[:, 1] = enu[:, 1] * scale
+        out[:, 2] = 0.0 if alt is None else np.asarray(alt, dtype=np.float64) - self.center["alt"]
+        if self.ned:
+            out[:, [0, 1]] = out[:, [1, 0]]
+            out[:, 2] *= -1.0
+        return out
+
+    def platforms_to_local(self, platforms: Iterable[Dict[str, Any]]) -> np.ndarray:
+        """观测帧中的平台列表转换为 (N, 3) 本地坐标"""
+        rows = np.array([(p["lat"], p["lon"], p.get("alt", 0.0)) for p in platforms], dtype=np.float64).reshape(-1, 3)
+        return self.to_local(rows[:, 0], rows[:, 1], rows[:, 2])
+
+    # ---------- 本地 → 经纬度 ----------
+    def to_geodetic(self, x: ArrayLike, y: ArrayLike, z: ArrayLike = 0.0) -> Dict[str, ArrayLike]:
+        """
+        to_local / to_local_xy 的严格逆变换
+
+        Returns:
+            {'lat', 'lon', 'alt'}，输入为数组时各值为数组
+        """
+        if self.ned:
+            x, y, z = y, x, -np.asarray(z)
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        # 切平面上的点 (x, y, r) 旋转回地心坐标后归一化即为球面方向
+        local = np.stack(np.broadcast_arrays(x / self.radius, y / self.radius, np.ones_like(x)), axis=-1)
+        direction = local @ self.rotation
+        direction /= np.linalg.norm(direction, axis=-1, keepdims=True)
+        lat = np.arcsin(direction[..., 2]) / RAMathUtil.Deg2Rad(1.0)
+        lon = np.arctan2(direction[..., 1], direction[..., 0]) / RAMathUtil.Deg2Rad(1.0)
+        alt = self.center["alt"] + np.asarray(z, dtype=np.float64)
+        if lat.ndim == 0:
+            return {"lat": float(lat), "lon": float(lon), "alt": float(alt)}
+        return {"lat": lat, "lon": lon, "alt": alt}
+
+    def offset_to_geodetic(self, delta_x: float, delta_y: float, delta_z: float = 0.0) -> Dict[str, float]:
+        """
+        按东向/北向偏移（米）沿大圆求目标点，等价于 RAMathUtil.convert_xy_to_lat_long(center, dx, dy, dz)
+        """
+        alt = self.center["alt"] + delta_z
+        d = math.sqrt(delta_x ** 2 + delta_y ** 2)
+        if d == 0:
+            return {"lat": self.center["lat"], "lon": self.center["lon"], "alt": alt}
+        azimuth = math.atan2(delta_x, delta_y)
+        angular_distance = d / self.radius
+        sin_ad, cos_ad = math.sin(angular_distance), math.cos(angular_distance)
+        lat = math.asin(self._inverse_sin_lat0 * cos_ad + self._inverse_cos_lat0 * sin_ad * math.cos(azimuth))
+        lon = self._inverse_lon0 + math.atan2(math.sin(azimuth) * sin_ad * self._inverse_cos_lat0,
+                                              cos_ad - self._inverse_sin_lat0 * math.sin(lat))
+        return {"lat": math.degrees(lat), "lon": (math.degrees(lon) + 180) % 360 - 180, "alt": alt}
+
+
+if __name__ == "__main__":
+    # 与 RAMathUtil 的逐点转换对比精度和耗时
+    import timeit
+
+    rng = np.random.default_rng(0)
+    center = {"lat": 24.5, "lon": 120.8, "alt": 5000.0}
+    frame = LocalTangentFrame(center)
+    n = 1000
+    points = [{"lat": center["lat"] + d_lat, "lon": center["lon"] + d_lon, "alt": alt}
+              for d_lat, d_lon, alt in zip(rng.uniform(-0.5, 0.5, n), rng.uniform(-0.5, 0.5, n),
+                                           rng.uniform(1000, 12000, n))]
+
+    reference = np.array([RAMathUtil.convert_lat_long_to_xy(p, center) for p in points])
+    scalar = np.array([frame.to_local_xy(p) for p in points])
+    batch = frame.platforms_to_local(points)
+    print(f"正向 单点最大误差 {np.abs(scalar - reference).max():.3e} m，批量最大误差 {np.abs(batch[:, :2] - reference).max():.3e} m")
+
+    inverse = frame.to_geodetic(batch[:, 0], batch[:, 1], batch[:, 2])
+    lat_error = np.abs(inverse["lat"] - [p["lat"] for p in points]).max()
+    lon_error = np.abs(inverse["lon"] - [p["lon"] for p in points]).max()
+    print(f"逆向 纬度最大误差 {lat_error:.3e}°，经度最大误差 {lon_error:.3e}°")
+
+    offsets = rng.uniform(-20000, 20000, (n, 3))
+    offset_error = max(abs(frame.offset_to_geodetic(*o)[k] - RAMathUtil.convert_xy_to_lat_long(center, *o)[k])
+                       for o in offsets for k in ("lat", "lon", "alt"))
+    print(f"偏移求点 最大误差 {offset_error:.3e}")
+
+    ned_frame = LocalTangentFrame(center, ned=True)
+    ned = ned_frame.platforms_to_local(points)
+    assert np.allclose(ned_frame.to_geodetic(ned[:, 0], ned[:, 1], ned[:, 2])["alt"], inverse["alt"])
+    assert np.allclose(ned[:, 0], batch[:, 1]) and np.allclose(ned[:, 1], batch[:, 0]) and np.allclose(ned[:, 2], -batch[:, 2])
+    assert np.abs(scalar - reference).max() < 1e-6 and np.abs(batch[:, :2] - reference).max() < 1e-6
+    assert lat_error < 1e-9 and lon_error < 1e-9 and offset_error < 1e-9
+
+    number = 20
+    t_ref = timeit.timeit(lambda: [RAMathUtil.convert_lat_long_to_xy(p, center) for p in points], number=number)
+    t_scalar = timeit.timeit(lambda: [frame.to_local_xy(p) for p in points], number=number)
+    t_batch = timeit.timeit(lambda: frame.platforms_to_local(points), number=number)
+    print(f"{n} 点: 逐点 RAMathUtil {t_ref / number * 1e3:.2f} ms，"
+          f"逐点 to_local_xy {t_scalar / number * 1e3:.2f} ms，批量 {t_batch / number * 1e3:.2f} ms")
@@ -0,0 +1,245 @@
+import os
+import queue
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # parquet 为可选输出格式
+    pa = None
+    pq = None
+
+
+class ColumnarBuffer:
+    """
+    预分配的列式缓冲区
+
+    数据按列连续存放在一个 (列数, 容量) 的 float64 数组中，追加一行只是一次切片赋值，
+    不产生新的 Python 对象
+    """
+
+    def __init__(self, columns: Sequence[str], capacity: int):
+        self.columns = list(columns)
+        self.index = {name: i for i, name in enumerate(self.columns)}
+        self.capacity = capacity
+        self.data = np.full((len(self.columns), capacity), np.nan, dtype=np.float64)
+        self.size = 0
+
+    def append(self, values: Sequence[float]):
+        """按列顺序追加一行"""
+        self.data[:, self.size] = values
+        self.size += 1
+
+    def append_mapping(self, values: Dict[str, float]):
+        """按列名追加一行，缺失的列记为 NaN"""
+        col = self.data[:, self.size]
+        col[:] = np.nan
+        for name, value in values.items():
+            i = self.index.get(name)
+            if i is not None:
+                col[i] = value
+        self.size += 1
+
+    def full(self) -> bool:
+        return self.size >= self.capacity
+
+    def view(self) -> np.ndarray:
+        """已写入部分的视图，形状 (列数, 行数)"""
+        return self.data[:, :self.size]
+
+    def clear(self):
+        self.size = 0
+
+
+class _ColumnarSink:
+    """单张表的写出端，CSV 追加写，Parquet 每批写一个 row group"""
+
+    def __init__(self, path: str, columns: List[str], fmt: str):
+        self.path = path
+        self.columns = columns
+        self.fmt = fmt
+        self._writer = None
+        if fmt == "csv":
+            self._file = open(path, "w", encoding="utf-8")
+            self._file.write(",".join(columns) + "\n")
+        elif fmt == "parquet":
+            if pq is None:
+                raise ImportError("写出 parquet 需要安装 pyarrow")
+            self._schema = pa.schema([(name, pa.float64()) for name in columns])
+            self._writer = pq.ParquetWriter(path, self._schema)
+        else:
+            raise ValueError(f"不支持的格式: {fmt}")
+
+    def write(self, block: np.ndarray):
+        if self.fmt == "csv":
+            np.savetxt(self._file, block.T, delimiter=",", fmt="%.10g")
+            self._file.flush()
+        else:
+            table = pa.Table.from_arrays([pa.array(col) for col in block], schema=self._schema)
+            self._writer.write_table(table)
+
+    def close(self):
+        if self.fmt == "csv":
+            self._file.close()
+        elif self._writer is not None:
+            self._writer.close()
+
+
+class MetricsLogger:
+    """
+    回合/单步标量指标的列式记录器
+
+    训练线程只向预分配缓冲区写数，缓冲区写满后整块交给后台线程落盘并换上空闲缓冲区，
+    单步记录没有内存分配，也没有标准输出 I/O
+
+    用法:
+        logger = MetricsLogger("logs/metrics", step_columns=[...], episode_columns=[...])
+        logger.log_step([...])
+        logger.log_episode([...])
+        logger.close()
+    """
+
+    def __init__(self,
+                 output_dir: str,
+                 step_columns: Sequence[str],
+                 episode_columns: Sequence[str],
+                 capacity: int = 4096,
+                 fmt: str = "csv",
+                 spare_buffers: int = 2):
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.fmt = fmt
+        ext = "csv" if fmt == "csv" else "parquet"
+        self._tables = {}
+        for table, columns in (("steps", step_columns), ("episodes", episode_columns)):
+            columns = list(columns)
+            # 每张表：当前缓冲区 + 空闲缓冲区池，写满后轮换
+            pool = queue.Queue()
+            for _ in range(spare_buffers):
+                pool.put(ColumnarBuffer(columns, capacity))
+            self._tables[table] = {
+                "current": ColumnarBuffer(columns, capacity),
+                "pool": pool,
+                "sink": _ColumnarSink(os.path.join(output_dir, f"{table}.{ext}"), columns, fmt),
+            }
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="metrics-flush", daemon=True)
+        self._worker.start()
+        self._closed = False
+
+    # ---------- 训练线程侧 ----------
+    def log_step(self, values: Sequence[float]):
+        self._append("steps", values)
+
+    def log_step_mapping(self, values: Dict[str, float]):
+        table = self._tables["steps"]
+        table["current"].append_mapping(values)
+        if table["current"].full():
+            self._hand_off("steps")
+
+    def log_episode(self, values: Sequence[float]):
+        self._append("episodes", values)
+
+    def _append(self, name: str, values: Sequence[float]):
+        table = self._tables[name]
+        table["current"].append(values)
+        if table["current"].full():
+            self._hand_off(name)
+
+    def _hand_off(self, name: str):
+        """把写满的缓冲区交给后台线程，从池中取一个空闲缓冲区继续写（池空时等待落盘完成）"""
+        table = self._tables[name]
+        self._queue.put((name, table["current"]))
+        table["current"] = table["pool"].get()
+
+    def flush(self):
+        """把当前未满的缓冲区也交给后台线程，并等待全部落盘"""
+        for name, table in self._tables.items():
+            if table["current"].size:
+                self._hand_off(name)
+        self._queue.join()
+
+    def close(self):
+        if self._closed:
+            return
+        self.flush()
+        self._queue.put(None)
+        self._worker.join()
+        for table in self._tables.values():
+            table["sink"].close()
+        self._closed = True
+
+    # ---------- 后台线程侧 ----------
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            name, buffer = item
+            try:
+                self._tables[name]["sink"].write(buffer.view())
+            except Exception as e:
+                print(f"× 指标写出失败: {e}")
+            finally:
+                buffer.clear()
+                self._tables[name]["pool"].put(buffer)
+                self._queue.task_done()
+
+
+def read_metrics(path: str) -> Dict[str, np.ndarray]:
+    """读取 MetricsLogger 写出的 csv / parquet 文件，返回 {列名: 数组}"""
+    if path.endswith(".parquet"):
+        if pq is None:
+            raise ImportError("读取 parquet 需要安装 pyarrow")
+        table = pq.read_table(path)
+        return {name: table.column(name).to_numpy() for name in table.column_names}
+    with open(path, "r", encoding="utf-8") as f:
+        columns = f.readline().strip().split(",")
+    data = np.loadtxt(path, delimiter=",", skiprows=1, ndmin=2)
+    return {name: data[:, i] for i, name in enumerate(columns)}
+
+
+_AGGREGATES = {
+    "mean": np.nanmean,
+    "sum": np.nansum,
+    "min": np.nanmin,
+    "max": np.nanmax,
+    "std": np.nanstd,
+    "count": lambda x: float(np.count_nonzero(~np.isnan(x))),
+}
+
+
+def aggregate(metrics: Dict[str, np.ndarray], column: str, how: str = "mean",
+              by: Optional[str] = None, window: Optional[int] = None):
+    """
+    对指标列做聚合查询
+
+    Args:
+        metrics: read_metrics 的返回值
+        column: 被聚合的列
+        how: mean / sum / min / max / std / count
+        by: 分组列（如 episode），None 表示整体聚合
+        window: 只取最后 window 行
+
+    Returns:
+        by 为 None 时返回标量，否则返回 (分组键数组, 聚合值数组)
+    """
+    fn = _AGGREGATES[how]
+    values = metrics[column]
+    keys = metrics[by] if by is not None else None
+    if window is not None:
+        values = values[-window:]
+        keys = keys[-window:] if keys is not None else None
+    if keys is None:
+        return float(fn(values))
+    # 按分组键排序后切段，每组一次 reduce
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    sorted_values = values[order]
+    unique_keys, starts = np.unique(sorted_keys, return_index=True)
+    groups = np.split(sorted_values, starts[1:])
+    return unique_keys, np.array([fn(g) for g in groups])
@@ -0,0 +1,87 @@
+import hashlib
+from typing import List, Optional, Sequence, Callable
+
+import numpy as np
+
+
+def derive_seeds(seed: Optional[int], count: int) -> List[int]:
+    """
+    由一个主种子派生出 count 个互不相关的子种子
+    相同主种子得到相同序列，用于给各环境 / 服务端各环境分配独立随机数流
+    """
+    children = np.random.SeedSequence(seed).spawn(count)
+    return [int(child.generate_state(1, dtype=np.uint32)[0]) for child in children]
+
+
+class ObservationHasher:
+    """
+    观测流哈希，用于快速比较两次运行是否逐位一致
+
+    每步将观测向量的原始字节与奖励写入 blake2b，record_steps=True 时同时保存每步的累计摘要，
+    便于定位首个出现分歧的步数
+    """
+
+    def __init__(self, record_steps: bool = False):
+        self.record_steps = record_steps
+        self.reset()
+
+    def reset(self):
+        self._hash = hashlib.blake2b(digest_size=16)
+        self.step_digests: List[str] = []
+        self.steps = 0
+
+    def update(self, state: np.ndarray, reward: float = 0.0):
+        self._hash.update(np.ascontiguousarray(state, dtype=np.float64).tobytes())
+        self._hash.update(np.float64(reward).tobytes())
+        self.steps += 1
+        if self.record_steps:
+            self.step_digests.append(self._hash.hexdigest())
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+def first_divergence(digests_a: Sequence[str], digests_b: Sequence[str]) -> int:
+    """返回两串逐步摘要第一次不同的步数，完全一致时返回 -1"""
+    for i, (a, b) in enumerate(zip(digests_a, digests_b)):
+        if a != b:
+            return i
+    if len(digests_a) != len(digests_b):
+        return min(len(digests_a), len(digests_b))
+    return -1
+
+
+def rollout_digest(env, actions: Sequence[np.ndarray], seed: int) -> ObservationHasher:
+    """以给定种子重置环境并执行固定动作序列，返回记录了逐步摘要的哈希器"""
+    hasher = ObservationHasher(record_steps=True)
+    state, _ = env.reset(seed=seed)
+    hasher.update(state)
+    for action in actions:
+        state, reward, terminated, truncated, _ = env.step(action)
+        hasher.update(state, reward)
+        if terminated or truncated:
+            break
+    return hasher
+
+
+def verify_reproducibility(make_env: Callable, actions: Sequence[np.ndarray], seed: int = 0, runs: int = 2) -> bool:
+    """
+    用同一种子和动作序列运行多次，比较观测流是否逐位一致
+    可用于确认批处理、二进制编码等吞吐优化没有悄悄改变动力学
+    """
+    reference = None
+    for run in range(runs):
+        env = make_env()
+        try:
+            hasher = rollout_digest(env, actions, seed)
+        finally:
+            env.close()
+        if reference is None:
+            reference = hasher
+            continue
+        step = first_divergence(reference.step_digests, hasher.step_digests)
+        if step >= 0:
+            print(f"❌ 第 {run} 次运行在第 {step} 步与第 0 次运行出现分歧")
+            return False
+    print(f"✅ {runs} 次运行观测流一致，摘要: {reference.hexdigest()}")
+    return True
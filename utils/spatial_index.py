@@ -0,0 +1,225 @@
+"""
+平台位置的空间索引：本地 ENU 坐标（米）下按水平方向划分均匀网格，回答半径查询和 k 近邻查询
+
+    index = SpatialGrid(cell_size=10000)
+    index.build(positions)                       # (N, 3)，每步重建 O(N log N)
+    index.query_radius((x, y, z), 10000)         # 半径内的下标
+    index.query_knn((x, y, z), 4)                # 最近的 4 个 (下标, 距离)
+    index.query_nearest_batch(points)            # 每个查询点的最近邻 (下标, 距离)
+    index.query_pairs(10000)                     # 距离小于 10km 的所有 (i, j), i < j
+
+网格只划分水平面（空战场景高度跨度远小于水平跨度），距离按三维计算。
+批量查询全部向量化：对每个查询点枚举邻近网格，用 searchsorted 在按网格排序的点中定位区间，
+展开成候选对后一次性计算距离，代价与候选数成正比，而不是 O(N²)
+"""
+from typing import Dict, Any, Iterable, Sequence, Tuple
+
+import numpy as np
+
+# 网格坐标编码为一个 int64 键
+_KEY_OFFSET = 1 << 20
+_KEY_STRIDE = 1 << 21
+
+
+def positions_from_entities(entities: Iterable[Dict[str, Any]]) -> np.ndarray:
+    """实体列表中的 position {"X", "Y", "Z"} 转换为 (N, 3) 数组"""
+    rows = [(p.get("X", 0.0), p.get("Y", 0.0), p.get("Z", 0.0))
+            for p in (e.get("position", {}) for e in entities)]
+    return np.array(rows, dtype=np.float64).reshape(-1, 3)
+
+
+class SpatialGrid:
+    """均匀网格空间索引"""
+
+    def __init__(self, cell_size: float = 10000.0):
+        """
+        Args:
+            cell_size: 网格边长（米），取常用查询半径附近的值效果最好
+        """
+        self.cell_size = float(cell_size)
+        self.positions = np.zeros((0, 3), dtype=np.float64)
+        self._order = np.zeros(0, dtype=np.int64)
+        self._cell_keys = np.zeros(0, dtype=np.int64)
+        self._starts = np.zeros(0, dtype=np.int64)
+        self._ends = np.zeros(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def _cells(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        cells = np.floor(points[:, :2] / self.cell_size).astype(np.int64)
+        return cells[:, 0], cells[:, 1]
+
+    @staticmethod
+    def _key(cx: np.ndarray, cy: np.ndarray) -> np.ndarray:
+        return (cx + _KEY_OFFSET) * _KEY_STRIDE + (cy + _KEY_OFFSET)
+
+    def build(self, positions: np.ndarray) -> "SpatialGrid":
+        """按新位置重建索引"""
+        self.positions = np.ascontiguousarray(positions, dtype=np.float64).reshape(-1, 3)
+        keys = self._key(*self._cells(self.positions))
+        # 上一步的顺序作为初始顺序，位置变化不大时近乎有序，稳定排序更快
+        if len(self._order) == len(keys):
+            order = self._order[np.argsort(keys[self._order], kind="stable")]
+        else:
+            order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        self._order = order
+        self._cell_keys, self._starts = np.unique(sorted_keys, return_index=True)
+        self._ends = np.append(self._starts[1:], len(sorted_keys))
+        return self
+
+    update = build
+
+    # ---------- 候选 ----------
+    def _candidates(self, points: np.ndarray, radius: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        枚举每个查询点邻近网格中的所有点
+
+        Returns:
+            (查询点下标, 索引点下标)，两个等长数组
+        """
+        reach = int(np.ceil(radius / self.cell_size))
+        cx, cy = self._cells(points)
+        offsets = np.arange(-reach, reach + 1)
+        ox, oy = np.meshgrid(offsets, offsets, indexing="ij")
+        # (Q, C) 个邻近网格键
+        keys = self._key(cx[:, None] + ox.ravel(), cy[:, None] + oy.ravel())
+        slots = np.searchsorted(self._cell_keys, keys)
+        slots = np.minimum(slots, len(self._cell_keys) - 1)
+        hit = self._cell_keys[slots] == keys
+        query = np.broadcast_to(np.arange(len(points))[:, None], keys.shape)[hit]
+        starts = self._starts[slots[hit]]
+        counts = self._ends[slots[hit]] - starts
+        # 把每个 [start, end) 区间展开成连续下标
+        total = int(counts.sum())
+        query = np.repeat(query, counts)
+        within = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        return query, self._order[np.repeat(starts, counts) + within]
+
+    # ---------- 查询 ----------
+    def query_radius_batch(self, points: np.ndarray, radius: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        批量半径查询
+
+        Returns:
+            (查询点下标, 索引点下标, 距离)，按查询点分组
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        if len(self.positions) == 0 or len(points) == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0)
+        query, index = self._candidates(points, radius)
+        delta = self.positions[index] - points[query]
+        distance = np.sqrt(np.einsum("ij,ij->i", delta, delta))
+        keep = distance <= radius
+        return query[keep], index[keep], distance[keep]
+
+    def query_radius(self, point: Sequence[float], radius: float, return_distance: bool = False):
+        """单点半径查询，返回下标（按距离升序）"""
+        _, index, distance = self.query_radius_batch(np.asarray(point, dtype=np.float64)[None], radius)
+        order = np.argsort(distance, kind="stable")
+        return (index[order], distance[order]) if return_distance else index[order]
+
+    def query_knn(self, point: Sequence[float], k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        单点 k 近邻：从一个网格的半径开始逐次加倍，直到半径内至少有 k 个点
+        （半径内已有 k 个点时，最近的 k 个必然都在其中）
+
+        Returns:
+            (下标, 距离)，按距离升序，点数不足 k 时返回全部
+        """
+        k = min(k, len(self.positions))
+        if k == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        point = np.asarray(point, dtype=np.float64)
+        if k == len(self.positions):
+            distance = np.linalg.norm(self.positions - point, axis=1)
+            order = np.argsort(distance, kind="stable")
+            return order, distance[order]
+        radius = self.cell_size
+        while True:
+            index, distance = self.query_radius(point, radius, return_distance=True)
+            if len(index) >= k:
+                return index[:k], distance[:k]
+            radius *= 2.0
+
+    def query_nearest_batch(self, points: np.ndarray, max_radius: float = np.inf) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        批量最近邻：与 query_knn 相同的半径加倍，每一轮只对尚未找到近邻的查询点做一次向量化半径查询
+
+        Returns:
+            (下标, 距离)，max_radius 内没有点时下标为 -1、距离为 inf
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        index = np.full(len(points), -1, dtype=np.int64)
+        distance = np.full(len(points), np.inf)
+        if len(self.positions) == 0 or len(points) == 0:
+            return index, distance
+        # 半径超过查询点与索引点的整体跨度后，一轮即可覆盖全部点
+        low = np.minimum(self.positions.min(axis=0), points.min(axis=0))
+        high = np.maximum(self.positions.max(axis=0), points.max(axis=0))
+        limit = min(max_radius, float(np.linalg.norm(high - low)) + 1.0)
+        pending = np.arange(len(points))
+        radius = self.cell_size
+        while len(pending):
+            radius = min(radius, limit)
+            query, found, found_distance = self.query_radius_batch(points[pending], radius)
+            if len(query):
+                order = np.lexsort((found_distance, query))
+                query, found, found_distance = query[order], found[order], found_distance[order]
+                first = np.flatnonzero(np.r_[True, query[1:] != query[:-1]])
+                index[pending[query[first]]] = found[first]
+                distance[pending[query[first]]] = found_distance[first]
+            pending = pending[index[pending] < 0]
+            if radius >= limit:
+                break
+            radius *= 2.0
+        return index, distance
+
+    def query_pairs(self, radius: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """索引内距离不超过 radius 的所有点对 (i, j, 距离)，i < j"""
+        i, j, distance = self.query_radius_batch(self.positions, radius)
+        keep = i < j
+        return i[keep], j[keep], distance[keep]
+
+    def count_within(self, points: np.ndarray, radius: float) -> np.ndarray:
+        """每个查询点半径内的点数"""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        query, _, _ = self.query_radius_batch(points, radius)
+        return np.bincount(query, minlength=len(points))
+
+
+if __name__ == "__main__":
+    # 10 到 10000 个实体：重建 + 全部点对（10km）查询，对比逐对 TSVector3.distance
+    import time
+    from utils.tools import TSVector3
+
+    radius = 10000.0
+    rng = np.random.default_rng(0)
+    for n in (10, 100, 1000, 10000):
+        # 实体密度固定：区域边长随 sqrt(N) 增长
+        side = 20000.0 * np.sqrt(n)
+        positions = np.column_stack([rng.uniform(0, side, n), rng.uniform(0, side, n), rng.uniform(1000, 12000, n)])
+
+        grid = SpatialGrid(cell_size=radius)
+        t = time.perf_counter()
+        grid.build(positions)
+        i, j, _ = grid.query_pairs(radius)
+        grid_ms = (time.perf_counter() - t) * 1e3
+
+        line = f"N={n:6d}  网格 {grid_ms:8.2f} ms  点对 {len(i):6d}"
+        if n <= 1000:
+            points = [{"X": x, "Y": y, "Z": z} for x, y, z in positions]
+            t = time.perf_counter()
+            brute = sum(1 for a in range(n) for b in range(a + 1, n) if TSVector3.distance(points[a], points[b]) <= radius)
+            brute_ms = (time.perf_counter() - t) * 1e3
+            assert brute == len(i)
+            line += f"  逐对 {brute_ms:9.2f} ms"
+        else:
+            line += "  逐对 （O(N²)，跳过）"
+        print(line)
+
+    index, distance = grid.query_knn(positions[0], 5)
+    expected = np.argsort(np.linalg.norm(positions - positions[0], axis=1), kind="stable")[:5]
+    assert np.array_equal(index, expected)
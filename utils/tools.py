@@ -109,7 +109,7 @@ class RAMathUtil:
         }
 
     @staticmethod
-    def generate_target_arc(current_pos=None, min_dist=12000, max_dist=15000):
+    def generate_target_arc(current_pos=None, min_dist=12000, max_dist=15000, rng=None):
         """
         简洁版：在12-15km圆弧内生成随机目标点
 
@@ -117,6 +117,7 @@ class RAMathUtil:
             current_pos: 当前位置 [x, y, z]，默认[0,0,0]
             min_dist: 最小距离，默认12000米（12km）
             max_dist: 最大距离，默认15000米（15km）
+            rng: 随机数发生器（如环境的 self.np_random），默认使用全局 np.random
 
         返回:
             target_pos: 目标点坐标 [x, y, z]
@@ -125,11 +126,14 @@ class RAMathUtil:
         if current_pos is None:
             current_pos = np.array([0.0, 0.0, 0.0])
 
+        if rng is None:
+            rng = np.random
+
         # 随机角度 (0到2π)
-        angle = np.random.uniform(0, 2 * math.pi)
+        angle = rng.uniform(0, 2 * math.pi)
 
         # 随机距离 (12-15km)
-        distance = np.random.uniform(min_dist, max_dist)
+        distance = rng.uniform(min_dist, max_dist)
 
         # 计算目标点
         target_x = current_pos[0] + distance * math.cos(angle)
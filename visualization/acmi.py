@@ -0,0 +1,117 @@
+"""
+Tacview ACMI 文本格式的生成工具，环境渲染、评估导出等处共用，保证输出格式一致
+
+格式示例:
+    FileType=text/acmi/tacview
+    FileVersion=2.2
+    0,ReferenceTime=2024-01-01T00:00:00Z
+    #0.02
+    5160,T=120.50000000|24.00000000|6000.00|0.000000000000|0.000000000000|0.000000,Name=F-16,...
+"""
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+# 平台名称到 ACMI 对象 ID 的默认映射，未登记的平台按出现顺序从 BASE_OBJECT_ID 开始编号
+DEFAULT_OBJECT_IDS = {'1001': '5160'}
+BASE_OBJECT_ID = 5160
+
+DEFAULT_OBJECT_PROPERTIES = "Name=F-16,Type=Air+FixedWing,CallSign=F-16,Color=Red"
+
+
+def default_object_ids() -> Dict[str, str]:
+    return dict(DEFAULT_OBJECT_IDS)
+
+
+def format_header(reference_time: datetime) -> str:
+    """文件头"""
+    return ("FileType=text/acmi/tacview\n"
+            "FileVersion=2.2\n"
+            f"0,ReferenceTime={reference_time.strftime('%Y-%m-%dT%H:%M:%S')}Z\n")
+
+
+def object_id(name: str, index: int, object_ids: Dict[str, str]) -> str:
+    """平台对应的对象 ID，新平台登记到 object_ids 中"""
+    if name in object_ids:
+        return object_ids[name]
+    oid = str(BASE_OBJECT_ID + index)
+    object_ids[name] = oid
+    return oid
+
+
+def format_platform(oid: str, platform: Dict[str, Any], properties: str = DEFAULT_OBJECT_PROPERTIES) -> str:
+    """
+    单个平台的一行
+    格式: ID,T=经度|纬度|高度|滚转|俯仰|偏航,Name=名称,Type=类型,CallSign=呼号,Color=颜色
+    """
+    return (f"{oid},T={platform.get('lon', 0):.8f}|{platform.get('lat', 0):.8f}|{platform.get('alt', 0):.2f}|"
+            f"{platform.get('roll', 0):.12f}|{platform.get('pitch', 0):.12f}|{platform.get('heading', 0):.6f},"
+            f"{properties}\n")
+
+
+def format_frame(sim_time: float, platforms: Iterable[Dict[str, Any]], object_ids: Dict[str, str]) -> str:
+    """一帧：时间戳行加每个平台一行"""
+    lines = [f"#{sim_time:.2f}\n"]
+    for i, platform in enumerate(platforms):
+        lines.append(format_platform(object_id(platform.get('name', '1001'), i, object_ids), platform))
+    return "".join(lines)
+
+
+# 只有本地坐标的帧（对抗环境）换算经纬度时的默认参考点
+DEFAULT_REFERENCE = {"lat": 24.0, "lon": 120.5}
+
+
+@lru_cache(maxsize=8)
+def _reference_frame(lat: float, lon: float):
+    from utils.local_frame import LocalTangentFrame
+    return LocalTangentFrame({"lat": lat, "lon": lon})
+
+
+def frame_platforms(frame: Dict[str, Any], reference: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+    """
+    帧中要绘制的平台列表
+
+    仿真平台帧直接使用 frame["platforms"]；对抗环境的帧 {ownship, enemies, friendlies, missiles}
+    只有本地坐标 position {"X" 东, "Y" 北, "Z" 高}，以 reference 为原点换算为经纬度
+    """
+    platforms = frame.get("platforms")
+    if platforms is not None:
+        return platforms
+    entities = []
+    if frame.get("ownship"):
+        entities.append(("ownship", frame["ownship"]))
+    for group in ("enemies", "friendlies", "missiles"):
+        for i, entity in enumerate(frame.get(group, [])):
+            entities.append((f"{group}_{i}", entity))
+    if not entities:
+        return []
+    reference = reference or DEFAULT_REFERENCE
+    local = _reference_frame(reference["lat"], reference["lon"])
+    result = []
+    for default_name, entity in entities:
+        position = entity.get("position", {})
+        geodetic = local.to_geodetic(position.get("X", 0.0), position.get("Y", 0.0))
+        result.append({
+            "name": str(entity.get("name", entity.get("id", default_name))),
+            "lat": geodetic["lat"], "lon": geodetic["lon"],
+            "alt": entity.get("altitude", position.get("Z", 0.0)),
+            "heading": entity.get("heading", 0.0), "pitch": entity.get("pitch", 0.0), "roll": entity.get("roll", 0.0),
+        })
+    return result
+
+
+def write_acmi(path: str, frames: List[Tuple[float, List[Dict[str, Any]]]], reference_time: datetime = None):
+    """
+    把一组 (sim_time, platforms) 帧写成完整的 ACMI 文件
+
+    Args:
+        path: 输出路径
+        frames: 按时间排列的帧
+        reference_time: 参考时间，默认当前时间
+    """
+    object_ids = default_object_ids()
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(format_header(reference_time or datetime.now()))
+        for sim_time, platforms in frames:
+            f.write(format_frame(sim_time, platforms, object_ids))
+    return path
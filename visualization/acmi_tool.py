@@ -0,0 +1,103 @@
+"""
+录像库命令行工具
+
+    python -m visualization.acmi_tool list    logs/recordings --failure
+    python -m visualization.acmi_tool extract logs/recordings -o out --top 5 --every 5
+    python -m visualization.acmi_tool merge   logs/recordings -o worst.acmi --bottom 10 --gap 5
+
+筛选条件: --episodes 3,8,13  --min-return/--max-return  --success/--failure  --reason ground_collision
+         --top N / --bottom N（按回报）  --last N（最近）
+--every N 每 N 帧取一帧；merge 把多个回合按时间首尾相接写入一个文件，回合之间间隔 --gap 秒
+"""
+import argparse
+import os
+import sys
+from typing import Dict, Any, List
+
+from visualization.recording_store import load_index, select_episodes, read_episode, read_header
+
+
+def _selection(args) -> List[Dict[str, Any]]:
+    success = True if args.success else False if args.failure else None
+    episode_ids = [int(i) for i in args.episodes.split(",")] if args.episodes else None
+    return select_episodes(load_index(args.directory), episode_ids=episode_ids, min_return=args.min_return,
+                           max_return=args.max_return, success=success, reason=args.reason,
+                           top=args.top, bottom=args.bottom, last=args.last)
+
+
+def list_episodes(args):
+    episodes = _selection(args)
+    print(f"{'回合':>6} {'分段':>4} {'帧数':>6} {'时长':>8} {'回报':>10} {'成功':>4}  结束原因")
+    for e in episodes:
+        meta = e["meta"]
+        duration = (e["t1"] or 0.0) - (e["t0"] or 0.0)
+        ret = meta.get("return")
+        print(f"{e['episode_id']:>6} {e['segment']:>4} {e['frames']:>6} {duration:>8.1f} "
+              f"{ret if ret is None else f'{ret:.3f}':>10} {'✓' if meta.get('success') else '×':>4}  "
+              f"{meta.get('termination_reason', '-')}{'' if meta.get('complete', True) else ' (未完成)'}")
+    print(f"共 {len(episodes)} 个回合")
+
+
+def extract(args):
+    episodes = _selection(args)
+    os.makedirs(args.output, exist_ok=True)
+    for e in episodes:
+        path = os.path.join(args.output, f"episode_{e['episode_id']:06d}.acmi")
+        with open(path, "wb") as f:
+            for chunk in read_episode(args.directory, e, every=args.every):
+                f.write(chunk)
+        print(f"✅ {path}")
+
+
+def merge(args):
+    episodes = _selection(args)
+    if not episodes:
+        print("没有符合条件的回合")
+        return
+    offset = 0.0
+    with open(args.output, "wb") as f:
+        # 文件头取第一个回合的，每个回合平移到前一个回合结束之后，并在开始处加书签
+        f.write(read_header(args.directory, episodes[0]))
+        for e in episodes:
+            label = f"Episode {e['episode_id']} return={e['meta'].get('return')}"
+            f.write(f"#{offset:.2f}\n0,Event=Bookmark|{label}\n".encode("utf-8"))
+            shift = offset - (e["t0"] or 0.0)
+            for chunk in read_episode(args.directory, e, every=args.every, time_offset=shift, header=False):
+                f.write(chunk)
+            offset += (e["t1"] or 0.0) - (e["t0"] or 0.0) + args.gap
+    print(f"✅ {len(episodes)} 个回合已合并到 {args.output}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ACMI 录像库工具")
+    sub = parser.add_subparsers(dest="command", required=True)
+    commands = {
+        "list": (list_episodes, "列出回合"),
+        "extract": (extract, "每个回合导出为单独的 ACMI 文件"),
+        "merge": (merge, "多个回合合并为一个 ACMI 文件"),
+    }
+    for name, (func, help_text) in commands.items():
+        p = sub.add_parser(name, help=help_text)
+        p.set_defaults(func=func)
+        p.add_argument("directory", help="录像目录")
+        p.add_argument("--episodes", default=None, help="逗号分隔的回合号")
+        p.add_argument("--min-return", type=float, default=None)
+        p.add_argument("--max-return", type=float, default=None)
+        outcome = p.add_mutually_exclusive_group()
+        outcome.add_argument("--success", action="store_true")
+        outcome.add_argument("--failure", action="store_true")
+        p.add_argument("--reason", default=None, help="结束原因")
+        p.add_argument("--top", type=int, default=None, help="回报最高的 N 个")
+        p.add_argument("--bottom", type=int, default=None, help="回报最低的 N 个")
+        p.add_argument("--last", type=int, default=None, help="最近的 N 个")
+        if name != "list":
+            p.add_argument("-o", "--output", required=True, help="输出目录（extract）或文件（merge）")
+            p.add_argument("--every", type=int, default=1, help="每 N 帧取一帧")
+        if name == "merge":
+            p.add_argument("--gap", type=float, default=5.0, help="回合之间的间隔（秒）")
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""
+离线批量导出 ACMI：把 TrajectoryRecorder 记录的轨迹文件并行转换为 Tacview ACMI
+
+    python -m visualization.batch_export logs/trajectories -o logs/acmi --workers 8 --every 2
+
+单个回合的数值先整理成一个矩阵，每帧用一次 % 模板格式化出 "#时间" 行和全部
+"ID,T=经度|纬度|高度|滚转|俯仰|偏航,属性" 行，输出与 acmi.format_frame 逐字节一致；多个回合分发到进程池
+"""
+import argparse
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from visualization import acmi
+from visualization.trajectory_log import load_trajectory
+
+
+# 每个平台行中依次填入的字段及格式，与 acmi.format_platform 一致
+PLATFORM_LINE_FIELDS = ("lon", "lat", "alt", "roll", "pitch", "heading")
+PLATFORM_LINE_FORMAT = "{oid},T=%.8f|%.8f|%.2f|%.12f|%.12f|%.6f,{properties}\n"
+
+
+def format_trajectory(states: np.ndarray, sim_time: np.ndarray, names: Sequence[str],
+                      properties: str = acmi.DEFAULT_OBJECT_PROPERTIES, every: int = 1) -> str:
+    """
+    一个回合的全部帧文本（不含文件头）
+
+    每帧只做一次 % 格式化：按该帧中存在的平台拼出整帧模板，数值取自 (T, 1 + 6M) 数组的 tolist()。
+    平台集合相同的帧共用模板（通常整个回合只有一个）
+
+    Args:
+        states: (T, M) PLATFORM_DTYPE
+        sim_time: (T,)
+        names: M 个平台名称
+        every: 每 every 帧取一帧
+    """
+    states = states[::every]
+    sim_time = sim_time[::every]
+    if states.size == 0:
+        return ""
+    steps, count = states.shape
+    object_ids = acmi.default_object_ids()
+    platform_formats = [PLATFORM_LINE_FORMAT.format(oid=acmi.object_id(name, i, object_ids), properties=properties)
+                        for i, name in enumerate(names)]
+
+    # 数值矩阵: [时间, 平台0的6个字段, 平台1的6个字段, ...]
+    values = np.empty((steps, 1 + len(PLATFORM_LINE_FIELDS) * count), dtype=np.float64)
+    values[:, 0] = sim_time
+    fields = values[:, 1:].reshape(steps, count, len(PLATFORM_LINE_FIELDS))
+    for k, field in enumerate(PLATFORM_LINE_FIELDS):
+        fields[:, :, k] = states[field]
+
+    present = ~np.isnan(states["lat"])
+    patterns, inverse = np.unique(present, axis=0, return_inverse=True)
+    texts: List[str] = [""] * steps
+    for p, pattern in enumerate(patterns):
+        rows = np.flatnonzero(inverse.ravel() == p)
+        template = "#%.2f\n" + "".join(fmt for fmt, on in zip(platform_formats, pattern) if on)
+        columns = np.concatenate([[0], 1 + (np.flatnonzero(pattern)[:, None] * len(PLATFORM_LINE_FIELDS)
+                                            + np.arange(len(PLATFORM_LINE_FIELDS))).ravel()])
+        for row, frame_values in zip(rows.tolist(), values[np.ix_(rows, columns)].tolist()):
+            texts[row] = template % tuple(frame_values)
+    return "".join(texts)
+
+
+def export_file(path: str, output_dir: str, every: int = 1, reference_time: Optional[datetime] = None) -> str:
+    """把一个轨迹文件导出为同名 .acmi"""
+    trajectory = load_trajectory(path)
+    output = os.path.join(output_dir, os.path.splitext(os.path.basename(path))[0] + ".acmi")
+    text = format_trajectory(trajectory["states"], trajectory["sim_time"], trajectory["names"], every=every)
+    with open(output, "w", encoding="utf-8") as f:
+        f.write(acmi.format_header(reference_time or datetime.now()))
+        f.write(text)
+    return output
+
+
+def export_directory(input_dir: str, output_dir: str, workers: Optional[int] = None, every: int = 1,
+                     pattern: str = "episode_*.npz") -> List[str]:
+    """
+    并行导出目录下的全部轨迹
+
+    Args:
+        workers: 进程数，None 为 CPU 核数；1 时在当前进程中顺序导出
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = sorted(glob.glob(os.path.join(input_dir, pattern)))
+    if workers == 1 or len(paths) <= 1:
+        return [export_file(p, output_dir, every) for p in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(export_file, paths, [output_dir] * len(paths), [every] * len(paths),
+                             chunksize=max(1, len(paths) // (4 * (workers or os.cpu_count() or 1)))))
+
+
+def _benchmark(episodes: int = 64, steps: int = 1000, platforms: int = 4):
+    """逐帧 format_frame 与整帧模板格式化对比，并行导出整体耗时"""
+    import tempfile
+    import time
+    from visualization.trajectory_log import TrajectoryRecorder
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as directory:
+        recorder = TrajectoryRecorder(os.path.join(directory, "trajectories"), capacity=steps)
+        frames = None
+        for _ in range(episodes):
+            recorder.begin_episode()
+            base = rng.uniform(-1, 1, (platforms, 3))
+            frames = []
+            for t in range(steps):
+                frame = {"sim_time": 0.02 * t, "platforms": [
+                    {"name": str(1001 + i), "lat": 24.0 + base[i, 0] + 1e-4 * t, "lon": 120.5 + base[i, 1],
+                     "alt": 6000.0 + 10 * base[i, 2], "heading": 90.0, "pitch": 1.5, "roll": -3.25, "speed": 250.0,
+                     "vx": 0.0, "vy": 250.0, "vz": 0.0, "mass": 9000.0} for i in range(platforms)]}
+                frames.append(frame)
+                recorder.record(frame)
+            recorder.end_episode({"return": 0.0})
+
+        # 单回合：逐帧与向量化
+        object_ids = acmi.default_object_ids()
+        start = time.perf_counter()
+        reference = "".join(acmi.format_frame(f["sim_time"], f["platforms"], object_ids) for f in frames)
+        loop_ms = (time.perf_counter() - start) * 1e3
+        trajectory = load_trajectory(os.path.join(directory, "trajectories", f"episode_{episodes - 1:06d}.npz"))
+        start = time.perf_counter()
+        vectorized = format_trajectory(trajectory["states"], trajectory["sim_time"], trajectory["names"])
+        vector_ms = (time.perf_counter() - start) * 1e3
+        assert vectorized == reference
+        print(f"单回合 {steps} 步 × {platforms} 平台: 逐帧 format_frame {loop_ms:.1f} ms，整帧模板 {vector_ms:.1f} ms")
+
+        for workers in (1, os.cpu_count() or 1):
+            start = time.perf_counter()
+            export_directory(os.path.join(directory, "trajectories"), os.path.join(directory, f"acmi_{workers}"),
+                             workers=workers)
+            print(f"{episodes} 个回合，{workers} 个进程: {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="轨迹批量导出 ACMI")
+    parser.add_argument("input", nargs="?", help="轨迹目录（TrajectoryRecorder 输出）")
+    parser.add_argument("-o", "--output", default=None, help="ACMI 输出目录，默认 <input>/acmi")
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认 CPU 核数")
+    parser.add_argument("--every", type=int, default=1, help="每 N 帧取一帧")
+    parser.add_argument("--benchmark", action="store_true", help="运行格式化与并行导出的基准测试")
+    args = parser.parse_args()
+
+    if args.benchmark or not args.input:
+        _benchmark()
+    else:
+        outputs = export_directory(args.input, args.output or os.path.join(args.input, "acmi"),
+                                   workers=args.workers, every=args.every)
+        print(f"✅ 导出 {len(outputs)} 个 ACMI 文件")
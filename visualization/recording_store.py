@@ -0,0 +1,257 @@
+"""
+训练录像库：所有回合的 ACMI 顺序写入滚动分段文件，并建立回合与帧的偏移索引，
+之后按回报、结局等条件挑选回合，直接按偏移读取，不需要解析整个文件
+
+目录结构:
+    segment_00000.acmi    各回合依次写入（每个回合带自己的文件头，整体不是合法的 Tacview 文件）
+    segment_00000.frames  帧索引，定长记录 FRAME_DTYPE: (回合号, 帧在分段中的字节偏移, 仿真时间)
+    index.jsonl           回合索引，每行一个回合: 分段、起止偏移、文件头长度、帧索引位置、帧数、时间范围和回合信息
+
+提取工具见 visualization/acmi_tool.py
+"""
+import glob
+import json
+import os
+from typing import Dict, Any, Iterable, List, Optional
+
+import numpy as np
+
+from visualization.render_pipeline import RenderSink
+
+INDEX_FILE = "index.jsonl"
+SEGMENT_PATTERN = "segment_{:05d}.acmi"
+FRAMES_SUFFIX = ".frames"
+FRAME_DTYPE = np.dtype([("episode", np.int64), ("offset", np.int64), ("time", np.float64)])
+
+
+class RecordingStore(RenderSink):
+    """录像库写出端（RenderPipeline 的输出端）"""
+
+    def __init__(self, directory: str, segment_bytes: int = 256 * 1024 * 1024, keep_segments: Optional[int] = None):
+        """
+        Args:
+            directory: 录像目录
+            segment_bytes: 分段文件大小上限，超过后下一个回合写入新分段
+            keep_segments: 保留的分段个数，None 全部保留
+        """
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.keep_segments = keep_segments
+        self._segment_id = -1
+        self._file = None
+        self._frames_file = None
+        self._index_file = None
+        self._episode: Optional[Dict[str, Any]] = None
+        self._next_episode_id = 0
+        self._frame_records = np.zeros(1, dtype=FRAME_DTYPE)
+
+    # ---------- RenderSink ----------
+    def open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        # 接着已有的录像继续编号和写分段
+        existing = load_index(self.directory)
+        if existing:
+            self._next_episode_id = max(e["episode_id"] for e in existing) + 1
+        segments = sorted(glob.glob(os.path.join(self.directory, "segment_*.acmi")))
+        self._segment_id = int(os.path.basename(segments[-1])[8:13]) if segments else -1
+        self._index_file = open(index_path, "a", encoding="utf-8")
+        self._open_segment(new=not segments)
+
+    def _open_segment(self, new: bool):
+        self._close_segment()
+        if new:
+            self._segment_id += 1
+        path = os.path.join(self.directory, SEGMENT_PATTERN.format(self._segment_id))
+        self._file = open(path, "ab")
+        self._frames_file = open(path[:-len(".acmi")] + FRAMES_SUFFIX, "ab")
+        if new:
+            self._prune()
+
+    def _close_segment(self):
+        if self._file is not None:
+            self._file.close()
+            self._frames_file.close()
+            self._file = self._frames_file = None
+
+    def _prune(self):
+        if not self.keep_segments:
+            return
+        segments = sorted(glob.glob(os.path.join(self.directory, "segment_*.acmi")))
+        for path in segments[:-self.keep_segments]:
+            for p in (path, path[:-len(".acmi")] + FRAMES_SUFFIX):
+                try:
+                    os.remove(p)
+                except OSError:
+                    pass
+
+    def begin_episode(self, header: str, meta: Dict[str, Any]):
+        if self._episode is not None:
+            self._finish({"complete": False})
+        if self._file.tell() >= self.segment_bytes:
+            self._open_segment(new=True)
+        data = header.encode("utf-8")
+        start = self._file.tell()
+        self._file.write(data)
+        self._episode = {
+            "episode_id": self._next_episode_id,
+            "segment": self._segment_id,
+            "start": start,
+            "header_length": len(data),
+            "frame_index": self._frames_file.tell() // FRAME_DTYPE.itemsize,
+            "frames": 0,
+            "t0": None,
+            "t1": None,
+            "meta": {k: v for k, v in meta.items() if k != "reference_time"},
+        }
+        self._next_episode_id += 1
+
+    def write(self, text: str):
+        episode = self._episode
+        if episode is None:
+            return
+        # 每次写入以 "#时间" 行开头（见 acmi.format_frame）
+        sim_time = float(text[1:text.index("\n")]) if text.startswith("#") else np.nan
+        record = self._frame_records
+        record["episode"] = episode["episode_id"]
+        record["offset"] = self._file.tell()
+        record["time"] = sim_time
+        self._frames_file.write(record.tobytes())
+        self._file.write(text.encode("utf-8"))
+        if episode["t0"] is None:
+            episode["t0"] = sim_time
+        episode["t1"] = sim_time
+        episode["frames"] += 1
+
+    def end_episode(self, meta: Dict[str, Any]):
+        if self._episode is not None:
+            self._finish(dict(meta, complete=True))
+
+    def _finish(self, meta: Dict[str, Any]):
+        episode, self._episode = self._episode, None
+        episode["end"] = self._file.tell()
+        episode["meta"].update(meta)
+        self._index_file.write(json.dumps(episode, ensure_ascii=False, default=_json_default) + "\n")
+        self.flush()
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+            self._frames_file.flush()
+        if self._index_file is not None:
+            self._index_file.flush()
+
+    def close(self):
+        if self._episode is not None:
+            self._finish({"complete": False})
+        self._close_segment()
+        if self._index_file is not None:
+            self._index_file.close()
+            self._index_file = None
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+# ---------- 读取 ----------
+def load_index(directory: str) -> List[Dict[str, Any]]:
+    """读取回合索引（跳过所在分段已被清理的回合）"""
+    path = os.path.join(directory, INDEX_FILE)
+    if not os.path.exists(path):
+        return []
+    episodes = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                episodes.append(json.loads(line))
+    return [e for e in episodes if os.path.exists(segment_path(directory, e["segment"]))]
+
+
+def segment_path(directory: str, segment: int) -> str:
+    return os.path.join(directory, SEGMENT_PATTERN.format(segment))
+
+
+def frame_offsets(directory: str, episode: Dict[str, Any]) -> np.ndarray:
+    """回合各帧的 (offset, time) 记录"""
+    path = segment_path(directory, episode["segment"])[:-len(".acmi")] + FRAMES_SUFFIX
+    # 同一回合的帧记录在帧索引文件中连续存放，直接按位置读取
+    return np.fromfile(path, dtype=FRAME_DTYPE, count=episode["frames"],
+                       offset=episode["frame_index"] * FRAME_DTYPE.itemsize)
+
+
+def select_episodes(episodes: Iterable[Dict[str, Any]],
+                    episode_ids: Optional[Iterable[int]] = None,
+                    min_return: Optional[float] = None,
+                    max_return: Optional[float] = None,
+                    success: Optional[bool] = None,
+                    reason: Optional[str] = None,
+                    top: Optional[int] = None,
+                    bottom: Optional[int] = None,
+                    last: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    按条件筛选回合，条件之间为“且”；top / bottom 按回报取最高 / 最低的若干个，last 取最近的若干个
+    """
+    selected = list(episodes)
+    if episode_ids is not None:
+        wanted = set(episode_ids)
+        selected = [e for e in selected if e["episode_id"] in wanted]
+    if min_return is not None:
+        selected = [e for e in selected if e["meta"].get("return", -np.inf) >= min_return]
+    if max_return is not None:
+        selected = [e for e in selected if e["meta"].get("return", np.inf) <= max_return]
+    if success is not None:
+        selected = [e for e in selected if bool(e["meta"].get("success", False)) == success]
+    if reason is not None:
+        selected = [e for e in selected if e["meta"].get("termination_reason") == reason]
+    if top is not None:
+        selected = sorted(selected, key=lambda e: e["meta"].get("return", -np.inf), reverse=True)[:top]
+    if bottom is not None:
+        selected = sorted(selected, key=lambda e: e["meta"].get("return", np.inf))[:bottom]
+    if last is not None:
+        selected = selected[-last:]
+    return selected
+
+
+def read_header(directory: str, episode: Dict[str, Any]) -> bytes:
+    """回合的 ACMI 文件头"""
+    with open(segment_path(directory, episode["segment"]), "rb") as f:
+        f.seek(episode["start"])
+        return f.read(episode["header_length"])
+
+
+def read_episode(directory: str, episode: Dict[str, Any], every: int = 1, time_offset: float = 0.0,
+                 header: bool = True) -> Iterable[bytes]:
+    """
+    按偏移读取一个回合的 ACMI 文本块
+
+    Args:
+        every: 每 every 帧取一帧（>1 时按帧索引跳读）
+        time_offset: 加到每帧时间上的偏移（合并多个回合时使用），非 0 时重写各帧的 "#时间" 行
+        header: 是否输出文件头
+    """
+    if header:
+        yield read_header(directory, episode)
+    with open(segment_path(directory, episode["segment"]), "rb") as f:
+        frames_start = episode["start"] + episode["header_length"]
+        if every <= 1 and time_offset == 0.0:
+            f.seek(frames_start)
+            remaining = episode["end"] - frames_start
+            while remaining > 0:
+                chunk = f.read(min(remaining, 1 << 20))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+            return
+        records = frame_offsets(directory, episode)
+        ends = np.append(records["offset"][1:], episode["end"])
+        for i in range(0, len(records), max(1, every)):
+            f.seek(int(records["offset"][i]))
+            chunk = f.read(int(ends[i] - records["offset"][i]))
+            if time_offset != 0.0:
+                newline = chunk.index(b"\n")
+                chunk = f"#{records['time'][i] + time_offset:.2f}".encode("utf-8") + chunk[newline:]
+            yield chunk
@@ -0,0 +1,431 @@
+"""
+异步渲染管线：env.step 只把观测帧的引用放入有界队列，ACMI 格式化、文件写入和 Tacview 实时推送都在后台完成
+
+    pipeline = RenderPipeline([TacviewStreamSink(port=42674)], queue_size=64, decimation=2)
+    pipeline.begin_episode()
+    pipeline.submit(frame)        # 每步调用，不做任何格式化或 I/O
+    pipeline.end_episode({"return": 12.3, "success": True})
+    pipeline.close()
+
+含文件、录像库等持久化输出端时默认不丢帧（block），只有实时推送时默认丢弃最旧的帧；
+回合内丢弃的帧数写入回合信息的 dropped_frames。
+提交的帧只保存引用，调用方之后不能再原地修改它（各客户端每步都返回新的帧字典，满足这一点）。
+后台默认为线程；start_method 为 "fork" / "spawn" 时改用子进程，格式化不再与训练线程争用 GIL，
+代价是每帧需要序列化一次
+"""
+import multiprocessing
+import os
+import queue
+import socket
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Sequence
+
+from visualization import acmi
+
+DROP_POLICIES = ("drop_oldest", "drop_newest", "block")
+
+# 控制消息（不会被丢弃）
+_FRAME, _BEGIN, _END, _FLUSH = 0, 1, 2, 3
+
+# 控制消息入队的等待间隔（秒），每次超时检查一次后台是否还在运行
+_PUT_POLL = 0.1
+
+
+class RenderSink(ABC):
+    """渲染输出端，所有方法都只在后台线程/进程中调用"""
+
+    # 是否允许丢帧（实时画面丢帧无妨，持久化的记录丢帧就不完整）
+    lossy = False
+
+    def open(self):
+        """后台启动时调用一次（在子进程模式下于子进程内打开文件和套接字）"""
+        pass
+
+    @abstractmethod
+    def begin_episode(self, header: str, meta: Dict[str, Any]):
+        """回合开始，header 为 ACMI 文件头"""
+        pass
+
+    @abstractmethod
+    def write(self, text: str):
+        """写入一帧或多帧 ACMI 文本"""
+        pass
+
+    def end_episode(self, meta: Dict[str, Any]):
+        """回合结束，meta 为调用方给出的回合信息（回报、结局等）"""
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FileSink(RenderSink):
+    """写单个 ACMI 文件，每回合开始时重写（保留最近一个回合）"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def begin_episode(self, header: str, meta: Dict[str, Any]):
+        if self._file is not None:
+            self._file.close()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._file.write(header)
+
+    def write(self, text: str):
+        if self._file is not None:
+            self._file.write(text)
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class TacviewStreamSink(RenderSink):
+    """
+    Tacview 实时遥测（Real-Time Telemetry）服务端
+
+    Tacview 作为客户端连入本端口，握手后接收 ACMI 文本流；中途连入的客户端先收到当前回合的文件头。
+    发送失败的客户端直接断开，不影响其它输出端
+    """
+
+    lossy = True
+
+    HANDSHAKE = "XtraLib.Stream.0\nTacview.RealTimeTelemetry.0\n{host}\n\0"
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 42674, hostname: str = "afsim-rl"):
+        self.host = host
+        self.port = port
+        self.hostname = hostname
+        self._server = None
+        self._clients: List[socket.socket] = []
+        self._waiting: List[socket.socket] = []
+        self._lock = threading.Lock()
+        self._header = ""
+
+    def open(self):
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind((self.host, self.port))
+        self._server.listen(4)
+        threading.Thread(target=self._accept_loop, name="tacview-accept", daemon=True).start()
+        print(f"📡 Tacview 实时遥测监听 {self.host}:{self.port}")
+
+    def _accept_loop(self):
+        while self._server is not None:
+            try:
+                client, address = self._server.accept()
+            except OSError:
+                return
+            try:
+                client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                client.sendall(self.HANDSHAKE.format(host=self.hostname).encode("utf-8"))
+                # 客户端握手以 \0 结尾（含可选的密码哈希），内容不做校验
+                received = b""
+                while not received.endswith(b"\0"):
+                    chunk = client.recv(256)
+                    if not chunk:
+                        raise ConnectionError("握手中断")
+                    received += chunk
+                with self._lock:
+                    if self._header:
+                        client.sendall(self._header.encode("utf-8"))
+                        self._clients.append(client)
+                    else:
+                        # 第一个回合尚未开始，文件头到 begin_episode 时再发
+                        self._waiting.append(client)
+                print(f"📡 Tacview 已连接: {address[0]}:{address[1]}")
+            except OSError as e:
+                print(f"   Tacview 握手失败: {e}")
+                client.close()
+
+    def _broadcast(self, text: str):
+        data = text.encode("utf-8")
+        with self._lock:
+            alive = []
+            for client in self._clients:
+                try:
+                    client.sendall(data)
+                    alive.append(client)
+                except OSError:
+                    client.close()
+            self._clients = alive
+
+    def begin_episode(self, header: str, meta: Dict[str, Any]):
+        # 已在接收的客户端不再重发文件头，只插入一条回合开始的全局事件
+        if self._clients:
+            self._broadcast("0,Event=Message|New episode\n")
+        with self._lock:
+            self._header = header
+            waiting, self._waiting = self._waiting, []
+            for client in waiting:
+                try:
+                    client.sendall(header.encode("utf-8"))
+                    self._clients.append(client)
+                except OSError:
+                    client.close()
+
+    def write(self, text: str):
+        if self._clients:
+            self._broadcast(text)
+
+    def close(self):
+        server, self._server = self._server, None
+        if server is not None:
+            server.close()
+        with self._lock:
+            for client in self._clients + self._waiting:
+                client.close()
+            self._clients = []
+            self._waiting = []
+
+
+class _Renderer:
+    """后台侧：把帧格式化为 ACMI 文本并分发给各输出端"""
+
+    def __init__(self, sinks: Sequence[RenderSink], reference: Optional[Dict[str, float]]):
+        self.sinks = list(sinks)
+        self.reference = reference
+        self.object_ids = acmi.default_object_ids()
+        self.started = False
+
+    def begin(self, meta: Dict[str, Any]):
+        self.object_ids = acmi.default_object_ids()
+        header = acmi.format_header(meta.get("reference_time") or datetime.now())
+        for sink in self.sinks:
+            sink.begin_episode(header, meta)
+        self.started = True
+
+    def frame(self, frame: Dict[str, Any]):
+        if not self.started:
+            self.begin({})
+        platforms = acmi.frame_platforms(frame, self.reference)
+        if not platforms:
+            return
+        text = acmi.format_frame(frame.get("sim_time", 0.0), platforms, self.object_ids)
+        for sink in self.sinks:
+            sink.write(text)
+
+    def end(self, meta: Dict[str, Any]):
+        for sink in self.sinks:
+            sink.end_episode(meta)
+            sink.flush()
+
+    def open(self):
+        """打开各输出端，打开失败的输出端（例如端口被占用）直接移除，不影响其它输出端"""
+        opened = []
+        for sink in self.sinks:
+            try:
+                sink.open()
+                opened.append(sink)
+            except Exception as e:
+                print(f"× 渲染输出端 {type(sink).__name__} 打开失败，已停用: {e}")
+        self.sinks = opened
+
+    def run(self, items, flushed=None):
+        self.open()
+        try:
+            while True:
+                item = items.get()
+                try:
+                    if item is None:
+                        return
+                    kind, payload = item
+                    if kind == _FRAME:
+                        self.frame(payload)
+                    elif kind == _BEGIN:
+                        self.begin(payload)
+                    elif kind == _END:
+                        self.end(payload)
+                    else:
+                        for sink in self.sinks:
+                            sink.flush()
+                        flushed.set()
+                except Exception as e:
+                    print(f"× 渲染失败: {e}")
+                finally:
+                    items.task_done()
+        finally:
+            for sink in self.sinks:
+                sink.flush()
+                sink.close()
+
+
+def _render_process(sinks, reference, items, flushed):
+    _Renderer(sinks, reference).run(items, flushed)
+
+
+class RenderPipeline:
+    """
+    有界队列 + 后台渲染
+
+    drop_policy:
+        drop_oldest: 队列满时丢弃最早的一帧，保证画面跟上最新状态（只有实时推送输出端时的默认值）
+        drop_newest: 队列满时丢弃本帧
+        block:       队列满时等待，不丢帧（会把渲染耗时传导回训练循环；含持久化输出端时的默认值）
+    decimation: 每 decimation 帧提交一帧，其余在 submit 中直接跳过
+    """
+
+    def __init__(self,
+                 sinks: Sequence[RenderSink],
+                 queue_size: int = 64,
+                 drop_policy: Optional[str] = None,
+                 decimation: int = 1,
+                 reference: Optional[Dict[str, float]] = None,
+                 start_method: Optional[str] = None):
+        """
+        Args:
+            sinks: 输出端
+            queue_size: 队列容量（帧）
+            drop_policy: 见类说明，None 按输出端选择（全部允许丢帧时 drop_oldest，否则 block）
+            decimation: 抽帧间隔
+            reference: 只有本地坐标的帧（对抗环境）转换为经纬度时使用的参考点 {'lat', 'lon'}
+            start_method: None 使用后台线程，否则为子进程的启动方式
+        """
+        if drop_policy is None:
+            drop_policy = "drop_oldest" if sinks and all(sink.lossy for sink in sinks) else "block"
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"drop_policy 必须是 {DROP_POLICIES} 之一")
+        self.drop_policy = drop_policy
+        self.decimation = max(1, int(decimation))
+        self._counter = 0
+        self.submitted = 0
+        self.dropped = 0
+        self._episode_dropped = 0
+        self._closed = False
+
+        if start_method is None:
+            self._queue = queue.Queue(maxsize=queue_size)
+            self._flushed = threading.Event()
+            self._worker = threading.Thread(target=_Renderer(sinks, reference).run,
+                                            args=(self._queue, self._flushed), name="render", daemon=True)
+        else:
+            ctx = multiprocessing.get_context(start_method)
+            self._queue = ctx.JoinableQueue(maxsize=queue_size)
+            self._flushed = ctx.Event()
+            self._worker = ctx.Process(target=_render_process,
+                                       args=(list(sinks), reference, self._queue, self._flushed),
+                                       name="render", daemon=True)
+        self._worker.start()
+
+    # ---------- 训练线程侧 ----------
+    def _put(self, item) -> bool:
+        """
+        等待入队，后台已退出时放弃（不会让训练循环卡死在满队列上）
+
+        Returns:
+            是否入队
+        """
+        while self._worker.is_alive():
+            try:
+                self._queue.put(item, timeout=_PUT_POLL)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def submit(self, frame: Dict[str, Any]):
+        """提交一帧（只保存引用）"""
+        self._counter += 1
+        if self._counter < self.decimation:
+            return
+        self._counter = 0
+        self.submitted += 1
+        item = (_FRAME, frame)
+        if self.drop_policy == "block":
+            if not self._put(item):
+                self.dropped += 1
+            return
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+            if self.drop_policy == "drop_newest":
+                return
+            try:
+                self._queue.get_nowait()
+                self._queue.task_done()
+            except queue.Empty:
+                pass
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                pass
+
+    def begin_episode(self, meta: Optional[Dict[str, Any]] = None):
+        """回合开始（控制消息，队列满时等待而不丢弃）"""
+        self._counter = self.decimation - 1  # 每回合的第一帧总是提交
+        self._episode_dropped = self.dropped
+        self._put((_BEGIN, dict(meta or {})))
+
+    def end_episode(self, meta: Optional[Dict[str, Any]] = None):
+        """回合结束，meta 交给各输出端（例如录像库按回报/结局建立索引），并附上本回合丢弃的帧数"""
+        self._put((_END, dict(meta or {}, dropped_frames=self.dropped - self._episode_dropped)))
+
+    def flush(self):
+        """等待已提交的帧全部写出，后台已退出时立即返回"""
+        self._flushed.clear()
+        if not self._put((_FLUSH, None)):
+            return
+        while not self._flushed.wait(_PUT_POLL):
+            if not self._worker.is_alive():
+                return
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._put(None)
+        self._worker.join(timeout=10)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {"submitted": self.submitted, "dropped": self.dropped}
+
+
+if __name__ == "__main__":
+    # 对比同步写 ACMI 与管线提交的单步耗时
+    import tempfile
+    import time
+
+    frame_template = {"sim_time": 0.0, "platforms": [
+        {"name": str(1001 + i), "lat": 24.0 + 0.01 * i, "lon": 120.5, "alt": 6000.0, "heading": 90.0,
+         "pitch": 1.0, "roll": -2.0, "speed": 250.0, "vx": 0.0, "vy": 250.0, "vz": 0.0, "mass": 9000.0}
+        for i in range(8)]}
+    frames = [dict(frame_template, sim_time=0.02 * i) for i in range(5000)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sync.acmi")
+        object_ids = acmi.default_object_ids()
+        start = time.perf_counter()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(acmi.format_header(datetime.now()))
+        for frame in frames:
+            # 与原 render() 相同：每帧以追加模式打开文件
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(acmi.format_frame(frame["sim_time"], frame["platforms"], object_ids))
+        sync_us = (time.perf_counter() - start) / len(frames) * 1e6
+
+        for policy in ("drop_oldest", "block"):
+            pipeline = RenderPipeline([FileSink(os.path.join(directory, f"{policy}.acmi"))], drop_policy=policy)
+            pipeline.begin_episode()
+            start = time.perf_counter()
+            for frame in frames:
+                pipeline.submit(frame)
+            submit_us = (time.perf_counter() - start) / len(frames) * 1e6
+            pipeline.close()
+            print(f"管线 {policy:12s} 单步 {submit_us:6.2f} us  {pipeline.stats}")
+        print(f"同步写入              单步 {sync_us:6.2f} us")
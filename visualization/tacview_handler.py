@@ -0,0 +1,64 @@
+from typing import Dict, Any, Optional
+
+from visualization.render_pipeline import RenderPipeline, FileSink, TacviewStreamSink
+from visualization.recording_store import RecordingStore
+
+
+class TacViewHandler:
+    """
+    环境使用的 Tacview 输出：实时推送、保存最近一个回合的 ACMI 文件、写入录像库（保留全部回合）
+
+    所有格式化和 I/O 都在 RenderPipeline 的后台完成，submit 只把帧引用放入队列
+    """
+
+    def __init__(self,
+                 stream: bool = False,
+                 acmi_file_path: Optional[str] = None,
+                 recording_dir: Optional[str] = None,
+                 host: str = "0.0.0.0",
+                 port: int = 42674,
+                 queue_size: int = 64,
+                 drop_policy: Optional[str] = None,
+                 decimation: int = 1,
+                 reference: Optional[Dict[str, float]] = None,
+                 start_method: Optional[str] = None):
+        """
+        Args:
+            stream: 是否开启 Tacview 实时遥测（Tacview 中选择 实时遥测 连接 host:port）
+            acmi_file_path: ACMI 文件路径（每回合重写），None 不保存
+            recording_dir: 录像库目录（见 RecordingStore），None 不记录
+            queue_size / drop_policy / decimation / start_method: 见 RenderPipeline（drop_policy 默认只有实时推送时丢帧，
+                保存文件或录像库时不丢帧）
+            reference: 本地坐标帧换算经纬度的参考点
+        """
+        sinks = []
+        if stream:
+            sinks.append(TacviewStreamSink(host, port))
+        if acmi_file_path:
+            sinks.append(FileSink(acmi_file_path))
+        if recording_dir:
+            sinks.append(RecordingStore(recording_dir))
+        self.pipeline = RenderPipeline(sinks, queue_size=queue_size, drop_policy=drop_policy,
+                                       decimation=decimation, reference=reference,
+                                       start_method=start_method) if sinks else None
+
+    def begin_episode(self, meta: Optional[Dict[str, Any]] = None):
+        if self.pipeline is not None:
+            self.pipeline.begin_episode(meta)
+
+    def submit(self, env_data: Dict[str, Any]):
+        if self.pipeline is not None:
+            self.pipeline.submit(env_data)
+
+    def end_episode(self, meta: Optional[Dict[str, Any]] = None):
+        if self.pipeline is not None:
+            self.pipeline.end_episode(meta)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return self.pipeline.stats if self.pipeline is not None else {}
+
+    def close(self):
+        if self.pipeline is not None:
+            self.pipeline.close()
+            self.pipeline = None
@@ -0,0 +1,122 @@
+"""
+训练时记录轨迹（每步各平台状态），离线再批量导出 ACMI（见 visualization/batch_export.py），
+可视化完全移出训练循环
+
+每个回合一个 .npz 文件:
+    states    (T, M) PLATFORM_DTYPE，M 为本回合出现过的平台数，某步不存在的平台为 NaN
+    sim_time  (T,)
+    names     (M,) 平台名称，列顺序即首次出现的顺序
+    meta      回合信息 JSON（回报、结局等）
+"""
+import glob
+import json
+import os
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from communication.platform_state import PLATFORM_DTYPE, PlatformDecoder
+
+EPISODE_PATTERN = "episode_{:06d}.npz"
+
+
+class TrajectoryRecorder:
+    """
+    轨迹记录器
+
+    单步只做一次帧解码和一次结构化数组的行赋值；缓冲区按回合预分配，步数或平台数超出时翻倍扩容
+    """
+
+    def __init__(self, directory: str, capacity: int = 2048, max_platforms: int = 8, every: int = 1):
+        """
+        Args:
+            directory: 输出目录
+            capacity: 预分配的步数
+            max_platforms: 预分配的平台列数
+            every: 每 every 步记录一步
+        """
+        self.directory = directory
+        self.every = max(1, int(every))
+        os.makedirs(directory, exist_ok=True)
+        existing = sorted(glob.glob(os.path.join(directory, "episode_*.npz")))
+        self.episode_id = int(os.path.basename(existing[-1])[8:14]) + 1 if existing else 0
+        self.decoder = PlatformDecoder()
+        self._states = np.empty((capacity, max_platforms), dtype=PLATFORM_DTYPE)
+        self._sim_time = np.empty(capacity, dtype=np.float64)
+        self._columns: Dict[str, int] = {}
+        self._names_key: Optional[Tuple[str, ...]] = None
+        self._names_columns = np.zeros(0, dtype=np.int64)
+        self._length = 0
+        self._counter = 0
+        self._meta: Dict[str, Any] = {}
+        self.recording = False
+
+    def begin_episode(self, meta: Optional[Dict[str, Any]] = None):
+        self._columns = {}
+        self._names_key = None
+        self._length = 0
+        self._counter = 0
+        self._meta = dict(meta or {})
+        self.recording = True
+
+    def _columns_for(self, names: Tuple[str, ...]) -> np.ndarray:
+        """平台名称序列对应的列号，名称序列不变时复用"""
+        if names != self._names_key:
+            for name in names:
+                if name not in self._columns:
+                    self._columns[name] = len(self._columns)
+            if len(self._columns) > self._states.shape[1]:
+                grown = np.empty((self._states.shape[0], 2 * len(self._columns)), dtype=PLATFORM_DTYPE)
+                grown[:self._length, :self._states.shape[1]] = self._states[:self._length]
+                grown[:self._length, self._states.shape[1]:] = np.nan
+                self._states = grown
+            self._names_key = names
+            self._names_columns = np.array([self._columns[name] for name in names], dtype=np.int64)
+        return self._names_columns
+
+    def record(self, frame: Dict[str, Any]):
+        """记录一帧 {"sim_time", "platforms": [...]}"""
+        if not self.recording:
+            return
+        self._counter += 1
+        if self._counter < self.every:
+            return
+        self._counter = 0
+        decoded = self.decoder.decode(frame)
+        columns = self._columns_for(decoded.names)
+        t = self._length
+        if t == self._states.shape[0]:
+            self._states = np.concatenate([self._states, np.empty_like(self._states)])
+            self._sim_time = np.concatenate([self._sim_time, np.empty_like(self._sim_time)])
+        row = self._states[t]
+        row[:len(self._columns)] = np.nan
+        row[columns] = decoded.states
+        self._sim_time[t] = decoded.sim_time
+        self._length = t + 1
+
+    def end_episode(self, meta: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """结束回合并写出，返回文件路径"""
+        if not self.recording:
+            return None
+        self.recording = False
+        self._meta.update(meta or {})
+        names = sorted(self._columns, key=self._columns.get)
+        path = os.path.join(self.directory, EPISODE_PATTERN.format(self.episode_id))
+        np.savez(path,
+                 states=self._states[:self._length, :len(names)],
+                 sim_time=self._sim_time[:self._length],
+                 names=np.array(names, dtype=str),
+                 meta=np.array(json.dumps(self._meta, ensure_ascii=False, default=str)))
+        self.episode_id += 1
+        return path
+
+
+def load_trajectory(path: str) -> Dict[str, Any]:
+    """读取一个回合的轨迹"""
+    with np.load(path, allow_pickle=False) as data:
+        return {
+            "states": data["states"],
+            "sim_time": data["sim_time"],
+            "names": [str(n) for n in data["names"]],
+            "meta": json.loads(str(data["meta"])),
+        }